@@ -0,0 +1,86 @@
+"""
+Measures how long the event loop is stalled while parsing, using a task
+that wakes up every millisecond and records how late it was. Compares
+calling parse_many and parse directly from a coroutine with aparse_many
+and aparse, both cooperatively and in a thread pool.
+
+    python bench/bench_async.py [messages]
+"""
+
+import asyncio
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import corpus
+from pyicumessageformat import Parser
+
+
+async def ping(done, lateness):
+    loop = asyncio.get_running_loop()
+    while not done.is_set():
+        start = loop.time()
+        await asyncio.sleep(0.001)
+        lateness.append(loop.time() - start - 0.001)
+
+
+async def measure(work):
+    done = asyncio.Event()
+    lateness = []
+    pinger = asyncio.ensure_future(ping(done, lateness))
+    await asyncio.sleep(0.01)
+
+    start = time.perf_counter()
+    await work()
+    seconds = time.perf_counter() - start
+
+    done.set()
+    await pinger
+    lateness.sort()
+    return seconds, lateness[-1], lateness[int(len(lateness) * 0.99)]
+
+
+async def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    parser = Parser({'allow_tags': True})
+    catalog = corpus.catalog(size)
+    document = '\n\n'.join(corpus.corpus(corpus.tagged, size // 4))
+
+    with ThreadPoolExecutor(1) as executor:
+        async def parseMany():
+            parser.parse_many(catalog)
+
+        async def aparseMany():
+            await parser.aparse_many(catalog)
+
+        async def aparseManyThreads():
+            await parser.aparse_many(catalog, executor = executor)
+
+        async def parse():
+            parser.parse(document)
+
+        async def aparse():
+            await parser.aparse(document)
+
+        async def aparseThreads():
+            await parser.aparse(document, executor = executor)
+
+        print('{} messages, and one message of {} characters'.format(size, len(document)))
+        for label, work in (
+                ('parse_many', parseMany),
+                ('aparse_many', aparseMany),
+                ('aparse_many(executor)', aparseManyThreads),
+                ('parse', parse),
+                ('aparse', aparse),
+                ('aparse(executor)', aparseThreads)):
+            seconds, worst, p99 = await measure(work)
+            print('{:<22} {:>8.1f} ms total  {:>7.2f} ms worst stall  {:>7.2f} ms p99'.format(
+                label, seconds * 1e3, worst * 1e3, p99 * 1e3))
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
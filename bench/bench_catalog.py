@@ -0,0 +1,70 @@
+"""
+Startup time and memory for a catalog of which each request only uses a
+few messages, comparing parsing everything up front with parse_many and
+looking messages up in a Catalog that parses them on first use.
+
+    python bench/bench_catalog.py [messages] [used]
+"""
+
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import corpus
+from pyicumessageformat import Catalog, Parser
+
+
+def eager(parser, messages, used):
+    results, errors = parser.parse_many(messages)
+    for key in used:
+        results[key]
+    return results
+
+
+def lazy(parser, messages, used):
+    catalog = Catalog(messages, parser)
+    for key in used:
+        catalog[key]
+    return catalog
+
+
+def measure(fn, parser, messages, used):
+    best = None
+    for _ in range(3):
+        gc.collect()
+        start = time.perf_counter()
+        fn(parser, messages, used)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    gc.collect()
+    tracemalloc.start()
+    kept = fn(parser, messages, used)
+    gc.collect()
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return best, memory
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    parser = Parser({'allow_tags': True})
+    messages = corpus.catalog(size)
+    used = random.Random(0).sample(list(messages), count)
+
+    print('{} messages, {} used'.format(size, count))
+    for label, fn in (('parse_many', eager), ('Catalog', lazy)):
+        seconds, memory = measure(fn, parser, messages, used)
+        print('{:<12} {:>9.2f} ms {:>8.2f} MB'.format(label, seconds * 1e3, memory / 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""
+Character classification heavy inputs: lots of whitespace between
+placeholder parts, and names and text outside of ASCII.
+
+    python bench/bench_chars.py
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pyicumessageformat import Parser
+
+
+SPACES = ' \t\n　  '
+
+MESSAGES = [
+    ('whitespace', ''.join(
+        '{' + SPACES + 'count' + SPACES + ',' + SPACES + 'plural' + SPACES + ',' + SPACES +
+        'offset:' + SPACES + '1' + SPACES + 'one' + SPACES + '{#}' + SPACES +
+        'other' + SPACES + '{# {' + SPACES + 'name' + SPACES + '}}' + SPACES + '}'
+        for _ in range(200))),
+    ('cyrillic', ''.join(
+        'Привет, {имя_пользователя}! У вас {количество, plural, one {# сообщение} '
+        'other {# сообщений}} от {отправитель, select, other {{отправитель}}}. '
+        for _ in range(200))),
+    ('japanese', ''.join(
+        '{ユーザー名}さん、{件数, number, integer}件の新しいメッセージがあります。'
+        '{件数, plural, other {全部で#件}}　'
+        for _ in range(200))),
+    ('styles', ''.join(
+        '{amount, number, ::currency/EUR unit-width-narrow precision-integer}  '
+        for _ in range(300)))
+]
+
+
+def main():
+    parser = Parser()
+    for label, message in MESSAGES:
+        best = min(timeit.repeat(lambda: parser.parse(message), number = 3, repeat = 20)) / 3
+        print('{:<12} {:>8} chars {:>8.2f} ms {:>8.1f} ns/char'.format(
+            label, len(message), best * 1000, best / len(message) * 1e9))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+Compares formatting with Compiler against walking the dict AST on every
+call, which is what consumers of Parser.parse have to do otherwise.
+
+    python bench/bench_compiler.py
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pyicumessageformat import Compiler, Parser
+
+
+def english(value, ordinal):
+    return 'one' if value == 1 and not ordinal else 'other'
+
+
+def interpret(ast, values, plural = None):
+    out = []
+    for node in ast:
+        if isinstance(node, str):
+            out.append(node)
+            continue
+
+        ttype = node.get('type')
+        if ttype == 'tag':
+            out.append('<{0}>{1}</{0}>'.format(
+                node['name'], interpret(node.get('contents', []), values, plural)))
+            continue
+
+        value = values[node['name']]
+        if node.get('hash'):
+            out.append(str(value - plural['offset']))
+        elif ttype in ('plural', 'selectordinal'):
+            options = node['options']
+            key = '={}'.format(value)
+            if key not in options:
+                key = english(value - node['offset'], ttype == 'selectordinal')
+                if key not in options:
+                    key = 'other'
+            out.append(interpret(options[key], values, node))
+        elif ttype == 'select':
+            options = node['options']
+            out.append(interpret(options.get(str(value), options['other']), values, plural))
+        else:
+            out.append(str(value))
+
+    return ''.join(out)
+
+
+MESSAGES = [
+    ('plain', 'Your settings were saved.', {}),
+    ('placeholders', 'Hello, {first} {last}! Welcome back to {site}.',
+        {'first': 'Ada', 'last': 'Lovelace', 'site': 'Example'}),
+    ('plural', 'You have {n, plural, offset:1 =0 {no messages} one {# message} other {# messages}} from {user}.',
+        {'n': 5, 'user': 'Bob'}),
+    ('nested', '{gender, select, male {He has {n, plural, one {# photo} other {# photos}}} '
+        'female {She has {n, plural, one {# photo} other {# photos}}} other {They have {n, plural, one {# photo} other {# photos}}}}.',
+        {'gender': 'female', 'n': 3}),
+    ('tags', 'Read the <link>privacy policy</link> and <b>{n, plural, one {# rule} other {# rules}}</b>.',
+        {'n': 2})
+]
+
+
+def main():
+    parser = Parser({'allow_tags': True})
+    compiler = Compiler({'plural': english})
+    number = 100000
+
+    print('{:<14} {:>14} {:>14} {:>8}'.format('message', 'interpret', 'compiled', 'speedup'))
+    for label, message, values in MESSAGES:
+        ast = parser.parse(message)
+        fn = compiler.compile(ast)
+        assert fn(values) == interpret(ast, values)
+
+        slow = min(timeit.repeat(lambda: interpret(ast, values), number = number, repeat = 3))
+        fast = min(timeit.repeat(lambda: fn(values), number = number, repeat = 3))
+        print('{:<14} {:>11.0f} ns {:>11.0f} ns {:>7.1f}x'.format(
+            label, slow / number * 1e9, fast / number * 1e9, slow / fast))
+
+
+if __name__ == '__main__':
+    main()
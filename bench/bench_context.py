@@ -0,0 +1,54 @@
+"""
+Per-character cost of the parser's inner loops on long messages, for the
+paths that step through the input a character at a time: spaces, names,
+offsets and argument styles.
+
+    python bench/bench_context.py
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pyicumessageformat import Parser
+
+
+def placeholders(count):
+    return ''.join(
+        '{  argument_name_' + str(i) + '  ,  number  ,  ::currency/EUR unit-width-narrow  }'
+        for i in range(count))
+
+
+def plurals(count):
+    return ''.join(
+        '{ n' + str(i) + ' , plural , offset: 12345 =0 {} =1 {} other {} }'
+        for i in range(count))
+
+
+def select(count):
+    return '{ choice , select , ' + ' '.join(
+        'selector_number_' + str(i) + '   {}' for i in range(count)) + ' other {} }'
+
+
+MESSAGES = [
+    ('placeholders', placeholders(500)),
+    ('plurals', plurals(500)),
+    ('select', select(2000))
+]
+
+
+def main():
+    parser = Parser()
+    for label, message in MESSAGES:
+        for tokens in (False, True):
+            best = min(timeit.repeat(
+                lambda: parser.parse(message, [] if tokens else None),
+                number = 3, repeat = 20)) / 3
+            print('{:<14} tokens={:<5} {:>8} chars {:>8.1f} ns/char'.format(
+                label, str(tokens), len(message), best / len(message) * 1e9))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Parsing a catalog with and without a file_cache, as a CI job or a worker
+starting up would: once to fill the cache, again with nothing changed,
+and again after a few messages were edited.
+
+    python bench/bench_filecache.py [messages]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import corpus
+from pyicumessageformat import FileCache, Parser
+
+
+def run(messages, file_cache = None):
+    # A new Parser each time, as a new process would have.
+    parser = Parser({'allow_tags': True, 'file_cache': file_cache})
+    start = time.perf_counter()
+    parser.parse_many(messages)
+    return time.perf_counter() - start
+
+
+def nested(rng):
+    # A plural followed by nested selects, as messages for several
+    # variables at once tend to be.
+    return corpus.nested(rng, 2).replace('{v1', '{n, plural, one {# x} other {# y}} {v1', 1)
+
+
+def edited(messages, every):
+    return {
+        key: message + ' edited' if i % every == 0 else message
+        for i, (key, message) in enumerate(messages.items())
+    }
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+    for label, messages in (
+            ('catalog', corpus.catalog(size)),
+            ('nested', dict(enumerate(corpus.corpus(nested, size))))):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = FileCache(directory)
+            baseline = min(run(messages) for _ in range(3))
+            results = [
+                ('no cache', baseline),
+                ('first run', run(messages, cache)),
+                ('unchanged', min(run(messages, cache) for _ in range(3))),
+                ('5% edited', run(edited(messages, 20), cache))
+            ]
+
+        print('{} {} messages'.format(size, label))
+        for name, seconds in results:
+            print('  {:<12} {:>9.1f} ms {:>6.2f}x'.format(name, seconds * 1e3, baseline / seconds))
+
+
+if __name__ == '__main__':
+    main()
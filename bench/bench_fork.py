@@ -0,0 +1,108 @@
+"""
+Unique set size of forked workers sharing catalogs parsed by their
+parent, as in a pre-fork server. Each worker looks up some messages,
+allocates memory of its own and runs a full garbage collection, and then
+reports how much of its memory is no longer shared with the parent.
+Compares dict ASTs, ast_nodes, and frozen catalogs with and without
+gc.freeze(). Linux only.
+
+    python bench/bench_fork.py [messages per locale] [locales] [workers]
+"""
+
+import gc
+import os
+import random
+import subprocess
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import corpus
+from pyicumessageformat import Parser
+from pyicumessageformat.freeze import freeze_catalog
+
+MODES = ('none', 'dict', 'ast_nodes', 'dict, gc.freeze', 'ast_nodes, gc.freeze', 'frozen', 'frozen, gc.freeze', 'frozen dict, gc.freeze')
+
+
+def uss():
+    # Memory only this process maps, in kB.
+    total = 0
+    with open('/proc/self/smaps_rollup') as file:
+        for line in file:
+            if line.startswith(('Private_Clean:', 'Private_Dirty:')):
+                total += int(line.split()[1])
+    return total
+
+
+def load(mode, size, locales):
+    parser = Parser({'allow_tags': True, 'ast_nodes': not mode.startswith(('dict', 'frozen dict'))})
+    catalogs = {}
+    if mode != 'none':
+        for locale in range(locales):
+            catalogs[locale] = parser.parse_many(corpus.catalog(size, seed = locale))[0]
+
+    if mode.startswith('frozen'):
+        catalogs = freeze_catalog(catalogs, gc_freeze = mode.endswith('gc.freeze'))
+    elif mode.endswith('gc.freeze'):
+        gc.collect()
+        gc.freeze()
+    gc.collect()
+    return catalogs
+
+
+def work(catalogs, seed):
+    rng = random.Random(seed)
+    for catalog in catalogs.values():
+        for key in rng.sample(list(catalog), min(1000, len(catalog))):
+            catalog[key]
+
+    scratch = [[i] for i in range(100000)]
+    gc.collect()
+    return scratch
+
+
+def child(mode, size, locales, workers):
+    catalogs = load(mode, size, locales)
+    parent = uss()
+    results = []
+    for seed in range(workers):
+        read, write = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read)
+            work(catalogs, seed)
+            os.write(write, str(uss()).encode('ascii'))
+            os._exit(0)
+
+        os.close(write)
+        with os.fdopen(read) as file:
+            results.append(int(file.read()))
+        os.waitpid(pid, 0)
+
+    print(parent, max(results))
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == '--mode':
+        child(sys.argv[2], *map(int, sys.argv[3:]))
+        return
+
+    size = sys.argv[1] if len(sys.argv) > 1 else '50000'
+    locales = sys.argv[2] if len(sys.argv) > 2 else '2'
+    workers = sys.argv[3] if len(sys.argv) > 3 else '3'
+
+    # Every mode runs in a new interpreter, as gc.freeze() cannot be undone.
+    print('{} messages x {} locales, {} workers'.format(size, locales, workers))
+    baseline = None
+    for mode in MODES:
+        output = subprocess.check_output([sys.executable, __file__, '--mode', mode, size, locales, workers])
+        parent, worker = map(int, output.split())
+        if baseline is None:
+            baseline = worker
+        print('{:<24} parent {:>7.1f} MB  worker {:>7.1f} MB  catalogs in worker {:>7.1f} MB'.format(
+            mode, parent / 1024, worker / 1024, (worker - baseline) / 1024))
+
+
+if __name__ == '__main__':
+    main()
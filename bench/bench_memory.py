@@ -0,0 +1,58 @@
+"""
+Memory used by parsed catalogs held in memory, comparing the dict AST
+with the ast_nodes and intern_strings options.
+
+    python bench/bench_memory.py [messages per locale] [locales]
+"""
+
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import corpus
+from pyicumessageformat import Parser
+
+
+def measure(parser, catalogs):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = [
+        [parser.parse(message) for message in catalog]
+        for catalog in catalogs
+    ]
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del kept
+    return used
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    locales = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    catalogs = [list(corpus.catalog(size, seed = locale).values()) for locale in range(locales)]
+    count = size * locales
+
+    results = []
+    for label, options in (
+            ('dict', {}),
+            ('dict, interned', {'intern_strings': True}),
+            ('ast_nodes', {'ast_nodes': True}),
+            ('dict, indices', {'include_indices': True}),
+            ('dict, indices, interned', {'include_indices': True, 'intern_strings': True}),
+            ('ast_nodes, indices', {'include_indices': True, 'ast_nodes': True})):
+        used = measure(Parser(dict(options, allow_tags = True)), catalogs)
+        results.append((label, used))
+
+    print('{} messages'.format(count))
+    for label, used in results:
+        print('{:<24} {:>8.1f} MB {:>8.0f} bytes/message'.format(label, used / 1e6, used / count))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+"""
+Measures Parser.parse_many on a multi-locale catalog, serially and across
+a growing number of worker processes.
+
+    python bench/bench_parse_many.py [messages] [max workers]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import corpus
+from pyicumessageformat import Parser
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    most = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 1)
+
+    # Simulate several locales of the same catalog.
+    messages = {}
+    for locale in range(size // 10000 or 1):
+        for key, value in corpus.catalog(min(size, 10000), seed = locale).items():
+            messages['{}:{}'.format(locale, key)] = value
+
+    parser = Parser({'allow_tags': True})
+    print('{} messages, {} CPUs'.format(len(messages), os.cpu_count()))
+
+    baseline = None
+    workers = 1
+    while workers <= most:
+        start = time.perf_counter()
+        results, errors = parser.parse_many(messages, workers = workers, chunk_size = 2000)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print('workers={:<3} {:>8.2f} s {:>10,.0f} msg/s {:>6.2f}x'.format(
+            workers, elapsed, len(messages) / elapsed, baseline / elapsed))
+        workers *= 2
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Plural category lookups per second for a few locales and kinds of values,
+comparing the compiled rules in pyicumessageformat.plural with evaluating
+the same CLDR rules by walking them on every lookup. "str, 200" uses
+200 different strings, so that most lookups are memoized.
+
+    python bench/bench_plural.py [lookups]
+"""
+
+import os
+import random
+import sys
+import timeit
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pyicumessageformat import plural
+
+LOCALES = ('en', 'fr', 'ru', 'pl', 'ar', 'cy', 'ja')
+
+
+def interpreted(locale):
+    # Walks the parsed rules for every value, working out the operands
+    # each time, as a straightforward evaluator would.
+    rules = [
+        (category, plural.parseRule(rule))
+        for category, rule in plural.findRules(locale, False).items()
+    ]
+    def select(value):
+        if isinstance(value, int):
+            i, v, w, f, t, e = abs(value), 0, 0, 0, 0, 0
+        else:
+            i, v, w, f, t, e = plural.decimalOperands(repr(value) if isinstance(value, float) else str(value))
+        values = {'n': i, 'i': i, 'v': v, 'w': w, 'f': f, 't': t, 'e': e}
+        for category, conditions in rules:
+            for relations in conditions:
+                for operand, modulus, negate, ranges in relations:
+                    if operand == 'n' and f != 0:
+                        matched = False
+                    else:
+                        x = values[operand]
+                        if modulus is not None:
+                            x = x % modulus
+                        matched = any(low <= x <= high for low, high in ranges)
+                    if matched == negate:
+                        break
+                else:
+                    return category
+        return 'other'
+
+    return select
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    rng = random.Random(0)
+    ints = [rng.randrange(0, 1000) for _ in range(count)]
+    kinds = (
+        ('int', ints),
+        ('float', [x + rng.choice((0.5, 0.25, 0.1)) for x in ints]),
+        ('str', ['{}.{}'.format(x, rng.randrange(0, 100)) for x in ints]),
+        ('str, 200', ['{}.{}'.format(x % 25, x % 8) for x in ints]),
+        ('Decimal', [Decimal('{}.{}'.format(x, rng.randrange(0, 10))) for x in ints])
+    )
+
+    print('{} lookups, millions per second'.format(count))
+    print('{:<8} {:<9} {:>12} {:>10} {:>8}'.format('locale', 'values', 'interpreted', 'compiled', ''))
+    for locale in LOCALES:
+        slow = interpreted(locale)
+        fast = plural.plural_rules(locale)
+        for label, values in kinds:
+            for value in values[:1000]:
+                assert slow(value) == fast(value), (locale, value)
+
+            before = min(timeit.repeat(lambda: [slow(x) for x in values], number = 1, repeat = 3))
+            after = min(timeit.repeat(lambda: [fast(x) for x in values], number = 1, repeat = 3))
+            print('{:<8} {:<9} {:>12.2f} {:>10.2f} {:>7.1f}x'.format(
+                locale, label, count / before / 1e6, count / after / 1e6, before / after))
+
+
+if __name__ == '__main__':
+    main()
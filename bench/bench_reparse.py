@@ -0,0 +1,73 @@
+"""
+Compares Parser.reparse with parsing the whole message again after every
+keystroke, as an editor keeping an AST and tokens up to date would, for a
+few messages several kilobytes long.
+
+    python bench/bench_reparse.py [keystrokes]
+"""
+
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import corpus
+from pyicumessageformat import Parser
+
+
+def document(rng, parts):
+    makers = (corpus.placeholders, corpus.plural, corpus.select, corpus.tagged)
+    return ' '.join(rng.choice(makers)(rng) for _ in range(parts))
+
+
+def keystrokes(rng, message, count):
+    # Typing a letter between two words and deleting it again, either
+    # between placeholders or inside a sub-message.
+    positions = [
+        i for i in range(1, len(message) - 1)
+        if message[i] == ' ' and message[i - 1].isalpha() and message[i + 1].isalpha()
+    ]
+    edits = []
+    for _ in range(count // 2):
+        offset = rng.choice(positions)
+        edits.append((offset, 0, 'x'))
+        edits.append((offset, 1, ''))
+    return edits
+
+
+def parseEach(parser, message, edits):
+    for offset, removed, inserted in edits:
+        tokens = []
+        message = message[:offset] + inserted + message[offset + removed:]
+        parser.parse(message, tokens)
+
+
+def reparseEach(parser, message, edits):
+    tokens = []
+    ast = parser.parse(message, tokens)
+    for edit in edits:
+        message, ast = parser.reparse(message, ast, edit, tokens)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    parser = Parser({'allow_tags': True, 'include_indices': True})
+
+    for parts in (10, 50, 200):
+        rng = random.Random(parts)
+        message = document(rng, parts)
+        edits = keystrokes(rng, message, count)
+
+        results = []
+        for label, fn in (('parse', parseEach), ('reparse', reparseEach)):
+            best = min(timeit.repeat(lambda: fn(parser, message, edits), number = 1, repeat = 5))
+            results.append(best)
+            print('{:>6} chars {:<8} {:>8.1f} us/edit {:>6.2f}x'.format(
+                len(message), label, best / count * 1e6, results[0] / best))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+"""
+Compares loading a serialized catalog against parsing it again.
+
+    python bench/bench_serialize.py [messages]
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import corpus
+from pyicumessageformat import Parser, serialize
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    messages = corpus.catalog(size)
+
+    for label, options in (('dict', {}), ('ast_nodes', {'ast_nodes': True})):
+        parser = Parser(dict(options, allow_tags = True))
+        parsed = {key: parser.parse(value) for key, value in messages.items()}
+        data = serialize.dumps(parsed, parser)
+        assert serialize.loads(data, parser) == parsed
+
+        parse = min(timeit.repeat(
+            lambda: {key: parser.parse(value) for key, value in messages.items()},
+            number = 1, repeat = 3))
+        load = min(timeit.repeat(lambda: serialize.loads(data, parser), number = 1, repeat = 3))
+
+        print('{:<10} {} messages, {:.1f} MB: parse {:.3f} s, load {:.3f} s ({:.0f}x)'.format(
+            label, size, len(data) / 1e6, parse, load, parse / load))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+"""
+Measures Parser.parse throughput on text-dominated catalogs, which is
+where Parser._parseText spends most of its time.
+
+    python bench/bench_text.py
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import corpus
+from pyicumessageformat import Parser
+
+
+def run(label, parser, messages, repeat = 5):
+    total = sum(len(x) for x in messages)
+
+    def work():
+        for message in messages:
+            parser.parse(message)
+
+    best = min(timeit.repeat(work, number = 1, repeat = repeat))
+    print('{:<24} {:>9.1f} ms {:>12,.0f} msg/s {:>8.2f} MB/s'.format(
+        label, best * 1000, len(messages) / best, total / best / 1e6))
+
+
+def main():
+    plain = Parser()
+    tags = Parser({'allow_tags': True})
+
+    run('catalog', plain, list(corpus.catalog(10000).values()))
+    run('catalog (tags)', tags, list(corpus.catalog(10000).values()))
+    run('prose', plain, corpus.corpus(corpus.prose, 500))
+    run('prose (tags)', tags, corpus.corpus(corpus.prose, 500))
+    run('short ui', plain, corpus.corpus(corpus.short_ui, 10000))
+
+
+if __name__ == '__main__':
+    main()
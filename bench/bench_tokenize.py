@@ -0,0 +1,55 @@
+"""
+Compares Parser.tokenize with parsing into a token list, both for reading
+every token and for stopping after the first few, as a highlighter that
+only draws the visible part of a message would.
+
+    python bench/bench_tokenize.py [messages]
+"""
+
+import os
+import sys
+import timeit
+from itertools import islice
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import corpus
+from pyicumessageformat import Parser
+
+
+def parseTokens(parser, messages):
+    for message in messages:
+        tokens = []
+        try:
+            parser.parse(message, tokens)
+        except SyntaxError:
+            pass
+
+
+def tokenize(parser, messages):
+    for message in messages:
+        for token in parser.tokenize(message):
+            pass
+
+
+def tokenizeFirst(parser, messages):
+    for message in messages:
+        for token in islice(parser.tokenize(message), 5):
+            pass
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    parser = Parser({'allow_tags': True})
+    messages = list(corpus.catalog(size).values())
+
+    results = []
+    for label, fn in (('parse(tokens)', parseTokens), ('tokenize', tokenize), ('tokenize[:5]', tokenizeFirst)):
+        best = min(timeit.repeat(lambda: fn(parser, messages), number = 1, repeat = 7))
+        results.append(best)
+        print('{:<14} {:>8.3f} ms {:>6.2f}x'.format(label, best * 1e3, results[0] / best))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""
+Compares Parser.validate and Parser.placeholders with Parser.parse, as a
+lint step checking every message of a catalog would use them.
+
+    python bench/bench_validate.py [messages]
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import corpus
+from pyicumessageformat import Parser
+
+
+def parse(parser, messages):
+    for message in messages:
+        try:
+            parser.parse(message)
+        except SyntaxError:
+            pass
+
+
+def validate(parser, messages):
+    for message in messages:
+        parser.validate(message)
+
+
+def placeholders(parser, messages):
+    for message in messages:
+        try:
+            parser.placeholders(message)
+        except SyntaxError:
+            pass
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    parser = Parser({'allow_tags': True})
+
+    for label, messages in (
+            ('catalog', list(corpus.catalog(size).values())),
+            ('placeholders', corpus.corpus(corpus.placeholders, size)),
+            ('plural', corpus.corpus(corpus.plural, size))):
+        results = []
+        for name, fn in (('parse', parse), ('validate', validate), ('placeholders', placeholders)):
+            best = min(timeit.repeat(lambda: fn(parser, messages), number = 1, repeat = 7))
+            results.append(best)
+            print('{:<13} {:<13} {:>8.3f} ms {:>6.2f}x'.format(label, name, best * 1e3, results[0] / best))
+
+
+if __name__ == '__main__':
+    main()
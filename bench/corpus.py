@@ -0,0 +1,121 @@
+"""
+Deterministic message corpora shaped like real translation catalogs,
+shared by the benchmark scripts in this directory.
+"""
+
+import random
+
+
+WORDS = (
+    'account', 'the', 'your', 'settings', 'were', 'saved', 'to', 'and',
+    'please', 'try', 'again', 'later', 'privacy', 'policy', 'of', 'you',
+    'can', 'change', 'this', 'at', 'any', 'time', 'from', 'profile', 'page',
+    'message', 'photos', 'shared', 'with', 'team', 'members', 'by', 'email',
+    'download', 'upload', 'file', 'is', 'too', 'large', 'for', 'a', 'an'
+)
+
+NAMES = ('name', 'count', 'user', 'total', 'date', 'amount', 'link', 'n')
+
+
+def words(rng, count):
+    return ' '.join(rng.choice(WORDS) for _ in range(count))
+
+
+def sentence(rng, count):
+    text = words(rng, count)
+    return text[0].upper() + text[1:] + '.'
+
+
+def short_ui(rng):
+    return sentence(rng, rng.randint(1, 6))
+
+
+def placeholders(rng):
+    out = []
+    for _ in range(rng.randint(1, 3)):
+        out.append(words(rng, rng.randint(1, 5)))
+        out.append('{' + rng.choice(NAMES) + '}')
+    out.append(words(rng, rng.randint(0, 4)))
+    return ' '.join(out)
+
+
+def formatted(rng):
+    return '{} {{{}, number, integer}} {} {{date, date, short}}.'.format(
+        words(rng, 3), rng.choice(NAMES), words(rng, 4))
+
+
+def plural(rng):
+    name = rng.choice(NAMES)
+    return ('{} {{{}, plural, offset:1 =0 {{{}}} one {{# {}}} '
+            'other {{# {} {{user}}}}}}').format(
+        words(rng, 3), name, words(rng, 2), words(rng, 2), words(rng, 3))
+
+
+def select(rng):
+    return ('{{gender, select, male {{{}}} female {{{}}} '
+            'other {{{}}}}}').format(
+        words(rng, 4), words(rng, 4), words(rng, 4))
+
+
+def prose(rng):
+    paragraphs = []
+    for _ in range(rng.randint(3, 8)):
+        paragraphs.append(' '.join(
+            sentence(rng, rng.randint(8, 20)) for _ in range(5)))
+    text = '\n\n'.join(paragraphs)
+    return text.replace(' you ', " you'll ", 2)
+
+
+def tagged(rng):
+    return '{} <b>{}</b> <link>{{{}}}</link> {}'.format(
+        words(rng, 3), words(rng, 2), rng.choice(NAMES), words(rng, 4))
+
+
+def markup(rng, prefix = ''):
+    out = []
+    for _ in range(rng.randint(2, 5)):
+        tag = prefix + rng.choice(('b', 'i', 'link', 'em'))
+        inner = words(rng, rng.randint(1, 3))
+        if rng.random() < 0.3:
+            inner = '<{0}{1}>{2}</{0}{1}> {{{3}}}'.format(
+                prefix, 'strong', inner, rng.choice(NAMES))
+        out.append('{} <{}>{}</{}>'.format(words(rng, rng.randint(1, 4)), tag, inner, tag))
+        if rng.random() < 0.2:
+            out.append('<{}br/>'.format(prefix))
+    return ' '.join(out)
+
+
+def nested(rng, depth):
+    message = words(rng, 2)
+    for level in range(depth):
+        message = ('{{v{}, select, a {{{} {}}} other {{{}}}}}').format(
+            level, words(rng, 1), message, words(rng, 2))
+    return message
+
+
+# Relative weights loosely based on the shape of real product catalogs,
+# where plain strings and simple placeholders make up the vast majority.
+MIX = (
+    (short_ui, 45),
+    (placeholders, 25),
+    (formatted, 8),
+    (plural, 8),
+    (select, 5),
+    (tagged, 5),
+    (prose, 4)
+)
+
+
+def catalog(size = 10000, seed = 1234, mix = MIX):
+    rng = random.Random(seed)
+    makers = [maker for maker, _ in mix]
+    weights = [weight for _, weight in mix]
+    return {
+        'msg.{}'.format(i): rng.choices(makers, weights)[0](rng)
+        for i in range(size)
+    }
+
+
+def corpus(maker, size = 1000, seed = 1234):
+    rng = random.Random(seed)
+    return [maker(rng) for _ in range(size)]
@@ -0,0 +1,162 @@
+"""
+Parser.parse throughput across catalog shapes and parser options, as a
+single suite whose results can be saved and compared between commits.
+
+    python bench/run.py                      # run everything
+    python bench/run.py -k tags              # only cases matching "tags"
+    python bench/run.py --json before.json   # save the results
+    python bench/run.py --compare before.json
+
+Every case parses the same deterministic corpus, and reports the best of
+several runs in messages and megabytes of input per second.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import timeit
+from functools import partial
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import corpus
+from pyicumessageformat import Parser
+
+
+def catalog(size):
+    return list(corpus.catalog(size).values())
+
+
+def shaped(maker, size):
+    return corpus.corpus(maker, size)
+
+
+# The deepest nesting the default maximum_depth accepts.
+MAX_NESTING = Parser().options['maximum_depth'] - 1
+
+# name, corpus factory, corpus size, parser options
+CORPORA = (
+    ('catalog', catalog, 10000, {}),
+    ('short_ui', partial(shaped, corpus.short_ui), 10000, {}),
+    ('placeholders', partial(shaped, corpus.placeholders), 10000, {}),
+    ('plural', partial(shaped, corpus.plural), 5000, {}),
+    ('prose', partial(shaped, corpus.prose), 500, {}),
+    ('nested_10', partial(shaped, partial(corpus.nested, depth = 10)), 1000, {}),
+    ('nested_max', partial(shaped, partial(corpus.nested, depth = MAX_NESTING)), 200, {}),
+    ('tags', partial(shaped, corpus.markup), 5000, {'allow_tags': True}),
+    ('tags_strict', partial(shaped, corpus.markup), 5000, {'allow_tags': True, 'strict_tags': True}),
+    ('tags_prefix', partial(shaped, partial(corpus.markup, prefix = 'x:')), 5000,
+        {'allow_tags': True, 'tag_prefix': 'x:'})
+)
+
+# Every corpus is also run collecting tokens, with include_indices, and
+# with the iterative parser.
+VARIANTS = (
+    ('', {}, False),
+    ('+tokens', {}, True),
+    ('+indices', {'include_indices': True}, False),
+    ('+iterative', {'iterative': True}, False)
+)
+
+
+def cases():
+    for name, factory, size, options in CORPORA:
+        for suffix, extra, tokens in VARIANTS:
+            yield name + suffix, factory, size, dict(options, **extra), tokens
+
+
+def measure(parser, messages, tokens, repeat):
+    if tokens:
+        def work():
+            for message in messages:
+                parser.parse(message, [])
+    else:
+        def work():
+            for message in messages:
+                parser.parse(message)
+
+    work()
+    return min(timeit.repeat(work, number = 1, repeat = repeat))
+
+
+def revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd = ROOT,
+            capture_output = True, text = True, check = True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(pattern, repeat, scale):
+    messages = {}
+    results = []
+    for name, factory, size, options, tokens in cases():
+        if pattern and pattern not in name:
+            continue
+
+        size = max(1, int(size * scale))
+        key = (factory, size)
+        if key not in messages:
+            messages[key] = factory(size)
+        inputs = messages[key]
+
+        seconds = measure(Parser(options), inputs, tokens, repeat)
+        total = sum(len(x.encode('utf-8')) for x in inputs)
+        results.append({
+            'name': name,
+            'options': options,
+            'tokens': tokens,
+            'messages': len(inputs),
+            'bytes': total,
+            'seconds': seconds,
+            'messages_per_second': len(inputs) / seconds,
+            'bytes_per_second': total / seconds
+        })
+        yield results[-1]
+
+
+def main(argv = None):
+    args = argparse.ArgumentParser(description = 'Parser benchmark suite.')
+    args.add_argument('-k', dest = 'pattern', help = 'only run cases containing this string')
+    args.add_argument('--repeat', type = int, default = 5, help = 'runs per case, the best is kept')
+    args.add_argument('--scale', type = float, default = 1.0, help = 'multiply corpus sizes by this')
+    args.add_argument('--json', metavar = 'PATH', help = 'write the results to this file')
+    args.add_argument('--compare', metavar = 'PATH', help = 'compare against earlier results')
+    args = args.parse_args(argv)
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = {result['name']: result for result in json.load(file)['results']}
+
+    results = []
+    for result in run(args.pattern, args.repeat, args.scale):
+        results.append(result)
+        line = '{:<26} {:>12,.0f} msg/s {:>8.2f} MB/s'.format(
+            result['name'], result['messages_per_second'], result['bytes_per_second'] / 1e6)
+
+        before = baseline.get(result['name'])
+        if before:
+            line += ' {:>7.2f}x'.format(result['messages_per_second'] / before['messages_per_second'])
+        print(line, flush = True)
+
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump({
+                'revision': revision(),
+                'python': platform.python_version(),
+                'implementation': platform.python_implementation(),
+                'machine': platform.machine(),
+                'results': results
+            }, file, indent = 2)
+
+
+if __name__ == '__main__':
+    main()
@@ -1 +1,7 @@
+__version__ = '1.1.0'
+
 from .parser import Parser
+from .compiler import Compiler
+from .errors import MessageFormatSyntaxError
+from .catalog import Catalog
+from .filecache import FileCache
@@ -0,0 +1,69 @@
+from collections import OrderedDict, namedtuple
+from threading import Lock
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'evictions', 'maxsize', 'currsize'])
+
+
+def copyAST(ast):
+    return [node if isinstance(node, str) else copyNode(node) for node in ast]
+
+
+def copyNode(node):
+    node = dict(node)
+    if 'options' in node:
+        node['options'] = {
+            selector: copyAST(message)
+            for selector, message in node['options'].items()
+        }
+    if 'contents' in node:
+        node['contents'] = copyAST(node['contents'])
+    return node
+
+
+def copyTokens(tokens):
+    return [dict(token) for token in tokens]
+
+
+class LRUCache:
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._lock = Lock()
+
+
+    def get(self, key):
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last = False)
+                self.evictions += 1
+
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+
+    def info(self):
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.evictions, self.maxsize, len(self._data))
@@ -0,0 +1,101 @@
+from collections import namedtuple
+from collections.abc import Mapping
+from threading import Thread
+
+from .parser import Parser
+
+CatalogInfo = namedtuple('CatalogInfo', ['entries', 'materialized', 'errors'])
+
+
+class Catalog(Mapping):
+    def __init__(self, messages, parser = None):
+        if parser is None:
+            parser = Parser()
+        elif not isinstance(parser, Parser):
+            raise TypeError("parser must be Parser or None")
+
+        self.parser = parser
+
+        if isinstance(messages, Mapping):
+            self._messages = dict(messages)
+        else:
+            self._messages = dict(enumerate(messages))
+
+        self._parsed = {}
+        self._errors = {}
+
+
+    def __getitem__(self, key):
+        try:
+            return self._parsed[key]
+        except KeyError:
+            pass
+
+        message = self._messages[key]
+        err = self._errors.get(key)
+        if err is None:
+            err = self._materialize(key, message)
+            if err is None:
+                return self._parsed[key]
+
+        # The same error is raised for every lookup, and would otherwise
+        # add to its traceback each time, keeping every frame alive.
+        raise err.with_traceback(None)
+
+
+    def __iter__(self):
+        return iter(self._messages)
+
+
+    def __len__(self):
+        return len(self._messages)
+
+
+    def __contains__(self, key):
+        return key in self._messages
+
+
+    def message(self, key):
+        return self._messages[key]
+
+
+    def warm(self, keys = None, background = False):
+        if keys is None:
+            keys = list(self._messages)
+
+        if not background:
+            self._warm(keys)
+            return None
+
+        thread = Thread(target = self._warm, args = (keys,), daemon = True)
+        thread.start()
+        return thread
+
+
+    def stats_info(self):
+        return CatalogInfo(len(self._messages), len(self._parsed), len(self._errors))
+
+
+    def _warm(self, keys):
+        # Lists of hot ids are usually gathered from an older build, so
+        # ids that are no longer in the catalog are skipped.
+        messages = self._messages
+        parsed = self._parsed
+        errors = self._errors
+        for key in keys:
+            message = messages.get(key)
+            if message is not None and key not in parsed and key not in errors:
+                self._materialize(key, message)
+
+
+    def _materialize(self, key, message):
+        # A lookup and a warm-up in another thread can both parse the same
+        # message. setdefault keeps whichever finished first, so every
+        # caller is handed the same AST.
+        try:
+            ast = self.parser.parse(message)
+        except SyntaxError as err:
+            return self._errors.setdefault(key, err.with_traceback(None))
+
+        self._parsed.setdefault(key, ast)
+        return None
@@ -0,0 +1,225 @@
+from decimal import Decimal
+
+from .plural import plural_rules
+
+
+def toNumber(value):
+    if isinstance(value, str):
+        value = Decimal(value)
+        if value == value.to_integral_value():
+            return int(value)
+    return value
+
+
+def defaultTag(name, contents):
+    if contents is None:
+        return '<' + name + '/>'
+    return '<' + name + '>' + contents + '</' + name + '>'
+
+
+def defaultPlural(value, ordinal):
+    return 'other'
+
+
+def localePlural(locale):
+    cardinal = plural_rules(locale)
+    ordinals = plural_rules(locale, True)
+
+    def plural(value, ordinal):
+        return ordinals(value) if ordinal else cardinal(value)
+
+    return plural
+
+
+class Compiler:
+    def __init__(self, options = None):
+        self.options = {
+            'formatters': {},
+            'locale': None,
+            'plural': defaultPlural,
+            'tag': defaultTag,
+            'tag_type': 'tag',
+            'subnumeric_types': ['plural', 'selectordinal'],
+            'ordinal_types': ['selectordinal']
+        }
+
+        if isinstance(options, dict):
+            self.options.update(options)
+
+        # A locale picks the built-in CLDR plural rules, unless a plural
+        # function is given as well.
+        if self.options['locale'] is not None and self.options['plural'] is defaultPlural:
+            self.options['plural'] = localePlural(self.options['locale'])
+
+
+    def compile(self, ast):
+        if not isinstance(ast, list):
+            raise TypeError("ast must be list")
+
+        # Each message becomes the source of one Python function, with
+        # a helper function for every select and plural. This is then
+        # compiled once, so formatting never has to look at the AST.
+        context = {
+            'functions': [],
+            'namespace': {
+                'Decimal': Decimal,
+                '_plural': self.options['plural'],
+                '_tag': self.options['tag']
+            },
+            'count': 0
+        }
+
+        # Both walking the AST and compiling the source it becomes are
+        # limited in how deeply they can nest.
+        try:
+            expr = self._compileAST(context, ast, None)
+            source = '\n'.join(context['functions'] + [
+                'def format(values):',
+                '    return ' + expr
+            ])
+            code = compile(source, '<message>', 'exec')
+        except (RecursionError, SyntaxError):
+            raise ValueError("ast is nested too deeply")
+
+        namespace = context['namespace']
+        exec(code, namespace)
+        return namespace['format']
+
+
+    def _compileAST(self, context, ast, plural):
+        fmt = ''
+        args = []
+        for node in ast:
+            if isinstance(node, str):
+                fmt += node.replace('%', '%%')
+            else:
+                fmt += '%s'
+                args.append(self._compileNode(context, node, plural))
+
+        if not args:
+            return repr(fmt.replace('%%', '%'))
+
+        if fmt == '%s':
+            expr, is_str = args[0]
+            return expr if is_str else 'str({})'.format(expr)
+
+        return '{} % ({},)'.format(repr(fmt), ', '.join(expr for expr, _ in args))
+
+
+    def _compileNode(self, context, node, plural):
+        name = node['name']
+        ttype = node.get('type')
+
+        if node.get('hash'):
+            return self._compileHash(context, node, plural)
+
+        if ttype == self.options['tag_type']:
+            return self._compileTag(context, node, plural)
+
+        if 'options' in node:
+            if ttype in self.options['subnumeric_types']:
+                return self._compilePlural(context, node)
+            return self._compileSelect(context, node, plural)
+
+        value = 'values[{!r}]'.format(name)
+        formatter = self.options['formatters'].get(ttype)
+        if formatter is None:
+            return value, False
+
+        return '{}({}, {!r})'.format(self._global(context, formatter), value, node.get('format')), True
+
+
+    def _global(self, context, value):
+        context['count'] += 1
+        name = '_g{}'.format(context['count'])
+        context['namespace'][name] = value
+        return name
+
+
+    def _function(self, context, lines):
+        context['count'] += 1
+        name = '_f{}'.format(context['count'])
+        context['functions'].append('\n'.join(['def {}(values):'.format(name)] + lines))
+        return '{}(values)'.format(name), True
+
+
+    def _compileHash(self, context, node, plural):
+        # Inside a plural's own sub-messages, its number, less any offset,
+        # is the local n.
+        if plural and plural[0] == node['name']:
+            value = 'n'
+        else:
+            value = 'values[{!r}]'.format(node['name'])
+
+        formatter = self.options['formatters'].get('number')
+        if formatter is None:
+            return value, False
+
+        return '{}({}, None)'.format(self._global(context, formatter), value), True
+
+
+    def _compileTag(self, context, node, plural):
+        if 'contents' not in node:
+            return '_tag({!r}, None)'.format(node['name']), True
+
+        contents = self._compileAST(context, node['contents'], plural)
+        return '_tag({!r}, {})'.format(node['name'], contents), True
+
+
+    def _compileSelect(self, context, node, plural):
+        lines = [
+            '    value = values[{!r}]'.format(node['name']),
+            '    if value.__class__ is not str:',
+            '        value = str(value)'
+        ]
+
+        options = node['options']
+        for selector, message in options.items():
+            if selector != 'other':
+                lines.append('    if value == {!r}:'.format(selector))
+                lines.append('        return ' + self._compileAST(context, message, plural))
+
+        lines.append('    return ' + self._compileAST(context, options.get('other', []), plural))
+        return self._function(context, lines)
+
+
+    def _compilePlural(self, context, node):
+        name = node['name']
+        offset = node.get('offset') or 0
+        ordinal = node.get('type') in self.options['ordinal_types']
+
+        # Strings are read as Decimals, which keep the digits they were
+        # written with, such as the fraction digits of 1.0 that plural
+        # rules look at. With no offset, # shows the value as it was given.
+        lines = [
+            '    n = values[{!r}]'.format(name),
+            '    number = Decimal(n) if n.__class__ is str else n'
+        ]
+
+        options = node['options']
+        categories = []
+        for selector, message in options.items():
+            if selector.startswith('='):
+                try:
+                    value = toNumber(selector[1:])
+                except ArithmeticError:
+                    pass
+                else:
+                    lines.append('    if number == {!r}:'.format(value))
+                    lines.append('        return ' + self._compileAST(context, message, (name, offset)))
+                    continue
+
+            if selector != 'other':
+                categories.append((selector, message))
+
+        if offset:
+            lines.append('    n = number = number - {}'.format(offset))
+
+        if categories:
+            lines.append('    category = _plural(number, {})'.format(ordinal))
+            for selector, message in categories:
+                lines.append('    if category == {!r}:'.format(selector))
+                lines.append('        return ' + self._compileAST(context, message, (name, offset)))
+
+        lines.append('    return ' + self._compileAST(context, options.get('other', []), (name, offset)))
+        return self._function(context, lines)
@@ -37,4 +37,19 @@ SPACE_CHARS = [
     0xFEFF
 ]
 
+# Character classes, as sets of characters, for constant time lookups.
+SPACES = frozenset(
+    [chr(code) for code in SPACE_CHARS] +
+    [chr(code) for code in range(0x09, 0x0D + 1)] +
+    [chr(code) for code in range(0x2000, 0x200D + 1)]
+)
+
+ALPHA = frozenset('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ')
+
+DIGITS = frozenset('0123456789')
+
+NAME_END = frozenset(VAR_CHARS + [CHAR_SEP, CHAR_HASH, CHAR_ESCAPE]) | SPACES
+
+TAG_NAME_END = NAME_END | frozenset(TAG_CHARS)
+
 CLOSE_TAG = {}
@@ -0,0 +1,41 @@
+MESSAGES = {
+    'expected': 'Expected {expected} at position {position} but found "{found}"',
+    'unexpected': 'Unexpected "{found}" at position {position}',
+    'recursion': 'Too much recursion at position {position}',
+    'syntax': 'Invalid syntax at position {position}'
+}
+
+
+def field(index):
+    return property(lambda self: self.args[index] if index < len(self.args) else None)
+
+
+class MessageFormatSyntaxError(SyntaxError):
+    # Raised as MessageFormatSyntaxError(code, position, expected, found).
+    # Callers checking many messages often only need the fields, so they
+    # are kept as they are in args, and the message is only put together
+    # when something asks for it. SyntaxError.__init__ is skipped, as none
+    # of what it sets up applies here.
+    __init__ = BaseException.__init__
+
+    code = field(0)
+    position = field(1)
+    expected = field(2)
+    found = field(3)
+
+
+    @property
+    def msg(self):
+        return MESSAGES[self.code].format(
+            expected = self.expected,
+            position = self.position,
+            found = self.found if self.found else '<EOF>'
+        )
+
+
+    def __str__(self):
+        return self.msg
+
+
+    def __repr__(self):
+        return '{}({!r})'.format(type(self).__name__, self.msg)
@@ -0,0 +1,211 @@
+import json
+import marshal
+import os
+import sys
+import tempfile
+import time
+from collections import namedtuple
+from hashlib import sha256
+
+from . import __version__
+from .serialize import fingerprint
+
+FileCacheInfo = namedtuple('FileCacheInfo', ['hits', 'misses', 'writes', 'evictions', 'maxsize'])
+
+# Bumped whenever what is stored in an entry changes. Entries are only
+# ever found by a key that includes this, the package version and the
+# parser options, so stale ones are never read, only evicted.
+FILE_FORMAT_VERSION = 1
+
+# Writing an entry takes far less than this, so temporary files older than
+# this were left behind by a process that stopped part way through.
+STALE_TEMP_AGE = 60 * 60
+
+
+def namespace(parser):
+    return json.dumps([
+        FILE_FORMAT_VERSION,
+        __version__,
+        marshal.version,
+        sys.version_info[:2],
+        fingerprint(parser)
+    ], sort_keys = True).encode('utf-8')
+
+
+class FileCache:
+    def __init__(self, directory, maxsize = 256 * 1024 * 1024, min_braces = 6):
+        for key, value in (('maxsize', maxsize), ('min_braces', min_braces)):
+            if isinstance(value, bool) or not isinstance(value, int):
+                raise TypeError("{} must be int".format(key))
+            if value < 0:
+                raise ValueError("{} must not be negative".format(key))
+
+        self.directory = os.fspath(directory)
+        self.maxsize = maxsize
+        # Reading an entry costs about as much as parsing a message with
+        # a few placeholders, so simpler ones are not stored. How long a
+        # message is says little, as text is read very quickly.
+        self.min_braces = min_braces
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self._written = 0
+        self._checked = None
+
+
+    def key(self, namespace, input):
+        digest = sha256(namespace)
+        digest.update(b'\0')
+        digest.update(input.encode('utf-8', 'surrogatepass'))
+        return digest.hexdigest()
+
+
+    def path(self, key):
+        return os.path.join(self.directory, key[:2], key[2:])
+
+
+    def get(self, key):
+        path = self.path(key)
+        try:
+            with open(path, 'rb') as file:
+                data = file.read()
+        except OSError:
+            self.misses += 1
+            return None
+
+        try:
+            ast = marshal.loads(data)
+        except (EOFError, ValueError, TypeError):
+            # Not something this wrote. Treat it as missing, and let the
+            # next put replace it.
+            self.misses += 1
+            return None
+
+        # Eviction goes by modification time, so entries that are still
+        # read are kept the longest.
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        self.hits += 1
+        return ast
+
+
+    def put(self, key, ast):
+        path = self.path(key)
+        folder = os.path.dirname(path)
+        data = marshal.dumps(ast)
+
+        # Written to a temporary file first and then moved into place, so
+        # that other processes only ever see complete entries.
+        try:
+            try:
+                fd, temp = tempfile.mkstemp(dir = folder, prefix = '.tmp-')
+            except FileNotFoundError:
+                os.makedirs(folder, exist_ok = True)
+                fd, temp = tempfile.mkstemp(dir = folder, prefix = '.tmp-')
+        except OSError:
+            return
+
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                file.write(data)
+            os.replace(temp, path)
+        except OSError:
+            try:
+                os.remove(temp)
+            except OSError:
+                pass
+            return
+
+        self.writes += 1
+        self._written += len(data)
+
+        # The directory is also checked the first time each process writes
+        # to it, so that many processes that each write little still keep
+        # it in check. Comparing the process id covers forked and pickled
+        # copies of this FileCache as well.
+        pid = os.getpid()
+        if self._checked != pid or self._written * 8 >= self.maxsize:
+            self._checked = pid
+            self._written = 0
+            self.evict()
+
+
+    def evict(self):
+        # Several processes can share the directory, so nothing is kept
+        # about its size here. Instead it is checked every so often, and
+        # the oldest entries removed until it is well under the limit.
+        entries = []
+        total = 0
+        stale = time.time() - STALE_TEMP_AGE
+        for folder in self._folders():
+            try:
+                with os.scandir(folder) as it:
+                    for entry in it:
+                        try:
+                            stat = entry.stat()
+                        except OSError:
+                            continue
+                        if entry.name.startswith('.'):
+                            if entry.name.startswith('.tmp-') and stat.st_mtime < stale:
+                                try:
+                                    os.remove(entry.path)
+                                except OSError:
+                                    pass
+                            continue
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+                        total += stat.st_size
+            except OSError:
+                continue
+
+        if total <= self.maxsize:
+            return
+
+        entries.sort()
+        target = self.maxsize * 3 // 4
+        for mtime, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            self.evictions += 1
+
+
+    def clear(self):
+        for folder in self._folders():
+            try:
+                with os.scandir(folder) as it:
+                    for entry in it:
+                        try:
+                            os.remove(entry.path)
+                        except OSError:
+                            pass
+            except OSError:
+                continue
+
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self._written = 0
+
+
+    def info(self):
+        return FileCacheInfo(self.hits, self.misses, self.writes, self.evictions, self.maxsize)
+
+
+    def _folders(self):
+        try:
+            with os.scandir(self.directory) as it:
+                return [
+                    entry.path for entry in it
+                    if len(entry.name) == 2 and entry.is_dir()
+                ]
+        except OSError:
+            return []
@@ -0,0 +1,75 @@
+import gc
+from collections.abc import Mapping
+
+from .nodes import Plural, Select, Tag, fromDict, toDict
+from .serialize import mapLeaves
+
+
+def freeze(ast, tag_type = 'tag', strings = None):
+    if strings is None:
+        strings = {}
+    if isinstance(ast, tuple):
+        return freezeNodes(ast, strings)
+    return fromDict(ast, tag_type, strings)
+
+
+def freezeNodes(ast, strings):
+    # Nodes are only replaced when some of their text was already seen
+    # elsewhere, so that as few objects as possible are freed and
+    # allocated again while freezing.
+    out = []
+    changed = False
+    for node in ast:
+        if isinstance(node, str):
+            shared = strings.setdefault(node, node)
+        else:
+            shared = freezeNode(node, strings)
+        changed = changed or shared is not node
+        out.append(shared)
+
+    return tuple(out) if changed else ast
+
+
+def freezeNode(node, strings):
+    cls = type(node)
+    if cls is Tag:
+        if node.contents is None:
+            return node
+        contents = freezeNodes(node.contents, strings)
+        return node if contents is node.contents else node._replace(contents = contents)
+
+    if cls is Select or cls is Plural:
+        options = []
+        changed = False
+        for selector, message in node.options:
+            shared = freezeNodes(message, strings)
+            changed = changed or shared is not message
+            options.append((selector, shared))
+        return node._replace(options = tuple(options)) if changed else node
+
+    return node
+
+
+def thaw(ast):
+    if isinstance(ast, tuple):
+        return toDict(ast)
+    return ast
+
+
+def freeze_catalog(catalog, tag_type = 'tag', gc_freeze = False):
+    if not isinstance(catalog, Mapping):
+        raise TypeError("catalog must be a mapping")
+
+    # One table for the whole catalog, so that text repeated between
+    # messages, or locales, is only kept once.
+    strings = {}
+    frozen = mapLeaves(catalog, lambda ast: freeze(ast, tag_type, strings))
+
+    if gc_freeze:
+        # Garbage left over from parsing is collected first, so that it
+        # is not kept alive in every worker.
+        gc.collect()
+        if hasattr(gc, 'freeze'):
+            gc.freeze()
+
+    return frozen
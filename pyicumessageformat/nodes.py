@@ -0,0 +1,136 @@
+from collections import namedtuple
+from sys import intern
+
+# Compact, immutable alternatives to the dict AST. Text is kept as plain
+# strings, and every node is a tuple subclass without an instance dict.
+# Children are tuples, and sub-messages are a tuple of (selector, AST)
+# pairs in their original order.
+
+
+class Argument(namedtuple('Argument', ['name', 'type', 'format', 'start', 'end'])):
+    __slots__ = ()
+
+
+class Select(namedtuple('Select', ['name', 'type', 'options', 'start', 'end'])):
+    __slots__ = ()
+
+    def option(self, selector):
+        for key, message in self.options:
+            if key == selector:
+                return message
+        return None
+
+
+class Plural(namedtuple('Plural', ['name', 'type', 'offset', 'options', 'start', 'end'])):
+    __slots__ = ()
+
+    option = Select.option
+
+
+class Hash(namedtuple('Hash', ['name', 'start', 'end'])):
+    __slots__ = ()
+
+    type = 'number'
+
+
+class Tag(namedtuple('Tag', ['name', 'type', 'contents', 'start', 'end'])):
+    __slots__ = ()
+
+
+NODE_TYPES = (Argument, Select, Plural, Hash, Tag)
+
+ARGUMENT_KEYS = frozenset(['name', 'type', 'format', 'start', 'end'])
+SELECT_KEYS = frozenset(['name', 'type', 'options', 'start', 'end'])
+PLURAL_KEYS = SELECT_KEYS | frozenset(['offset'])
+HASH_KEYS = frozenset(['name', 'type', 'hash', 'start', 'end'])
+TAG_KEYS = frozenset(['name', 'type', 'contents', 'start', 'end'])
+
+
+def internOrNone(value):
+    return None if value is None else intern(value)
+
+
+def fromDict(ast, tag_type = 'tag', strings = None):
+    # With strings, text is shared through it as well, as freeze does.
+    if strings is not None:
+        return tuple(
+            strings.setdefault(node, node) if isinstance(node, str) else nodeFromDict(node, tag_type, strings)
+            for node in ast
+        )
+
+    return tuple(
+        node if isinstance(node, str) else nodeFromDict(node, tag_type)
+        for node in ast
+    )
+
+
+def nodeFromDict(node, tag_type, strings = None):
+    keys = node.keys()
+    name = intern(node['name'])
+    ttype = node.get('type')
+    start = node.get('start')
+    end = node.get('end')
+
+    if node.get('hash') is True and ttype == 'number' and keys <= HASH_KEYS:
+        return Hash(name, start, end)
+
+    if ttype == tag_type and keys <= TAG_KEYS:
+        contents = node.get('contents')
+        return Tag(name, intern(ttype), None if contents is None else fromDict(contents, tag_type, strings), start, end)
+
+    if 'options' in node:
+        options = tuple(
+            (intern(selector), fromDict(message, tag_type, strings))
+            for selector, message in node['options'].items()
+        )
+        if 'offset' in node and keys <= PLURAL_KEYS:
+            return Plural(name, internOrNone(ttype), node['offset'], options, start, end)
+        if keys <= SELECT_KEYS:
+            return Select(name, internOrNone(ttype), options, start, end)
+
+    elif keys <= ARGUMENT_KEYS:
+        return Argument(name, internOrNone(ttype), internOrNone(node.get('format')), start, end)
+
+    # Anything that does not fit one of the node types, which can only
+    # happen with unusual combinations of options, is kept as it was.
+    return node
+
+
+def toDict(ast):
+    return [
+        node if isinstance(node, (str, dict)) else nodeToDict(node)
+        for node in ast
+    ]
+
+
+def nodeToDict(node):
+    cls = type(node)
+    if cls is Hash:
+        out = {'type': 'number', 'name': node.name, 'hash': True}
+
+    elif cls is Tag:
+        out = {'type': node.type, 'name': node.name}
+        if node.contents is not None:
+            out['contents'] = toDict(node.contents)
+
+    else:
+        out = {'name': node.name}
+        if node.type is not None:
+            out['type'] = node.type
+
+        if cls is Argument:
+            if node.format is not None:
+                out['format'] = node.format
+        else:
+            if cls is Plural:
+                out['offset'] = node.offset
+            out['options'] = {
+                selector: toDict(message)
+                for selector, message in node.options
+            }
+
+    if node.start is not None:
+        out['start'] = node.start
+    if node.end is not None:
+        out['end'] = node.end
+    return out
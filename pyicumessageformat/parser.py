@@ -1,76 +1,357 @@
+import os
+import re
+from collections import namedtuple
+from collections.abc import Mapping
+from itertools import islice, repeat
+
 from . import constants
+from .errors import MessageFormatSyntaxError
+from .cache import CacheInfo, LRUCache, copyAST, copyTokens
+from .filecache import FileCache, namespace
+from .nodes import fromDict, toDict
+from .stats import ParserStats
 
 SEP_OR_CLOSE = '{} or {}'.format(constants.CHAR_SEP, constants.CHAR_CLOSE)
 
 
-def appendToken(context, type, text):
-    if 'tokens' in context:
-        context['tokens'].append({
-            'type': type,
-            'text': text
-        })
+def textStop(is_hash_special, is_tag_special):
+    chars = constants.VAR_CHARS + [constants.CHAR_ESCAPE]
+    if is_hash_special:
+        chars.append(constants.CHAR_HASH)
+    if is_tag_special:
+        chars.append(constants.CHAR_TAG_OPEN)
+    return re.compile('[' + re.escape(''.join(chars)) + ']')
+
+
+def charClass(chars, negate = False):
+    return '[' + ('^' if negate else '') + ''.join(re.escape(x) for x in sorted(chars)) + ']'
+
+
+SPACE_RUN = re.compile(charClass(constants.SPACES) + '*').match
+NAME = re.compile(charClass(constants.NAME_END, True) + '*').match
+TAG_NAME = re.compile(charClass(constants.TAG_NAME_END, True) + '*').match
+OFFSET_NUMBER = re.compile('-?[0-9]+').match
+
+# Patterns that find the next character _parseText has to look at,
+# keyed by (is_hash_special, is_tag_special).
+TEXT_STOP = {
+    (is_hash, is_tag): textStop(is_hash, is_tag)
+    for is_hash in (False, True)
+    for is_tag in (False, True)
+}
+
+
+# A {name} placeholder with nothing else in it, which along with plain
+# text makes up most of a typical catalog.
+SIMPLE_PLACEHOLDER = re.compile('{}({}*)({}+)({}*){}'.format(
+    re.escape(constants.CHAR_OPEN), charClass(constants.SPACES),
+    charClass(constants.NAME_END, True), charClass(constants.SPACES),
+    re.escape(constants.CHAR_CLOSE))).match
+
+
+# A problem found by Parser.diagnose, from where it was found to where
+# parsing carried on after it.
+Diagnostic = namedtuple('Diagnostic', ['code', 'message', 'start', 'end'])
+
+
+class Context:
+    __slots__ = ('msg', 'length', 'i', 'depth', 'tokens', 'spans', 'diagnostics', 'build', 'names')
+
+    def __init__(self, msg, tokens = None, spans = False, build = True):
+        self.msg = msg
+        self.length = len(msg)
+        self.i = 0
+        self.depth = 0
+        self.tokens = tokens
+        self.spans = spans
+        self.diagnostics = None
+        # Without build, messages are only checked. Text is not copied
+        # out of the input and nothing is added to the AST, and parsing
+        # returns None rather than a list of nodes. Placeholders are
+        # still read into dicts, as their types and sub-messages are
+        # needed to check what follows them.
+        self.build = build
+        # A dict to add the types of each placeholder name to, if any.
+        self.names = None
+
+
+def appendToken(context, type, start, end, text = None):
+    tokens = context.tokens
+    if tokens is not None:
+        if context.spans:
+            tokens.append((type, start, end))
+        else:
+            # Text that was read without any escapes is the same string
+            # as the input it came from, and can be shared.
+            if text is None or len(text) != end - start:
+                text = context.msg[start:end]
+            tokens.append({
+                'type': type,
+                'text': text
+            })
 
 
 def isAlpha(char: str) -> bool:
-    if not char:
-        return False
-    code = ord(char)
-    return (code >= 97 and code <= 122) or (code >= 65 and code <= 90)
+    return char in constants.ALPHA
 
 
 def isDigit(char: str) -> bool:
-    if not char:
-        return False
-    code = ord(char)
-    return code >= 0x30 and code <= 0x39
+    return char in constants.DIGITS
 
 
 def isSpace(char: str) -> bool:
-    if not char:
-        return False
-    code = ord(char)
-    return code in constants.SPACE_CHARS or \
-        (code >= 0x09 and code <= 0x0D) or \
-        (code >= 0x2000 and code <= 0x200D)
+    return char in constants.SPACES
 
 
 def skipSpace(context, ret = False):
-    msg = context['msg']
-    length = context['length']
-    start = context['i']
-    if start >= length:
+    msg = context.msg
+    start = context.i
+    if start >= context.length:
         return ''
 
-    while context['i'] < length and isSpace(msg[context['i']]):
-        context['i'] += 1
-
+    i = SPACE_RUN(msg, start).end()
+    context.i = i
     if ret:
-        return msg[start:context['i']]
-    elif start < context['i']:
-        appendToken(context, 'space', msg[start:context['i']])
+        return msg[start:i]
+    elif start < i:
+        appendToken(context, 'space', start, i)
 
 
 def recursion(context):
-    raise SyntaxError("Too much recursion at position {}".format(context['i']))
+    return MessageFormatSyntaxError('recursion', context.i)
+
+
+def invalid(context):
+    return MessageFormatSyntaxError('syntax', context.i)
+
+
+def syntaxError(context, err):
+    # RecursionErrors and IndexErrors are reported as syntax errors, as
+    # _parseGeneral explains.
+    if isinstance(err, RecursionError):
+        return recursion(context)
+    if isinstance(err, IndexError):
+        return invalid(context)
+    return err
 
 
 def unexpected(char, index = None):
-    if isinstance(char, dict):
-        index = char['i']
-        return unexpected(char['msg'][index] if index < char['length'] else '<EOF>', index)
+    if isinstance(char, Context):
+        index = char.i
+        return unexpected(char.msg[index] if index < char.length else '<EOF>', index)
 
-    return SyntaxError('Unexpected "{}" at position {}'.format(char, index))
+    return MessageFormatSyntaxError('unexpected', index, None, char)
 
 
 def expected(char, found, index = None):
-    if isinstance(found, dict):
-        index = found['i']
-        return expected(char, found['msg'][index] if index < found['length'] else '<EOF>', index)
+    if isinstance(found, Context):
+        index = found.i
+        return expected(char, found.msg[index] if index < found.length else '<EOF>', index)
+
+    return MessageFormatSyntaxError('expected', index, char, found)
+
+
+def resync(msg, start, position):
+    # Where to carry on after the node starting at start could not be
+    # parsed past position: after the } that closes a placeholder, or
+    # after the closing tag of a tag, or the next > if there is none.
+    length = len(msg)
+    char = msg[start]
+    if char == constants.CHAR_CLOSE:
+        return start + 1
+
+    if char == constants.CHAR_TAG_OPEN:
+        name = msg[start + 1:TAG_NAME(msg, start + 1).end()]
+        end = msg.find(constants.TAG_END + name, position) if name else -1
+        end = msg.find(constants.CHAR_TAG_END, max(end, position))
+        return length if end < 0 else end + 1
+
+    depth = 0
+    for i in range(start, length):
+        char = msg[i]
+        if char == constants.CHAR_OPEN:
+            depth += 1
+        elif char == constants.CHAR_CLOSE:
+            depth -= 1
+            if depth == 0:
+                return max(i + 1, position)
+
+    return length
+
+
+OPTION_NAMES = frozenset([
+    'subnumeric_types',
+    'submessage_types',
+    'maximum_depth',
+    'allow_tags',
+    'strict_tags',
+    'tag_prefix',
+    'tag_type',
+    'include_indices',
+    'loose_submessages',
+    'allow_format_spaces',
+    'require_other',
+    'cache_size',
+    'ast_nodes',
+    'iterative',
+    'intern_strings',
+    'collect_stats',
+    'file_cache'
+])
+
+BOOLEAN_OPTIONS = (
+    'allow_tags',
+    'strict_tags',
+    'include_indices',
+    'loose_submessages',
+    'allow_format_spaces',
+    'ast_nodes',
+    'iterative',
+    'intern_strings',
+    'collect_stats'
+)
+
+
+def typeSet(options, key):
+    value = options[key]
+    if isinstance(value, str) or not isinstance(value, (list, tuple, set, frozenset)) or \
+            not all(isinstance(x, str) for x in value):
+        raise TypeError("{} must be a list of strings".format(key))
+    return frozenset(value)
+
+
+def nonNegativeInt(options, key):
+    value = options[key]
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise TypeError("{} must be int".format(key))
+    if value < 0:
+        raise ValueError("{} must not be negative".format(key))
+    return value
+
+
+def internAST(ast, strings):
+    for node in ast:
+        if isinstance(node, dict):
+            for key in ('name', 'type', 'format'):
+                value = node.get(key)
+                if isinstance(value, str):
+                    node[key] = strings.setdefault(value, value)
+
+            if 'options' in node:
+                node['options'] = {
+                    strings.setdefault(selector, selector): internAST(message, strings)
+                    for selector, message in node['options'].items()
+                }
+            if 'contents' in node:
+                internAST(node['contents'], strings)
+
+    return ast
+
+
+def parseChunk(options, items):
+    # Runs in worker processes, where a cache would not outlive the batch.
+    return Parser(dict(options, cache_size = 0))._parseChunk(items)
+
+
+def parseMessage(options, input, tokens):
+    # Runs in an executor, which may be in another process, so tokens are
+    # returned rather than added to the caller's list.
+    found = [] if tokens else None
+    return Parser(dict(options, cache_size = 0)).parse(input, found), found
+
+
+def chunked(items, size):
+    items = iter(items)
+    while True:
+        chunk = list(islice(items, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def findNode(messages, start, end):
+    # The node in one of the messages that strictly contains start to end.
+    for message in messages:
+        for index, node in enumerate(message):
+            if isinstance(node, dict) and node['start'] < start and end < node['end']:
+                return node, message, index
+    return None
+
+
+def findGap(message, top, length, start, end):
+    # The text, which may be empty, between two nodes of a message that
+    # contains start to end. Returns the slice of the message it fills
+    # and its indices. Where a message starts and ends is only known for
+    # the top level.
+    count = len(message)
+    before = 0 if top else None
+    i = 0
+    while True:
+        j = i + 1 if i < count and isinstance(message[i], str) else i
+        if j < count:
+            after = message[j]['start']
+        else:
+            after = length if top else None
 
-    return SyntaxError('Expected {} at position {} but found "{}"'.format(char, index, found if found else '<EOF>'))
+        if before is not None and after is not None and before <= start and end <= after:
+            return i, j, before, after
+
+        if j >= count:
+            return None
+        before = message[j]['end']
+        i = j + 1
+
+
+def shiftIndices(ast, start, end, delta):
+    # Moves the indices of every node around or after the region from
+    # start to end, which changed length by delta.
+    stack = [ast]
+    while stack:
+        for node in stack.pop():
+            if isinstance(node, dict) and node['end'] > start:
+                if node['start'] >= end:
+                    node['start'] += delta
+                node['end'] += delta
+
+                if 'options' in node:
+                    stack.extend(node['options'].values())
+                elif 'contents' in node:
+                    stack.append(node['contents'])
+
+
+def tokenRange(tokens, length, start, end):
+    # The slice of tokens covering start to end, or None if the tokens do
+    # not line up with them or with the input.
+    first = last = None
+    pos = 0
+    for index, token in enumerate(tokens):
+        if first is None and pos >= start:
+            first = index if pos == start else -1
+        if last is None and pos >= end:
+            last = index if pos == end else -1
+        pos += len(token['text'])
+
+    if pos != length:
+        return None
+    if first is None:
+        first = len(tokens) if pos == start else -1
+    if last is None:
+        last = len(tokens) if pos == end else -1
+    if first < 0 or last < 0:
+        return None
+    return first, last
+
+
+def addName(names, node):
+    if not node.get('hash'):
+        names.setdefault(node['name'], set()).add(node.get('type'))
 
 
 class Parser:
+    # Whether messages that are only text and simple placeholders skip
+    # the general parser. The results are the same either way.
+    _fast_paths = True
+
     def __init__(self, options = None):
         self.options = {
             'subnumeric_types': ['plural', 'selectordinal'],
@@ -83,29 +364,665 @@ class Parser:
             'include_indices': False,
             'loose_submessages': False,
             'allow_format_spaces': True,
-            'require_other': True
+            'require_other': True,
+            'cache_size': 0,
+            'ast_nodes': False,
+            'iterative': False,
+            'intern_strings': False,
+            'collect_stats': False,
+            'file_cache': None
         }
 
         if isinstance(options, dict):
             self.options.update(options)
 
+        self._compileOptions()
+        self._cache = LRUCache(self._cache_size) if self._cache_size else None
+        self._strings = {} if self._intern_strings else None
+        self._stats = None
+        if self._collect_stats:
+            self._stats = ParserStats()
+            self._stats.instrument(self)
+
+
+    def _compileOptions(self):
+        # Options are validated and frozen once, here, so that mistakes
+        # are caught when the Parser is created and the parsing methods
+        # only need to read attributes. Changing self.options afterwards
+        # has no effect. Worker processes and fingerprints are given the
+        # copy in self._options, so they agree with this Parser.
+        options = self.options
+        for key in options:
+            if key not in OPTION_NAMES:
+                raise ValueError("unknown option {}".format(key))
+
+        for key in BOOLEAN_OPTIONS:
+            if not isinstance(options[key], bool):
+                raise TypeError("{} must be bool".format(key))
+            setattr(self, '_' + key, options[key])
+
+        self._subnumeric_types = typeSet(options, 'subnumeric_types')
+        self._submessage_types = typeSet(options, 'submessage_types')
+        self._maximum_depth = nonNegativeInt(options, 'maximum_depth')
+        self._cache_size = nonNegativeInt(options, 'cache_size')
+
+        tag_type = options['tag_type']
+        if not isinstance(tag_type, str) or not tag_type:
+            raise TypeError("tag_type must be a non-empty string")
+        self._tag_type = tag_type
+
+        tag_prefix = options['tag_prefix']
+        if tag_prefix is not None and not isinstance(tag_prefix, str):
+            raise TypeError("tag_prefix must be string or None")
+        self._tag_prefix = tag_prefix or None
+
+        # Either True, for every type with sub-messages, or the set of
+        # types that must have an other sub-message.
+        req = options['require_other']
+        if req == 'all':
+            req = True
+        elif req == 'subnumeric':
+            req = self._subnumeric_types
+        elif req is True:
+            req = self._submessage_types
+        elif req is False or req is None:
+            req = frozenset()
+        elif isinstance(req, (list, tuple, set, frozenset)):
+            req = typeSet(options, 'require_other')
+        else:
+            raise ValueError("require_other must be a bool, 'all', 'subnumeric' or a list of types")
+        self._require_other = req
+
+        # A directory is opened as a FileCache of the default size. Worker
+        # processes given the same options share it.
+        file_cache = options['file_cache']
+        if file_cache is not None and not isinstance(file_cache, FileCache):
+            if not isinstance(file_cache, (str, os.PathLike)):
+                raise TypeError("file_cache must be FileCache, a directory or None")
+            file_cache = FileCache(file_cache)
+        self._file_cache = file_cache
+
+        self._options = {
+            key: tuple(value) if isinstance(value, (list, set, frozenset)) else value
+            for key, value in options.items()
+        }
+        self._file_cache_namespace = namespace(self) if file_cache is not None else None
+
+
+    def cache_info(self):
+        if self._cache is None:
+            return CacheInfo(0, 0, 0, 0, 0)
+        return self._cache.info()
+
+
+    def stats_info(self):
+        if self._stats is None:
+            return None
+        return self._stats.info()
+
+
+    def stats_clear(self):
+        if self._stats is not None:
+            self._stats.clear()
+
+
+    def intern_clear(self):
+        if self._strings is not None:
+            self._strings.clear()
+
+
+    def cache_clear(self):
+        if self._cache is not None:
+            self._cache.clear()
+
 
     def parse(self, input: str, tokens: list = None):
         if not isinstance(input, str):
             raise TypeError("input must be string")
 
-        context = {
-            'msg': input,
-            'length': len(input),
-            'i': 0,
-            'depth': 0
-        }
+        if tokens is not None and not isinstance(tokens, list):
+            raise TypeError("tokens must be list or None")
+
+        context = Context(input, tokens)
 
+        if self._cache is None and self._file_cache is None:
+            return self._parse(context)
+
+        result, key = self._cacheLookup(input, tokens)
+        if result is not None:
+            return result
+
+        first = len(tokens) if tokens is not None else 0
+        return self._cacheStore(input, tokens, first, key, self._parse(context))
+
+
+    async def aparse(self, input: str, tokens: list = None, executor = None, yield_every: int = 4096):
+        if not isinstance(input, str):
+            raise TypeError("input must be string")
+
+        if tokens is not None and not isinstance(tokens, list):
+            raise TypeError("tokens must be list or None")
+
+        if yield_every < 1:
+            raise ValueError("yield_every must be at least 1")
+
+        if executor is not None:
+            return await self._aparseExecutor(input, tokens, executor)
+
+        if len(input) <= yield_every:
+            return self.parse(input, tokens)
+
+        result, key = self._cacheLookup(input, tokens)
+        if result is not None:
+            return result
+
+        first = len(tokens) if tokens is not None else 0
+        result = await self._aparse(Context(input, tokens), yield_every)
+        return self._cacheStore(input, tokens, first, key, result)
+
+
+    async def _aparseExecutor(self, input, tokens, executor):
+        # The file cache is left to the Parser in the executor, so that
+        # reading and writing files never holds up the event loop. That
+        # Parser is created again for every message.
+        import asyncio
+
+        if self._cache is not None:
+            result = self._cacheGet(input, tokens)
+            if result is not None:
+                return result
+
+        first = len(tokens) if tokens is not None else 0
+        result, found = await asyncio.get_running_loop().run_in_executor(
+            executor, parseMessage, self._options, input, tokens is not None)
         if tokens is not None:
-            if not isinstance(tokens, list):
-                raise TypeError("tokens must be list or None")
-            context['tokens'] = tokens
+            tokens.extend(found)
+        if self._strings is not None and not self._ast_nodes:
+            result = internAST(result, self._strings)
+        if self._cache is not None:
+            self._cachePut(input, tokens, first, result)
+        return result
+
+
+    async def aparse_many(self, messages, chunk_size = 500, executor = None, yield_every: int = 4096):
+        if isinstance(messages, Mapping):
+            items = messages.items()
+        else:
+            items = enumerate(messages)
+
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+
+        if yield_every < 1:
+            raise ValueError("yield_every must be at least 1")
+
+        import asyncio
+
+        if executor is not None:
+            loop = asyncio.get_running_loop()
+            chunks = await asyncio.gather(*[
+                loop.run_in_executor(executor, parseChunk, self._options, chunk)
+                for chunk in chunked(items, chunk_size)
+            ])
+            return self._collectChunks(chunks, self._strings)
+
+        # Every message is parsed here, but control goes back to the event
+        # loop whenever enough input has been read since it last did.
+        chunk = []
+        read = 0
+        for key, message in items:
+            try:
+                if len(message) > yield_every:
+                    chunk.append((key, await self.aparse(message, None, None, yield_every), None))
+                else:
+                    chunk.append((key, self.parse(message), None))
+            except SyntaxError as err:
+                chunk.append((key, None, err))
+
+            read += len(message)
+            if read >= yield_every:
+                await asyncio.sleep(0)
+                read = 0
+
+        return self._collectChunks([chunk], None)
+
+
+    async def _aparse(self, context, yield_every):
+        # Does the same as _parse, handing control back to the event loop
+        # between placeholders. Anything with sub-messages or contents is
+        # read the same way as the iterative option does, pausing part way
+        # through as well.
+        import asyncio
+
+        msg = context.msg
+        length = context.length
+        out = []
+        pause = yield_every
+
+        while True:
+            start = context.i
+            text = self._parseText(context, None)
+            if text:
+                out.append(text)
+                appendToken(context, 'text', start, context.i, text)
+
+            if context.i >= length:
+                break
+
+            if msg[context.i] == constants.CHAR_CLOSE:
+                raise unexpected(context)
+
+            try:
+                token, start_idx, kind = self._parsePlaceholderHead(context, None)
+                if kind is not None:
+                    steps = self._nestedSteps(context, token, start_idx, kind, yield_every)
+                    while True:
+                        try:
+                            next(steps)
+                        except StopIteration as done:
+                            token = done.value
+                            break
+                        await asyncio.sleep(0)
+                        pause = context.i + yield_every
+            except (RecursionError, IndexError) as err:
+                raise syntaxError(context, err)
+
+            out.append(token)
+            if context.i >= pause:
+                await asyncio.sleep(0)
+                pause = context.i + yield_every
+
+        if self._ast_nodes:
+            return self._toNodes(context, out)
+        return out
 
+
+    def _cacheLookup(self, input, tokens):
+        # Returns a cached result, or None along with the file cache key
+        # to store the result under once it has been parsed.
+        if self._cache is not None:
+            result = self._cacheGet(input, tokens)
+            if result is not None:
+                return result, None
+
+        # Only ASTs are stored on disk, so asking for tokens always parses,
+        # as do messages too simple to be worth reading from a file.
+        key = None
+        if self._file_cache is not None and tokens is None and input.count('{') >= self._file_cache.min_braces:
+            key = self._file_cache.key(self._file_cache_namespace, input)
+            result = self._fileCacheGet(key)
+            if result is not None:
+                if self._cache is not None:
+                    self._cachePut(input, tokens, 0, result)
+                return result, None
+
+        return None, key
+
+
+    def _cacheStore(self, input, tokens, first, key, result):
+        if key is not None:
+            self._fileCachePut(key, result)
+        if self._cache is not None:
+            self._cachePut(input, tokens, first, result)
+        return result
+
+
+    def _cacheGet(self, input, tokens):
+        # Cached entries are never handed out directly, so that callers
+        # are free to modify what they get back. Nodes are immutable, so
+        # they do not need copying.
+        entry = self._cache.get((input, tokens is not None))
+        if entry is None:
+            return None
+
+        if tokens is not None:
+            tokens.extend(copyTokens(entry[1]))
+        return entry[0] if self._ast_nodes else copyAST(entry[0])
+
+
+    def _cachePut(self, input, tokens, first, result):
+        # ASTs too deep to copy recursively are not cached, and are parsed
+        # again every time instead.
+        try:
+            ast = result if self._ast_nodes else copyAST(result)
+        except RecursionError:
+            return
+
+        self._cache.put((input, tokens is not None), (
+            ast,
+            copyTokens(tokens[first:]) if tokens is not None else None
+        ))
+
+
+    def _fileCacheGet(self, key):
+        # Entries are stored as dicts, the same as serialize does.
+        result = self._file_cache.get(key)
+        if result is None:
+            return None
+
+        if self._strings is not None:
+            result = internAST(result, self._strings)
+        if self._ast_nodes:
+            return fromDict(result, self._tag_type)
+        return result
+
+
+    def _fileCachePut(self, key, result):
+        self._file_cache.put(key, toDict(result) if self._ast_nodes else result)
+
+
+    def tokenize(self, input: str):
+        if not isinstance(input, str):
+            raise TypeError("input must be string")
+
+        return self._tokenize(Context(input, [], True, False))
+
+
+    def _tokenize(self, context):
+        msg = context.msg
+        length = context.length
+        tokens = context.tokens
+        end = 0
+
+        # Messages the fast path accepts are cheap enough to read in one go.
+        if self._fast_paths and self._parseSimple(context) is not None:
+            yield from tokens
+            return
+
+        # Top-level elements are parsed one at a time, and their tokens
+        # handed out before moving on to the next, so a caller that stops
+        # early never pays for the rest of the message.
+        try:
+            while True:
+                start = context.i
+                if self._parseText(context, None):
+                    appendToken(context, 'text', start, context.i)
+
+                if context.i < length:
+                    if msg[context.i] == constants.CHAR_CLOSE:
+                        raise unexpected(context)
+                    self._parsePlaceholder(context, None)
+
+                end = context.i
+                yield from tokens
+                tokens.clear()
+
+                if end >= length:
+                    return
+
+        except (SyntaxError, RecursionError, IndexError):
+            # Whatever was read before the error is still useful to
+            # a highlighter, and the rest of the input is marked bad.
+            if tokens:
+                end = tokens[-1][2]
+                yield from tokens
+            yield ('error', end, length)
+
+
+    def validate(self, input: str):
+        if not isinstance(input, str):
+            raise TypeError("input must be string")
+
+        # Nothing needs to be built for messages the fast path accepts.
+        if self._fast_paths and self._scanSimple(input) is not None:
+            return None
+
+        try:
+            self._parseGeneral(Context(input, build = False))
+        except SyntaxError as err:
+            return err
+        return None
+
+
+    def placeholders(self, input: str):
+        if not isinstance(input, str):
+            raise TypeError("input must be string")
+
+        found = {}
+        matches = self._scanSimple(input) if self._fast_paths else None
+        if matches is not None:
+            for match in matches:
+                found.setdefault(match.group(2), set()).add(None)
+            return found
+
+        # Names are collected as they are read, rather than from an AST.
+        context = Context(input, build = False)
+        context.names = found
+        self._parseGeneral(context)
+        return found
+
+
+    def diagnose(self, input: str, tokens: list = None):
+        if not isinstance(input, str):
+            raise TypeError("input must be string")
+
+        if tokens is not None and not isinstance(tokens, list):
+            raise TypeError("tokens must be list or None")
+
+        # Tokens are collected as spans, so the end of the last good one
+        # is known when skipping over an error.
+        context = Context(input, [], True)
+        context.diagnostics = []
+        result = self._parseAST(context, None)
+
+        if tokens is not None:
+            tokens.extend({
+                'type': type,
+                'text': input[start:end]
+            } for type, start, end in context.tokens)
+
+        if self._ast_nodes:
+            result = self._toNodes(context, result)
+        return result, context.diagnostics
+
+
+    def reparse(self, input: str, ast: list, edit, tokens: list = None):
+        if not self._include_indices:
+            raise ValueError("reparse requires the include_indices option")
+
+        if self._ast_nodes:
+            raise ValueError("reparse does not support the ast_nodes option")
+
+        if not isinstance(input, str):
+            raise TypeError("input must be string")
+
+        if tokens is not None and not isinstance(tokens, list):
+            raise TypeError("tokens must be list or None")
+
+        offset, removed, inserted = edit
+        if not isinstance(inserted, str):
+            raise TypeError("inserted text must be string")
+
+        if offset < 0 or removed < 0 or offset + removed > len(input):
+            raise ValueError("edit is outside of input")
+
+        end = offset + removed
+        msg = input[:offset] + inserted + input[end:]
+
+        result = self._reparse(input, msg, ast, offset, end, len(inserted) - removed, tokens)
+        if result is None:
+            if tokens is not None:
+                del tokens[:]
+            result = self.parse(msg, tokens)
+
+        return msg, result
+
+
+    def _reparse(self, input, msg, ast, start, end, delta, tokens):
+        # Everything before a node is parsed the same way whatever comes
+        # after it, so a node that strictly contains the edit can be parsed
+        # again on its own, as long as it still ends in the same place.
+        # Errors while doing so are the same errors a full parse would
+        # raise. Text between two nodes works the same way.
+        enclosing = []
+        messages = [ast]
+        parent = None
+        depth = 0
+        while True:
+            found = findNode(messages, start, end)
+            if found is None:
+                break
+
+            node, message, index = found
+            enclosing.append((node, message, index, parent, depth))
+            parent = node
+            if 'options' in node:
+                messages = list(node['options'].values())
+                depth += 1
+            elif 'contents' in node:
+                messages = [node['contents']]
+            else:
+                messages = []
+
+        for message in messages:
+            gap = findGap(message, not enclosing, len(input), start, end)
+            if gap is None:
+                continue
+
+            i, j, before, after = gap
+            context = Context(msg, [] if tokens is not None else None)
+            context.i = before
+            context.depth = depth
+            text = self._parseText(context, parent)
+            if text:
+                appendToken(context, 'text', before, context.i, text)
+
+            if context.i == after + delta:
+                return self._replace(ast, input, tokens, before, after, delta, context.tokens,
+                    message, i, j, [text] if text else [])
+            break
+
+        for node, message, index, parent, depth in reversed(enclosing):
+            context = Context(msg, [] if tokens is not None else None)
+            context.i = node['start']
+            context.depth = depth
+
+            # Whether a tag is read at all depends on what follows the <,
+            # and otherwise it is just part of the text before it.
+            if msg[context.i] == constants.CHAR_TAG_OPEN:
+                if not self._canReadTag(context, parent):
+                    continue
+                if parent and msg.startswith(constants.TAG_END, context.i) and self._canReadTag(context, parent, True):
+                    continue
+
+            try:
+                result = self._parseNode(context, parent)
+            except SyntaxError:
+                if tokens is None:
+                    raise
+
+                span = tokenRange(tokens, len(input), node['start'], node['end'])
+                if span is None:
+                    return None
+                tokens[span[0]:] = context.tokens
+                raise
+
+            if context.i == node['end'] + delta:
+                return self._replace(ast, input, tokens, node['start'], node['end'], delta, context.tokens,
+                    message, index, index + 1, [result])
+
+        return None
+
+
+    def _parseNode(self, context, parent):
+        # Parses a single placeholder or tag, with errors handled the same
+        # way as in _parseGeneral.
+        try:
+            return self._parsePlaceholder(context, parent)
+        except (RecursionError, IndexError) as err:
+            raise syntaxError(context, err)
+
+
+    def _replace(self, ast, input, tokens, start, end, delta, new_tokens, message, i, j, nodes):
+        if tokens is not None:
+            span = tokenRange(tokens, len(input), start, end)
+            if span is None:
+                return None
+            tokens[span[0]:span[1]] = new_tokens
+
+        shiftIndices(ast, start, end, delta)
+        message[i:j] = nodes
+        return ast
+
+
+    def parse_many(self, messages, workers = None, chunk_size = 500, executor = None):
+        if isinstance(messages, Mapping):
+            items = messages.items()
+        else:
+            items = enumerate(messages)
+
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+
+        strings = None
+        if executor is not None:
+            chunks = executor.map(parseChunk, repeat(self._options), chunked(items, chunk_size))
+            strings = self._strings
+        elif workers and workers > 1:
+            # Imported here, as it takes longer to import than the rest of
+            # this module and is only wanted for parsing with workers.
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(workers) as pool:
+                chunks = list(pool.map(parseChunk, repeat(self._options), chunked(items, chunk_size)))
+            strings = self._strings
+        else:
+            chunks = [self._parseChunk(items)]
+
+        return self._collectChunks(chunks, strings)
+
+
+    def _collectChunks(self, chunks, strings):
+        # Strings from other processes, or other Parsers, are copies and
+        # need interning again to be shared with the rest of the catalog.
+        # Nodes are immutable, so they are left as they are.
+        if self._ast_nodes:
+            strings = None
+
+        results = {}
+        errors = {}
+        for chunk in chunks:
+            for key, ast, err in chunk:
+                if err is None:
+                    results[key] = internAST(ast, strings) if strings is not None else ast
+                else:
+                    errors[key] = err
+
+        return results, errors
+
+
+    def _parseChunk(self, items):
+        results = []
+        for key, message in items:
+            try:
+                results.append((key, self.parse(message), None))
+            except SyntaxError as err:
+                results.append((key, None, err))
+
+        return results
+
+
+    def _parse(self, context):
+        result = self._parseSimple(context) if self._fast_paths else None
+        if result is None:
+            result = self._parseGeneral(context)
+
+        if self._ast_nodes:
+            return self._toNodes(context, result)
+        return result
+
+
+    def _toNodes(self, context, result):
+        # With a high maximum_depth, the iterative parser can return ASTs
+        # too deep to convert recursively, which is reported the same way
+        # as the recursive parser reports them.
+        try:
+            return fromDict(result, self._tag_type)
+        except RecursionError:
+            raise recursion(context)
+
+
+    def _parseGeneral(self, context):
         try:
             return self._parseAST(context, None)
         except RecursionError:
@@ -122,53 +1039,161 @@ class Parser:
             # not be any IndexErrors, and we'd always catch
             # the issue and return a SyntaxError, but just
             # in case.
-            raise SyntaxError
+            raise invalid(context)
 
-    def _parseAST(self, context, parent):
-        msg = context['msg']
-        length = context['length']
-        start = context['i']
+
+    def _parseSimple(self, context):
+        # Messages that are only text and simple placeholders are built
+        # directly. Anything else returns None, before adding any tokens,
+        # and is left to the general parser.
+        placeholders = self._scanSimple(context.msg)
+        if placeholders is None:
+            return None
+
+        msg = context.msg
+        length = context.length
+        build = context.build
         out = []
+        last = 0
+        for match in placeholders:
+            start, end = match.span()
+            if start > last:
+                text = msg[last:start] if build else None
+                if build:
+                    out.append(text)
+                appendToken(context, 'text', last, start, text)
+
+            appendToken(context, 'syntax', start, start + 1)
+            if match.end(1) > start + 1:
+                appendToken(context, 'space', start + 1, match.end(1))
+            appendToken(context, 'name', match.start(2), match.end(2))
+            if end - 1 > match.end(2):
+                appendToken(context, 'space', match.end(2), end - 1)
+            appendToken(context, 'syntax', end - 1, end)
+            last = end
+
+            if build:
+                name = match.group(2)
+                if self._strings is not None:
+                    name = self._strings.setdefault(name, name)
+                out.append(self._tokenIndices({'name': name}, start, end))
+
+        if last < length:
+            text = msg[last:] if build else None
+            if build:
+                out.append(text)
+            appendToken(context, 'text', last, length, text)
+
+        context.i = length
+        return out
+
+
+    def _scanSimple(self, msg):
+        # The matches for every placeholder in a message that is only text
+        # and simple placeholders, or None for any other message.
+        stop = TEXT_STOP[False, self._allow_tags]
+        search = stop.search
+        placeholders = []
+
+        i = 0
+        while True:
+            match = search(msg, i)
+            if match is None:
+                break
+
+            i = match.start()
+            if msg[i] == constants.CHAR_ESCAPE:
+                # A quote is kept as is, unless it starts an escape.
+                i += 1
+                if stop.match(msg, i):
+                    return None
+                continue
+
+            match = SIMPLE_PLACEHOLDER(msg, i)
+            if match is None:
+                return None
+            placeholders.append(match)
+            i = match.end()
+
+        return placeholders
+
+
+    def _parseAST(self, context, parent):
+        msg = context.msg
+        length = context.length
+        start = context.i
+        depth = context.depth
+        out = [] if context.build else None
 
         text = self._parseText(context, parent)
         if text:
-            out.append(text)
-            appendToken(context, 'text', msg[start:context['i']])
+            if out is not None:
+                out.append(text)
+            appendToken(context, 'text', start, context.i, text)
 
-        while context['i'] < length:
-            i = context['i']
+        while context.i < length:
+            i = context.i
             char = msg[i]
             if char == constants.CHAR_CLOSE:
-                if not parent:
+                if parent:
+                    break
+                if context.diagnostics is None:
                     raise unexpected(context)
-                break
+                self._recover(context, unexpected(context), i, depth)
 
-            if parent and self.options['allow_tags'] and msg[i:i+len(constants.TAG_END)] == constants.TAG_END and self._canReadTag(context, parent, True):
+            elif parent and self._allow_tags and msg[i:i+len(constants.TAG_END)] == constants.TAG_END and self._canReadTag(context, parent, True):
                 break
 
-            out.append(self._parsePlaceholder(context, parent))
-            start = context['i']
+            else:
+                try:
+                    node = self._parsePlaceholder(context, parent)
+                    if out is not None:
+                        out.append(node)
+                except (SyntaxError, RecursionError, IndexError) as err:
+                    if context.diagnostics is None:
+                        raise
+                    self._recover(context, err, i, depth)
+
+            start = context.i
             text = self._parseText(context, parent)
             if text:
-                out.append(text)
-                appendToken(context, 'text', msg[start:context['i']])
+                if out is not None:
+                    out.append(text)
+                appendToken(context, 'text', start, context.i, text)
 
         return out
 
 
+    def _recover(self, context, err, start, depth):
+        # Records an error in the node that started at start, and skips
+        # the rest of it along with an error token.
+        err = syntaxError(context, err)
+
+        position = context.i
+        tokens = context.tokens
+        read = tokens[-1][2] if tokens else 0
+        end = resync(context.msg, start, max(position, read))
+
+        if end > read:
+            appendToken(context, 'error', read, end)
+        context.diagnostics.append(Diagnostic(err.code, str(err), position, end))
+        context.i = end
+        context.depth = depth
+
+
     def _canReadTag(self, context, parent, require_closing = False):
-        msg = context['msg']
-        length = context['length']
-        start = context['i']
-        current = context['i']
-        if not self.options['allow_tags']:
+        msg = context.msg
+        length = context.length
+        start = context.i
+        current = context.i
+        if not self._allow_tags:
             return False
 
         char = msg[current] if current < length else None
         if char != constants.CHAR_TAG_OPEN:
             return False
 
-        if self.options['strict_tags'] and not require_closing:
+        if self._strict_tags and not require_closing:
             return True
 
         current += 1
@@ -176,7 +1201,7 @@ class Parser:
 
         # We're trying to close a tag.
         if char == constants.CHAR_TAG_CLOSE:
-            if self.options['strict_tags']:
+            if self._strict_tags:
                 return True
 
             current += 1
@@ -186,8 +1211,8 @@ class Parser:
             return False
 
         # Do we have a tag prefix?
-        if self.options['tag_prefix']:
-            return self.options['tag_prefix'] == msg[current:current + len(self.options['tag_prefix'])]
+        if self._tag_prefix:
+            return self._tag_prefix == msg[current:current + len(self._tag_prefix)]
 
         elif isAlpha(char):
             return True
@@ -196,105 +1221,351 @@ class Parser:
 
 
     def _parseText(self, context, parent, is_arg_style = False):
-        msg = context['msg']
-        length = context['length']
-        start = context['i']
-        is_hash_special = parent and parent['type'] in self.options['subnumeric_types']
-        is_tag_special = self.options['allow_tags']
-        allow_arg_spaces = self.options['allow_format_spaces']
+        if is_arg_style:
+            return self._parseArgStyle(context, parent)
+
+        msg = context.msg
+        length = context.length
+        is_hash_special = bool(parent and parent['type'] in self._subnumeric_types)
+        is_tag_special = self._allow_tags
+        search = TEXT_STOP[is_hash_special, is_tag_special].search
+
+        i = context.i
+
+        # Most text has no escapes, and ends at a placeholder or the end
+        # of the message. That is returned as a single slice of the input,
+        # or, when nothing is being built, as whether there was any.
+        match = search(msg, i)
+        if match is None:
+            context.i = length
+            return msg[i:] if context.build else i < length
+
+        stop = match.start()
+        char = msg[stop]
+        if char != constants.CHAR_ESCAPE and char != constants.CHAR_TAG_OPEN:
+            context.i = stop
+            return msg[i:stop] if context.build else i < stop
+
+        parts = []
+
+        while i < length:
+            # Copy everything up to the next special character in one go.
+            match = search(msg, i)
+            if match is None:
+                parts.append(msg[i:])
+                i = length
+                break
+
+            stop = match.start()
+            if stop > i:
+                parts.append(msg[i:stop])
+
+            i = stop
+            char = msg[i]
+
+            if char == constants.CHAR_ESCAPE:
+                i += 1
+                if i >= length:
+                    parts.append(char)
+                    break
+
+                char = msg[i]
+                if char == constants.CHAR_ESCAPE:
+                    # Escaped Escape
+                    parts.append(char)
+                    i += 1
+
+                elif char in constants.VAR_CHARS or \
+                        (is_hash_special and char == constants.CHAR_HASH) or \
+                        (is_tag_special and char == constants.CHAR_TAG_OPEN):
+                    parts.append(char)
+                    i += 1
+                    while i < length:
+                        end = msg.find(constants.CHAR_ESCAPE, i)
+                        if end == -1:
+                            parts.append(msg[i:])
+                            i = length
+                            break
+
+                        if end > i:
+                            parts.append(msg[i:end])
+
+                        i = end + 1
+                        if i < length and msg[i] == constants.CHAR_ESCAPE:
+                            parts.append(constants.CHAR_ESCAPE)
+                            i += 1
+                        else:
+                            break
+
+                else:
+                    parts.append(constants.CHAR_ESCAPE + char)
+                    i += 1
+
+            elif char == constants.CHAR_TAG_OPEN:
+                context.i = i
+                if self._canReadTag(context, parent):
+                    break
+
+                parts.append(char)
+                i += 1
+
+            else:
+                break
+
+        context.i = i
+        return ''.join(parts)
+
+
+    def _parseArgStyle(self, context, parent):
+        msg = context.msg
+        length = context.length
+        start = i = context.i
+        is_hash_special = parent and parent['type'] in self._subnumeric_types
+        is_tag_special = self._allow_tags
+        allow_arg_spaces = self._allow_format_spaces
+        spaces = constants.SPACES
 
         text = ''
         trailing_space = 0
 
-        while context['i'] < length:
-            char = msg[context['i']]
-            is_space = isSpace(char)
+        while i < length:
+            char = msg[i]
+            is_space = char in spaces
 
             if char in constants.VAR_CHARS or \
                     (is_hash_special and char == constants.CHAR_HASH) or \
-                    (is_tag_special and char == constants.CHAR_TAG_OPEN and self._canReadTag(context, parent)) or \
-                    (is_arg_style and not allow_arg_spaces and is_space):
+                    (not allow_arg_spaces and is_space):
                 break
 
+            if is_tag_special and char == constants.CHAR_TAG_OPEN:
+                context.i = i
+                if self._canReadTag(context, parent):
+                    break
+
             if is_space:
                 trailing_space += 1
             else:
                 trailing_space = 0
 
             if char == constants.CHAR_ESCAPE:
-                context['i'] += 1
-                if context['i'] < length:
-                    char = msg[context['i']]
-                    if char == constants.CHAR_ESCAPE:
-                        # Escaped Escape
-                        text += char
-                        context['i'] += 1
-
-                    elif char in constants.VAR_CHARS or \
-                            (is_hash_special and char == constants.CHAR_HASH) or \
-                            (is_tag_special and char == constants.CHAR_TAG_OPEN) or \
-                            is_arg_style:
-                        text += char
-                        context['i'] += 1
-                        while context['i'] < length:
-                            nxt = msg[context['i']]
+                i += 1
+                if i < length:
+                    # Any character may be quoted within an argument style.
+                    char = msg[i]
+                    text += char
+                    i += 1
+                    if char != constants.CHAR_ESCAPE:
+                        while i < length:
+                            nxt = msg[i]
                             if nxt == constants.CHAR_ESCAPE:
-                                context['i'] += 1
-                                if context['i'] < length and msg[context['i']] == constants.CHAR_ESCAPE:
+                                i += 1
+                                if i < length and msg[i] == constants.CHAR_ESCAPE:
                                     text += nxt
                                 else:
                                     break
                             else:
                                 text += nxt
 
-                            context['i'] += 1
-
-                    else:
-                        context['i'] += 1
-                        text += constants.CHAR_ESCAPE + char
+                            i += 1
                 else:
                     text += char
             else:
                 text += char
-                context['i'] += 1
+                i += 1
+
+        context.i = i
 
         # Trim trailing spaces from arg styles.
-        if is_arg_style and trailing_space:
+        if trailing_space:
             trimmed = len(text) - trailing_space
             if trimmed <= 0:
-                context['i'] = start
+                context.i = start
                 return ''
             else:
-                context['i'] -= trailing_space
+                context.i -= trailing_space
                 return text[0: trimmed]
 
         return text
 
 
     def _tokenIndices(self, token, start, end):
-        if self.options['include_indices']:
+        if self._include_indices:
             token['start'] = start
             token['end'] = end
         return token
 
 
     def _parsePlaceholder(self, context, parent):
-        msg = context['msg']
-        length = context['length']
-        is_hash_special = parent and parent['type'] in self.options['subnumeric_types']
+        token, start_idx, kind = self._parsePlaceholderHead(context, parent)
+        if context.names is not None:
+            addName(context.names, token)
+        if kind is None:
+            return token
+
+        if self._iterative:
+            return self._parseNested(context, token, start_idx, kind)
+
+        if kind == 'tag':
+            children = self._parseAST(context, token)
+            return self._parseTagTail(context, token, start_idx, children)
+
+        token['options'] = self._parseSubmessages(context, token)
+        return self._parsePlaceholderTail(context, token, start_idx)
+
+
+    def _parseNested(self, context, token, start_idx, kind):
+        # With nothing to pause for, the steps run to the end at once.
+        steps = self._nestedSteps(context, token, start_idx, kind, None)
+        try:
+            next(steps)
+        except StopIteration as done:
+            return done.value
+
+
+    def _nestedSteps(self, context, token, start_idx, kind, yield_every):
+        # Does the same as the recursive calls in _parsePlaceholder, but
+        # keeps the enclosing nodes on a list rather than the Python stack,
+        # so that maximum_depth is the only limit on nesting. Without the
+        # Python stack to stop them, tags are held to maximum_depth too,
+        # so that the AST can still be walked recursively.
+        #
+        # This is a generator, which returns the node once it has been
+        # read. With yield_every, it also yields whenever that many more
+        # characters have been read, so that aparse can pause there.
+        msg = context.msg
+        length = context.length
+        build = context.build
+        names = context.names
+        stack = []
+        tags = 0
+        pause = context.i + yield_every if yield_every else length + 1
+
+        if kind == 'tag':
+            tags = self._enterTag(context, tags)
+        options, selector = self._enterNested(context, token, kind)
+        out = []
 
-        start_idx = context['i']
+        while True:
+            if context.i >= pause:
+                yield
+                pause = context.i + yield_every
+
+            start = context.i
+            text = self._parseText(context, token)
+            if text:
+                if build:
+                    out.append(text)
+                appendToken(context, 'text', start, context.i, text)
+
+            i = context.i
+            if i < length and msg[i] != constants.CHAR_CLOSE and not (
+                    self._allow_tags and msg[i:i+len(constants.TAG_END)] == constants.TAG_END and
+                    self._canReadTag(context, token, True)):
+                depth = context.depth
+                try:
+                    node, node_idx, kind = self._parsePlaceholderHead(context, token)
+                    if names is not None:
+                        addName(names, node)
+                    if kind == 'tag':
+                        tags = self._enterTag(context, tags)
+                    if kind is not None:
+                        node_options, node_selector = self._enterNested(context, node, kind)
+                except (SyntaxError, IndexError) as err:
+                    if context.diagnostics is None:
+                        raise
+                    self._recover(context, err, i, depth)
+                    continue
+
+                if kind is None:
+                    if build:
+                        out.append(node)
+                else:
+                    stack.append((token, start_idx, options, selector, out, depth))
+                    token = node
+                    start_idx = node_idx
+                    options = node_options
+                    selector = node_selector
+                    out = []
+                continue
+
+            # This is the end of one of the current node's messages.
+            try:
+                if options is None:
+                    node = self._parseTagTail(context, token, start_idx, out)
+
+                else:
+                    self._parseSubmessageEnd(context)
+                    options[selector] = out
+
+                    selector = self._parseSelector(context)
+                    if selector is not None:
+                        out = []
+                        continue
+
+                    context.depth -= 1
+                    token['options'] = self._checkSubmessages(context, token, options)
+                    node = self._parsePlaceholderTail(context, token, start_idx)
+
+            except (SyntaxError, IndexError) as err:
+                # The enclosing message carries on after the broken node,
+                # or, at the top, the caller does.
+                if context.diagnostics is None or not stack:
+                    raise
+                if options is None:
+                    tags -= 1
+                failed = start_idx
+                token, start_idx, options, selector, out, depth = stack.pop()
+                self._recover(context, err, failed, depth)
+                continue
+
+            if not stack:
+                return node
+
+            if options is None:
+                tags -= 1
+            token, start_idx, options, selector, out, depth = stack.pop()
+            if build:
+                out.append(node)
+
+
+    def _enterTag(self, context, tags):
+        if tags + 1 >= self._maximum_depth:
+            raise recursion(context)
+        return tags + 1
+
+
+    def _enterNested(self, context, token, kind):
+        if kind == 'tag':
+            return None, None
+
+        context.depth += 1
+        selector = self._parseSelector(context)
+        if selector is None:
+            self._checkSubmessages(context, token, None)
+        return {}, selector
+
+
+    def _parsePlaceholderHead(self, context, parent):
+        # Reads everything up to the contents of a placeholder or tag, if
+        # it has any. Returns the node, its start and what is left to read:
+        # None, 'tag' for the contents of a tag, or 'options' for
+        # sub-messages.
+        msg = context.msg
+        length = context.length
+        is_hash_special = parent and parent['type'] in self._subnumeric_types
+
+        start_idx = context.i
         char = msg[start_idx] if start_idx < length else None
         if is_hash_special and char == constants.CHAR_HASH:
-            appendToken(context, 'hash', char)
-            context['i'] += 1
+            appendToken(context, 'hash', start_idx, start_idx + 1)
+            context.i += 1
             return self._tokenIndices({
                 'type': 'number',
                 'name': parent['name'],
                 'hash': True
-            }, start_idx, context['i'])
+            }, start_idx, context.i), start_idx, None
 
-        tag = self._parseTag(context, parent)
+        tag = self._parseTagHead(context, parent)
         if tag:
             return tag
 
@@ -302,33 +1573,33 @@ class Parser:
         if char != constants.CHAR_OPEN:
             raise expected(constants.CHAR_OPEN, context)
 
-        appendToken(context, 'syntax', char)
+        appendToken(context, 'syntax', start_idx, start_idx + 1)
 
-        context['i'] += 1
+        context.i += 1
         skipSpace(context)
 
         name = self._parseName(context)
         if not name:
             raise expected('placeholder name', context)
 
-        appendToken(context, 'name', name)
+        appendToken(context, 'name', context.i - len(name), context.i)
         token = {
             'name': name
         }
 
         skipSpace(context)
-        char = msg[context['i']] if context['i'] < length else None
+        char = msg[context.i] if context.i < length else None
 
         if char == constants.CHAR_CLOSE:
-            appendToken(context, 'syntax', char)
-            context['i'] += 1
-            return self._tokenIndices(token, start_idx, context['i'])
+            appendToken(context, 'syntax', context.i, context.i + 1)
+            context.i += 1
+            return self._tokenIndices(token, start_idx, context.i), start_idx, None
 
         if char != constants.CHAR_SEP:
             raise expected(SEP_OR_CLOSE, context)
 
-        appendToken(context, 'syntax', char)
-        context['i'] += 1
+        appendToken(context, 'syntax', context.i, context.i + 1)
+        context.i += 1
 
         skipSpace(context)
 
@@ -336,82 +1607,81 @@ class Parser:
         if not ttype:
             raise expected('placeholder type', context)
 
-        appendToken(context, 'type', ttype)
+        appendToken(context, 'type', context.i - len(ttype), context.i)
         token['type'] = ttype
 
         skipSpace(context)
-        char = msg[context['i']] if context['i'] < length else None
+        char = msg[context.i] if context.i < length else None
         if char == constants.CHAR_CLOSE:
-            appendToken(context, 'syntax', char)
-            if ttype in self.options['submessage_types']:
+            appendToken(context, 'syntax', context.i, context.i + 1)
+            if ttype in self._submessage_types:
                 raise expected('{} sub-messages'.format(ttype), context)
 
-            context['i'] += 1
-            return self._tokenIndices(token, start_idx, context['i'])
+            context.i += 1
+            return self._tokenIndices(token, start_idx, context.i), start_idx, None
 
         if char != constants.CHAR_SEP:
             raise expected(SEP_OR_CLOSE, context)
 
-        appendToken(context, 'syntax', char)
-        context['i'] += 1
+        appendToken(context, 'syntax', context.i, context.i + 1)
+        context.i += 1
         skipSpace(context)
 
-        if ttype in self.options['subnumeric_types']:
+        if ttype in self._subnumeric_types:
             offset = self._parseOffset(context)
             token['offset'] = offset if offset else 0
             if offset:
                 skipSpace(context)
 
-        if ttype in self.options['submessage_types']:
-            messages = self._parseSubmessages(context, token)
-            if not messages:
-                raise expected('{} sub-messages'.format(ttype), context)
-            token['options'] = messages
+        if ttype in self._submessage_types:
+            return token, start_idx, 'options'
 
-        else:
-            start = context['i']
-            fmt = self._parseText(context, token, True)
-            if not fmt:
-                raise expected('placeholder style', context)
-
-            end = context['i']
-            spaces = skipSpace(context, True)
-
-            if self.options['loose_submessages'] and msg[context['i']] == constants.CHAR_OPEN:
-                # Instead of a format, we should handle submessages.
-                # Rewind and try again.
-                context['i'] = start
-                messages = self._parseSubmessages(context, token)
-                if not messages:
-                    raise expected('{} sub-messages'.format(ttype), context)
-                token['options'] = messages
+        start = context.i
+        fmt = self._parseText(context, token, True)
+        if not fmt:
+            raise expected('placeholder style', context)
 
-            else:
-                token['format'] = fmt
-                appendToken(context, 'style', msg[start:end])
-                if spaces:
-                    appendToken(context, 'space', spaces)
+        end = context.i
+        spaces = skipSpace(context, True)
+
+        if self._loose_submessages and msg[context.i] == constants.CHAR_OPEN:
+            # Instead of a format, we should handle submessages.
+            # Rewind and try again.
+            context.i = start
+            return token, start_idx, 'options'
 
+        if self._strings is not None:
+            fmt = self._strings.setdefault(fmt, fmt)
+        token['format'] = fmt
+        appendToken(context, 'style', start, end)
+        if spaces:
+            appendToken(context, 'space', end, end + len(spaces))
+
+        return self._parsePlaceholderTail(context, token, start_idx), start_idx, None
+
+
+    def _parsePlaceholderTail(self, context, token, start_idx):
+        msg = context.msg
         skipSpace(context)
-        char = msg[context['i']] if context['i'] < length else None
+        char = msg[context.i] if context.i < context.length else None
         if char != constants.CHAR_CLOSE:
             raise expected(constants.CHAR_CLOSE, context)
 
-        appendToken(context, 'syntax', char)
-        context['i'] += 1
-        return self._tokenIndices(token, start_idx, context['i'])
+        appendToken(context, 'syntax', context.i, context.i + 1)
+        context.i += 1
+        return self._tokenIndices(token, start_idx, context.i)
 
 
-    def _parseTag(self, context, parent):
-        if not self.options['allow_tags']:
+    def _parseTagHead(self, context, parent):
+        if not self._allow_tags:
             return None
 
         if not self._canReadTag(context, parent):
             return None
 
-        msg = context['msg']
-        length = context['length']
-        i = context['i']
+        msg = context.msg
+        length = context.length
+        i = context.i
         start_idx = i
         char = msg[i] if i < length else None
 
@@ -421,166 +1691,167 @@ class Parser:
         if msg[i:i + len(constants.TAG_END)] == constants.TAG_END:
             raise unexpected(constants.TAG_END, i)
 
-        context['i'] += 1
+        context.i += 1
 
         name = self._parseName(context, True)
         if not name:
-            if not self.options['strict_tags']:
-                context['i'] = start_idx
+            if not self._strict_tags:
+                context.i = start_idx
                 return
 
             raise expected('tag name', context)
 
-        appendToken(context, 'syntax', char)
+        appendToken(context, 'syntax', start_idx, start_idx + 1)
 
         token = {
-            'type': self.options['tag_type'],
+            'type': self._tag_type,
             'name': name
         }
-        appendToken(context, 'name', name)
+        appendToken(context, 'name', context.i - len(name), context.i)
         skipSpace(context)
 
-        i = context['i']
+        i = context.i
         if i < length and msg[i:i + len(constants.TAG_CLOSING)] == constants.TAG_CLOSING:
-            appendToken(context, 'syntax', constants.TAG_CLOSING)
-            context['i'] += len(constants.TAG_CLOSING)
-            return self._tokenIndices(token, start_idx, context['i'])
+            appendToken(context, 'syntax', i, i + len(constants.TAG_CLOSING))
+            context.i += len(constants.TAG_CLOSING)
+            return self._tokenIndices(token, start_idx, context.i), start_idx, None
 
         char = msg[i] if i < length else None
         if char != constants.CHAR_TAG_END:
             raise expected(constants.CHAR_TAG_END + ' or ' + constants.TAG_CLOSING, context)
 
-        appendToken(context, 'syntax', char)
-        context['i'] += 1
+        appendToken(context, 'syntax', i, i + 1)
+        context.i += 1
+        return token, start_idx, 'tag'
+
+
+    def _parseTagTail(self, context, token, start_idx, children):
+        msg = context.msg
+        length = context.length
+        name = token['name']
 
-        children = self._parseAST(context, token)
         if children:
             token['contents'] = children
-        end = context['i']
+        end = context.i
+
+        if end >= length:
+            raise expected(constants.TAG_END + name + constants.CHAR_TAG_END, '<EOF>', end)
 
-        if end < length and msg[end:end + len(constants.TAG_END)] != constants.TAG_END:
+        if msg[end:end + len(constants.TAG_END)] != constants.TAG_END:
             raise expected(constants.TAG_END, context)
 
-        appendToken(context, 'syntax', constants.TAG_END)
-        context['i'] += len(constants.TAG_END)
+        appendToken(context, 'syntax', end, end + len(constants.TAG_END))
+        context.i += len(constants.TAG_END)
 
         close_name = self._parseName(context, True)
         if close_name:
-            appendToken(context, 'name', close_name)
+            appendToken(context, 'name', context.i - len(close_name), context.i)
         if close_name != name:
+            context.i = end
             raise expected(constants.TAG_END + name + constants.CHAR_TAG_END, msg[end] if end < length else '<EOF>', end)
 
         skipSpace(context)
-        char = msg[context['i']] if context['i'] < length else None
+        char = msg[context.i] if context.i < length else None
         if char != constants.CHAR_TAG_END:
             raise expected(constants.CHAR_TAG_END, context)
 
-        appendToken(context, 'syntax', char)
-        context['i'] += 1
-        return self._tokenIndices(token, start_idx, context['i'])
+        appendToken(context, 'syntax', context.i, context.i + 1)
+        context.i += 1
+        return self._tokenIndices(token, start_idx, context.i)
 
 
     def _parseName(self, context, is_tag = False):
-        msg = context['msg']
-        length = context['length']
-        name = ''
-
-        while context['i'] < length:
-            char = msg[context['i']]
-            if char in constants.VAR_CHARS or char == constants.CHAR_SEP or \
-                    char == constants.CHAR_HASH or char == constants.CHAR_ESCAPE or \
-                    isSpace(char) or (is_tag and char in constants.TAG_CHARS):
-                break
-
-            name += char
-            context['i'] += 1
-
+        start = context.i
+        context.i = (TAG_NAME if is_tag else NAME)(context.msg, start).end()
+        name = context.msg[start:context.i]
+        if self._strings is not None:
+            return self._strings.setdefault(name, name)
         return name
 
 
     def _parseOffset(self, context):
-        msg = context['msg']
-        length = context['length']
-        start = context['i']
+        msg = context.msg
+        length = context.length
+        start = context.i
 
         if start >= length or msg[start:start + len(constants.OFFSET)] != constants.OFFSET:
             return 0
 
-        appendToken(context, 'offset', constants.OFFSET)
-        context['i'] += len(constants.OFFSET)
+        appendToken(context, 'offset', start, start + len(constants.OFFSET))
+        context.i += len(constants.OFFSET)
         skipSpace(context)
 
-        start = context['i']
-        while context['i'] < length and (isDigit(msg[context['i']]) or (context['i'] == start and msg[context['i']] == '-')):
-            context['i'] += 1
-
-        if start == context['i']:
+        match = OFFSET_NUMBER(msg, context.i)
+        if not match:
             raise expected('offset number', context)
 
-        offset = msg[start:context['i']]
-        appendToken(context, 'number', offset)
+        offset = match.group()
+        context.i = match.end()
+        appendToken(context, 'number', match.start(), match.end())
         return int(offset, 10)
 
 
     def _parseSubmessages(self, context, parent):
-        msg = context['msg']
-        length = context['length']
         options = {}
 
-        context['depth'] += 1
-
-        while context['i'] < length and msg[context['i']] != constants.CHAR_CLOSE:
-            selector = self._parseName(context)
-            if not selector:
-                raise expected('sub-message selector', context)
-            appendToken(context, 'selector', selector)
-            skipSpace(context)
-
-            options[selector] = self._parseSubmessage(context, parent)
-            skipSpace(context)
+        context.depth += 1
 
-        context['depth'] -= 1
+        selector = self._parseSelector(context)
+        while selector is not None:
+            options[selector] = self._parseAST(context, parent)
+            self._parseSubmessageEnd(context)
+            selector = self._parseSelector(context)
 
-        if not options:
-            return None
+        context.depth -= 1
 
-        req = self.options['require_other']
-        ttype = parent['type'] if parent else None
-        if req == 'all':
-            req = True
-        elif req == 'subnumeric':
-            req = self.options['subnumeric_types']
-        elif req and not isinstance(req, list):
-            req = self.options['submessage_types']
-        if isinstance(req, list):
-            req = ttype in req
+        return self._checkSubmessages(context, parent, options)
 
-        if req and not 'other' in options:
-            raise expected('{} sub-message other'.format(ttype), context)
 
-        return options
+    def _parseSelector(self, context):
+        # Reads the selector and opening brace of the next sub-message,
+        # or returns None if there are no more.
+        msg = context.msg
+        length = context.length
+        if context.i >= length or msg[context.i] == constants.CHAR_CLOSE:
+            return None
 
+        selector = self._parseName(context)
+        if not selector:
+            raise expected('sub-message selector', context)
+        appendToken(context, 'selector', context.i - len(selector), context.i)
+        skipSpace(context)
 
-    def _parseSubmessage(self, context, parent):
-        if context['depth'] >= self.options['maximum_depth']:
+        if context.depth >= self._maximum_depth:
             raise recursion(context)
 
-        msg = context['msg']
-        length = context['length']
-        if context['i'] >= length or msg[context['i']] != constants.CHAR_OPEN:
+        if context.i >= length or msg[context.i] != constants.CHAR_OPEN:
             raise expected(constants.CHAR_OPEN, context)
 
-        appendToken(context, 'syntax', constants.CHAR_OPEN)
-        context['i'] += 1
+        appendToken(context, 'syntax', context.i, context.i + 1)
+        context.i += 1
+        return selector
 
-        message = self._parseAST(context, parent)
 
-        char = msg[context['i']] if context['i'] < length else None
+    def _parseSubmessageEnd(self, context):
+        char = context.msg[context.i] if context.i < context.length else None
         if char != constants.CHAR_CLOSE:
             raise expected(constants.CHAR_CLOSE, context)
 
-        appendToken(context, 'syntax', constants.CHAR_CLOSE)
-        context['i'] += 1
+        appendToken(context, 'syntax', context.i, context.i + 1)
+        context.i += 1
+        skipSpace(context)
+
+
+    def _checkSubmessages(self, context, parent, options):
+        ttype = parent['type']
+        if not options:
+            raise expected('{} sub-messages'.format(ttype), context)
+
+        req = self._require_other
+        if req is not True:
+            req = ttype in req
 
-        return message
+        if req and not 'other' in options:
+            raise expected('{} sub-message other'.format(ttype), context)
 
+        return options
@@ -0,0 +1,253 @@
+import re
+from collections import namedtuple
+from decimal import Decimal, InvalidOperation
+from functools import lru_cache
+
+from .cldr import CARDINAL, ORDINAL
+
+Operands = namedtuple('Operands', ['n', 'i', 'v', 'w', 'f', 't', 'e'])
+
+CATEGORIES = ('zero', 'one', 'two', 'few', 'many', 'other')
+
+RELATION = re.compile(r'^([nivwftce])(?:\s*%\s*(\d+))?\s*(!=|=)\s*(\d+(?:\.\.\d+)?(?:,\d+(?:\.\.\d+)?)*)$')
+
+# Plain numbers, which are read directly rather than through Decimal.
+NUMBER = re.compile(r'\s*[-+]?(\d+)(?:\.(\d*))?\s*$')
+
+# Sets of values no larger than this are tested with a set constant,
+# anything larger with comparisons.
+MAX_SET = 100
+
+
+def parseRule(rule):
+    # A rule is an "or" of "and"s of relations, such as "n % 10 = 2..4".
+    # Each relation becomes (operand, modulus, negate, [(low, high)]).
+    out = []
+    for condition in rule.split(' or '):
+        relations = []
+        for relation in condition.split(' and '):
+            match = RELATION.match(relation.strip())
+            if match is None:
+                raise ValueError("invalid plural rule {!r}".format(rule))
+
+            operand, modulus, op, values = match.groups()
+            ranges = []
+            for value in values.split(','):
+                low, _, high = value.partition('..')
+                ranges.append((int(low), int(high or low)))
+
+            relations.append((
+                'e' if operand == 'c' else operand,
+                int(modulus) if modulus else None,
+                op == '!=',
+                ranges
+            ))
+        out.append(relations)
+    return out
+
+
+def compileRelation(operand, modulus, negate, ranges):
+    # n is only ever compared with whole numbers, which it can only equal
+    # when it has no fraction digits, and then it is the same as i.
+    expr = 'i' if operand == 'n' else operand
+    if modulus is not None:
+        expr = '{} % {}'.format(expr, modulus)
+
+    count = sum(high - low + 1 for low, high in ranges)
+    if count == 1:
+        test = '{} == {}'.format(expr, ranges[0][0])
+    elif count <= MAX_SET:
+        values = sorted(set(x for low, high in ranges for x in range(low, high + 1)))
+        test = '{} in {{{}}}'.format(expr, ', '.join(map(str, values)))
+    else:
+        test = ' or '.join(
+            '{} == {}'.format(expr, low) if low == high else '{} <= {} <= {}'.format(low, expr, high)
+            for low, high in ranges
+        )
+
+    if operand == 'n':
+        test = 'f == 0 and ({})'.format(test)
+    return 'not ({})'.format(test) if negate else '({})'.format(test)
+
+
+def compileRules(rules):
+    lines = [
+        'def select(value):',
+        '    if value.__class__ is int:',
+        '        i = value if value >= 0 else -value',
+        '        v = w = f = t = e = 0',
+        '    else:',
+        '        i, v, w, f, t, e = _operands(value)'
+    ]
+
+    for category in CATEGORIES:
+        rule = rules.get(category)
+        if rule is None:
+            continue
+        condition = ' or '.join(
+            '({})'.format(' and '.join(compileRelation(*relation) for relation in relations))
+            for relations in parseRule(rule)
+        )
+        lines.append('    if {}:'.format(condition))
+        lines.append('        return {!r}'.format(category))
+
+    lines.append("    return 'other'")
+
+    namespace = {'_operands': extractOperands}
+    exec(compile('\n'.join(lines), '<plural rules>', 'exec'), namespace)
+    return namespace['select']
+
+
+def indexRules(table):
+    index = {}
+    for locales, rules in table:
+        for locale in locales.split():
+            index[locale] = rules
+    return index
+
+
+CARDINAL_RULES = indexRules(CARDINAL)
+ORDINAL_RULES = indexRules(ORDINAL)
+
+# Compiled once for each group of rules, and shared by every locale in it.
+compiled = {}
+selectors = {}
+
+
+def findRules(locale, ordinal):
+    if not isinstance(locale, str):
+        raise TypeError("locale must be string")
+
+    # Tries the language with each region, such as pt_PT for pt-Latn-PT,
+    # and then the language alone. Locales that have cardinal rules but
+    # no ordinal ones use the root ordinal rules.
+    parts = locale.replace('-', '_').split('_')
+    language = parts[0].lower()
+    candidates = [
+        language + '_' + part.upper()
+        for part in parts[1:]
+        if len(part) == 2 or part.isdigit()
+    ]
+    candidates.append(language)
+
+    if ordinal:
+        for candidate in candidates:
+            if candidate in ORDINAL_RULES:
+                return ORDINAL_RULES[candidate]
+
+    for candidate in candidates:
+        if candidate in CARDINAL_RULES:
+            return ORDINAL_RULES['root'] if ordinal else CARDINAL_RULES[candidate]
+
+    raise ValueError("unknown locale {}".format(locale))
+
+
+def plural_rules(locale, ordinal = False):
+    key = (locale, ordinal)
+    selector = selectors.get(key)
+    if selector is None:
+        rules = findRules(locale, ordinal)
+        selector = compiled.get(id(rules))
+        if selector is None:
+            selector = compiled[id(rules)] = compileRules(rules)
+        selectors[key] = selector
+    return selector
+
+
+def select(locale, value, ordinal = False):
+    return plural_rules(locale, ordinal)(value)
+
+
+def categories(locale, ordinal = False):
+    rules = findRules(locale, ordinal)
+    return tuple(category for category in CATEGORIES if category in rules or category == 'other')
+
+
+def operands(value):
+    i, v, w, f, t, e = extractOperands(value)
+    if f == 0:
+        n = i
+    else:
+        n = Decimal('{}.{}'.format(i, str(f).rjust(v, '0')))
+    return Operands(n, i, v, w, f, t, e)
+
+
+def extractOperands(value):
+    cls = value.__class__
+    if cls is int:
+        return (value if value >= 0 else -value, 0, 0, 0, 0, 0)
+
+    if cls is str or cls is float:
+        return cachedOperands(value)
+
+    # Decimals that are equal can still show different digits, like 1
+    # and 1.0, so they are looked up by how they are written.
+    if isinstance(value, Decimal):
+        return cachedOperands(str(value))
+    if isinstance(value, int):
+        return extractOperands(int(value))
+    if isinstance(value, float):
+        return cachedOperands(float(value))
+    if isinstance(value, str):
+        return cachedOperands(str(value))
+    raise TypeError("value must be int, float, Decimal or string")
+
+
+@lru_cache(maxsize = 4096, typed = True)
+def cachedOperands(value):
+    if isinstance(value, float):
+        if value != value or value in (float('inf'), float('-inf')):
+            raise ValueError("value must be finite")
+        # A float has no digits of its own to show, so whole numbers count
+        # as integers and the rest are written as short as possible.
+        if value.is_integer():
+            return extractOperands(int(value))
+        value = repr(value)
+
+    match = NUMBER.match(value)
+    if match is not None:
+        whole, fraction = match.groups()
+        if not fraction:
+            return (int(whole), 0, 0, 0, 0, 0)
+        trimmed = fraction.rstrip('0')
+        return (int(whole), len(fraction), len(trimmed), int(fraction), int(trimmed or '0'), 0)
+
+    return decimalOperands(value)
+
+
+def decimalOperands(value):
+    # Compact numbers, such as 1.2c6 for 1.2 million, keep the exponent
+    # as e.
+    exponent = 0
+    text = value.strip()
+    if 'c' in text:
+        text, _, exponent = text.partition('c')
+        try:
+            exponent = int(exponent)
+        except ValueError:
+            raise ValueError("invalid number {!r}".format(value))
+    try:
+        number = Decimal(text)
+    except InvalidOperation:
+        raise ValueError("invalid number {!r}".format(value))
+    if not number.is_finite():
+        raise ValueError("value must be finite")
+    if exponent:
+        number = number.scaleb(exponent)
+
+    sign, digits, exp = number.as_tuple()
+    digits = ''.join(map(str, digits))
+    if exp >= 0:
+        return (int(digits) * 10 ** exp, 0, 0, 0, 0, exponent)
+
+    visible = -exp
+    fraction = digits[-visible:].rjust(visible, '0')
+    trimmed = fraction.rstrip('0')
+    return (
+        int(digits[:-visible] or '0'),
+        visible,
+        len(trimmed),
+        int(fraction),
+        int(trimmed or '0'),
+        exponent
+    )
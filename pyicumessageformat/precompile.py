@@ -0,0 +1,101 @@
+"""
+Parses a directory of JSON translation catalogs into a single serialized
+bundle, which can be read back with pyicumessageformat.serialize.load.
+
+    python -m pyicumessageformat.precompile SOURCE OUTPUT [--options JSON]
+
+Every .json file below SOURCE should contain an object of message ids to
+message strings. Nested objects are flattened, joining their keys with
+dots. The bundle maps each file's path relative to SOURCE, without the
+extension, to a dict of message ids to ASTs.
+"""
+
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from . import serialize
+from .parser import Parser
+
+
+def flatten(data, prefix = ''):
+    out = {}
+    for key, value in data.items():
+        key = prefix + key
+        if isinstance(value, dict):
+            out.update(flatten(value, key + '.'))
+        elif isinstance(value, str):
+            out[key] = value
+        else:
+            raise ValueError("message {} is not a string".format(key))
+    return out
+
+
+def findCatalogs(source):
+    for root, dirs, files in os.walk(source):
+        dirs.sort()
+        for filename in sorted(files):
+            if filename.endswith('.json'):
+                path = os.path.join(root, filename)
+                name = os.path.relpath(path, source)[:-len('.json')]
+                yield name.replace(os.sep, '/'), path
+
+
+def precompile(source, parser, workers = None):
+    # One pool is shared by every file, as trees of many small catalogs
+    # would otherwise spend most of their time starting processes.
+    if workers and workers > 1:
+        with ProcessPoolExecutor(workers) as executor:
+            return precompileFiles(source, parser, executor)
+    return precompileFiles(source, parser, None)
+
+
+def precompileFiles(source, parser, executor):
+    bundle = {}
+    errors = {}
+    for name, path in findCatalogs(source):
+        with open(path, encoding = 'utf-8') as file:
+            messages = flatten(json.load(file))
+
+        results, failed = parser.parse_many(messages, executor = executor)
+        bundle[name] = results
+        for key, err in failed.items():
+            errors[name, key] = err
+
+    return bundle, errors
+
+
+def main(argv = None):
+    args = argparse.ArgumentParser(
+        prog = 'python -m pyicumessageformat.precompile',
+        description = 'Parse a directory of JSON catalogs into one serialized bundle.')
+    args.add_argument('source', help = 'directory of .json catalogs')
+    args.add_argument('output', help = 'file to write the bundle to')
+    args.add_argument('--options', default = '{}', help = 'parser options, as a JSON object')
+    args.add_argument('--workers', type = int, default = None, help = 'number of processes to parse with')
+    args = args.parse_args(argv)
+
+    parser = Parser(json.loads(args.options))
+    bundle, errors = precompile(args.source, parser, args.workers)
+
+    if errors:
+        for (name, key), err in errors.items():
+            print('{}: {}: {}'.format(name, key, err), file = sys.stderr)
+        return 1
+
+    # Written to a temporary file first, so a failed build never leaves a
+    # partial bundle behind.
+    temp = args.output + '.tmp'
+    with open(temp, 'wb') as file:
+        serialize.dump(bundle, file, parser)
+    os.replace(temp, args.output)
+
+    print('{} messages in {} catalogs'.format(
+        sum(len(x) for x in bundle.values()), len(bundle)))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,87 @@
+import json
+import marshal
+import struct
+from collections.abc import Mapping
+
+from .nodes import fromDict, toDict
+
+# A serialized file is:
+#   MAGIC, FORMAT_VERSION (1 byte), header length (4 bytes, big endian),
+#   a JSON header with the parser options, and then a marshal payload.
+# The payload is either an AST, or nested dicts with ASTs as the leaves.
+# ASTs are always stored as dicts, whatever form they were given in.
+
+MAGIC = b'PYICUMF\0'
+FORMAT_VERSION = 1
+PREFIX = struct.Struct('>{}sBI'.format(len(MAGIC)))
+
+# Options that only change how results are produced or returned, not
+# what they are.
+IGNORED_OPTIONS = (
+    'cache_size', 'ast_nodes', 'iterative', 'intern_strings', 'collect_stats', 'file_cache'
+)
+
+
+def fingerprint(parser):
+    # Lists of types are sets as far as the parser is concerned.
+    options = {
+        key: sorted(value) if isinstance(value, (list, tuple, set, frozenset)) else value
+        for key, value in parser._options.items()
+        if key not in IGNORED_OPTIONS
+    }
+    return json.loads(json.dumps(options, sort_keys = True))
+
+
+def mapLeaves(data, fn):
+    if isinstance(data, Mapping):
+        return {key: mapLeaves(value, fn) for key, value in data.items()}
+    return fn(data)
+
+
+def dumps(data, parser):
+    header = json.dumps({'options': fingerprint(parser)}, sort_keys = True).encode('utf-8')
+    payload = mapLeaves(data, lambda ast: ast if isinstance(ast, list) else toDict(ast))
+    return PREFIX.pack(MAGIC, FORMAT_VERSION, len(header)) + header + marshal.dumps(payload)
+
+
+def dump(data, file, parser):
+    file.write(dumps(data, parser))
+
+
+def readHeader(data):
+    view = memoryview(data)
+    if len(view) < PREFIX.size:
+        raise ValueError("not a serialized pyicumessageformat file")
+
+    magic, version, length = PREFIX.unpack(view[:PREFIX.size])
+    if magic != MAGIC:
+        raise ValueError("not a serialized pyicumessageformat file")
+    if version != FORMAT_VERSION:
+        raise ValueError("unsupported format version {}".format(version))
+
+    end = PREFIX.size + length
+    return json.loads(bytes(view[PREFIX.size:end]).decode('utf-8')), end
+
+
+def header(data):
+    return readHeader(data)[0]
+
+
+def loads(data, parser = None):
+    info, end = readHeader(data)
+
+    if parser is not None and info['options'] != fingerprint(parser):
+        raise ValueError("data was serialized with different parser options")
+
+    # Accepts anything with the buffer protocol, such as an mmap, without
+    # copying the payload first.
+    payload = marshal.loads(memoryview(data)[end:])
+
+    if parser is not None and parser._ast_nodes:
+        tag_type = parser._tag_type
+        return mapLeaves(payload, lambda ast: fromDict(ast, tag_type))
+    return payload
+
+
+def load(file, parser = None):
+    return loads(file.read(), parser)
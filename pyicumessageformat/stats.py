@@ -0,0 +1,150 @@
+from collections import namedtuple
+from time import perf_counter
+
+StatsInfo = namedtuple('StatsInfo', [
+    'messages', 'characters', 'fast_path', 'text_characters', 'placeholders',
+    'submessages', 'tags', 'tag_checks', 'backtracks', 'tokens', 'max_depth', 'times'
+])
+
+# The phase that the time spent in each method, not counting the time
+# spent in other methods listed here, is added to.
+PHASES = {
+    '_parse': 'other',
+    '_parseAST': 'other',
+    '_parseNested': 'other',
+    '_parseSimple': 'fast_path',
+    '_parseText': 'text',
+    '_canReadTag': 'tag_checks',
+    '_parseTagHead': 'tags',
+    '_parseTagTail': 'tags',
+    '_parsePlaceholderHead': 'placeholders',
+    '_parsePlaceholderTail': 'placeholders',
+    '_parseSubmessages': 'submessages',
+    '_parseSelector': 'submessages',
+    '_parseSubmessageEnd': 'submessages',
+    '_checkSubmessages': 'submessages'
+}
+
+
+class ParserStats:
+    def __init__(self):
+        self.times = dict.fromkeys(sorted(set(PHASES.values())), 0.0)
+        self._running = []
+        self.clear()
+
+
+    def clear(self):
+        self.messages = 0
+        self.characters = 0
+        self.fast_path = 0
+        self.text_characters = 0
+        self.placeholders = 0
+        self.submessages = 0
+        self.tags = 0
+        self.tag_checks = 0
+        self.backtracks = 0
+        self.tokens = 0
+        self.max_depth = 0
+        for phase in self.times:
+            self.times[phase] = 0.0
+
+
+    def info(self):
+        return StatsInfo(
+            self.messages, self.characters, self.fast_path, self.text_characters,
+            self.placeholders, self.submessages, self.tags, self.tag_checks,
+            self.backtracks, self.tokens, self.max_depth, dict(self.times))
+
+
+    def instrument(self, parser):
+        # Replaces the methods of this one Parser with ones that keep count,
+        # leaving the class, and so every other Parser, untouched.
+        for name, phase in PHASES.items():
+            setattr(parser, name, self._timed(phase, getattr(parser, name)))
+
+        parse = parser._parse
+        parseSimple = parser._parseSimple
+        parseText = parser._parseText
+        canReadTag = parser._canReadTag
+        parsePlaceholderHead = parser._parsePlaceholderHead
+        parseSelector = parser._parseSelector
+        submessage_types = parser._submessage_types
+
+        def _parse(context):
+            tokens = context.tokens
+            count = len(tokens) if tokens is not None else 0
+            self.messages += 1
+            self.characters += context.length
+            try:
+                return parse(context)
+            finally:
+                if tokens is not None:
+                    self.tokens += len(tokens) - count
+
+        def _parseSimple(context):
+            result = parseSimple(context)
+            if result is not None:
+                self.fast_path += 1
+                for node in result:
+                    if isinstance(node, str):
+                        self.text_characters += len(node)
+                    else:
+                        self.placeholders += 1
+            return result
+
+        def _parseText(context, *args):
+            start = context.i
+            try:
+                return parseText(context, *args)
+            finally:
+                self.text_characters += context.i - start
+
+        def _canReadTag(*args):
+            self.tag_checks += 1
+            return canReadTag(*args)
+
+        def _parsePlaceholderHead(context, parent):
+            node, start, kind = result = parsePlaceholderHead(context, parent)
+            if kind == 'tag':
+                self.tags += 1
+            else:
+                self.placeholders += 1
+                # loose_submessages read sub-messages as a style first.
+                if kind == 'options' and node['type'] not in submessage_types:
+                    self.backtracks += 1
+            return result
+
+        def _parseSelector(context):
+            selector = parseSelector(context)
+            if selector is not None:
+                self.submessages += 1
+                if context.depth > self.max_depth:
+                    self.max_depth = context.depth
+            return selector
+
+        parser._parse = _parse
+        parser._parseSimple = _parseSimple
+        parser._parseText = _parseText
+        parser._canReadTag = _canReadTag
+        parser._parsePlaceholderHead = _parsePlaceholderHead
+        parser._parseSelector = _parseSelector
+
+
+    def _timed(self, phase, method):
+        times = self.times
+        running = self._running
+
+        def timed(*args):
+            # The time spent in the methods this one calls is kept on a
+            # stack, so only the rest counts towards its own phase.
+            running.append(0.0)
+            start = perf_counter()
+            try:
+                return method(*args)
+            finally:
+                elapsed = perf_counter() - start
+                times[phase] += elapsed - running.pop()
+                if running:
+                    running[-1] += elapsed
+
+        return timed
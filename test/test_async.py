@@ -0,0 +1,165 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from pyicumessageformat import Parser
+
+parser = Parser({'allow_tags': True})
+
+long_message = ' '.join(
+    '{{n{}, plural, one {{# <b>{{a}}</b>}} other {{# things}}}} text'.format(i)
+    for i in range(200)
+)
+
+messages = {
+    'hello': 'Hello, {name}!',
+    'broken': '{a',
+    'photos': '{n, plural, one {# photo} other {# photos}}',
+    'long': long_message,
+    'tag': '<b>bold</b>'
+}
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+@pytest.mark.parametrize('input', [
+    '',
+    'Hello, {name}!',
+    '{n, plural, offset:1 =0 {none} other {# <b>{name}</b>}}',
+    long_message
+])
+@pytest.mark.parametrize('yield_every', [1, 64, 4096])
+def test_aparse(input, yield_every):
+    tokens = []
+    expected_tokens = []
+
+    assert run(parser.aparse(input, tokens, yield_every = yield_every)) == parser.parse(input, expected_tokens)
+    assert tokens == expected_tokens
+
+def test_aparse_options():
+    nodes = Parser({'allow_tags': True, 'ast_nodes': True, 'include_indices': True})
+    assert run(nodes.aparse(long_message, yield_every = 10)) == nodes.parse(long_message)
+
+def test_aparse_errors():
+    with pytest.raises(SyntaxError) as expected:
+        parser.parse(long_message + ' }')
+
+    with pytest.raises(SyntaxError) as info:
+        run(parser.aparse(long_message + ' }', yield_every = 10))
+
+    assert str(info.value) == str(expected.value)
+
+    with pytest.raises(SyntaxError):
+        run(parser.aparse(long_message + ' {', yield_every = 10))
+
+def test_aparse_executor():
+    tokens = []
+    expected_tokens = []
+    with ThreadPoolExecutor(2) as executor:
+        result = run(parser.aparse(long_message, tokens, executor = executor))
+
+    assert result == parser.parse(long_message, expected_tokens)
+    assert tokens == expected_tokens
+
+def test_aparse_yields():
+    ticks = []
+
+    async def ticker():
+        while True:
+            ticks.append(None)
+            await asyncio.sleep(0)
+
+    async def main():
+        task = asyncio.ensure_future(ticker())
+        await asyncio.sleep(0)
+        count = len(ticks)
+        await parser.aparse(long_message, yield_every = 100)
+        during = len(ticks) - count
+        task.cancel()
+        return during
+
+    assert run(main()) > 10
+
+def test_aparse_cache():
+    cached = Parser({'cache_size': 8})
+    first = run(cached.aparse(long_message, yield_every = 100))
+    assert run(cached.aparse(long_message, yield_every = 100)) == first
+    assert cached.cache_info().hits == 1
+
+def test_aparse_executor_cache():
+    cached = Parser({'cache_size': 8})
+    tokens = []
+    with ThreadPoolExecutor(2) as executor:
+        first = run(cached.aparse(long_message, tokens, executor = executor))
+        again = []
+        assert run(cached.aparse(long_message, again, executor = executor)) == first
+
+    assert cached.cache_info().hits == 1
+    assert again == tokens
+
+@pytest.mark.parametrize('yield_every', [1, 4096])
+def test_aparse_many(yield_every):
+    results, errors = run(parser.aparse_many(messages, yield_every = yield_every))
+    expected_results, expected_errors = parser.parse_many(messages)
+
+    assert results == expected_results
+    assert list(errors) == list(expected_errors) == ['broken']
+    assert str(errors['broken']) == str(expected_errors['broken'])
+
+def test_aparse_many_executor():
+    with ThreadPoolExecutor(2) as executor:
+        results, errors = run(parser.aparse_many(list(messages.values()), chunk_size = 2, executor = executor))
+
+    assert results == parser.parse_many(list(messages.values()))[0]
+    assert list(errors) == [1]
+
+def test_invalid_arguments():
+    with pytest.raises(TypeError):
+        run(parser.aparse(None))
+
+    with pytest.raises(TypeError):
+        run(parser.aparse('', ()))
+
+    with pytest.raises(ValueError):
+        run(parser.aparse('', yield_every = 0))
+
+    with pytest.raises(ValueError):
+        run(parser.aparse_many([], chunk_size = 0))
+
+    with pytest.raises(ValueError):
+        run(parser.aparse_many([], yield_every = 0))
+
+def test_aparse_yields_nested():
+    ticks = []
+    input = '{n, plural, other {' + '{a} <b>{b}</b> text '.join(['x'] * 500) + '}}'
+
+    async def ticker():
+        while True:
+            ticks.append(None)
+            await asyncio.sleep(0)
+
+    async def main():
+        task = asyncio.ensure_future(ticker())
+        await asyncio.sleep(0)
+        count = len(ticks)
+        result = await parser.aparse(input, yield_every = 100)
+        during = len(ticks) - count
+        task.cancel()
+        return result, during
+
+    result, during = run(main())
+    assert result == parser.parse(input)
+    assert during > 10
+
+def test_aparse_nested_errors():
+    input = '{n, plural, other {' + '{a} text ' * 100 + '{b}'
+
+    with pytest.raises(SyntaxError) as expected:
+        parser.parse(input)
+
+    with pytest.raises(SyntaxError) as info:
+        run(parser.aparse(input, yield_every = 10))
+
+    assert str(info.value) == str(expected.value)
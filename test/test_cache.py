@@ -0,0 +1,97 @@
+import pytest
+
+from pyicumessageformat import Parser
+
+
+def test_disabled_by_default():
+    parser = Parser()
+    parser.parse('Hello, {name}!')
+    parser.parse('Hello, {name}!')
+
+    info = parser.cache_info()
+    assert info.hits == 0
+    assert info.misses == 0
+    assert info.maxsize == 0
+
+def test_hits_and_misses():
+    parser = Parser({'cache_size': 10})
+    first = parser.parse('Hello, {name}!')
+    second = parser.parse('Hello, {name}!')
+
+    assert first == second == ['Hello, ', {'name': 'name'}, '!']
+
+    info = parser.cache_info()
+    assert info.hits == 1
+    assert info.misses == 1
+    assert info.currsize == 1
+
+def test_results_are_copies():
+    parser = Parser({'cache_size': 10})
+    input = '{n, plural, one {# thing} other {# things}}'
+
+    first = parser.parse(input)
+    first[0]['options']['one'].append('corrupted')
+    first[0]['name'] = 'corrupted'
+
+    second = parser.parse(input)
+    assert second[0]['name'] == 'n'
+    assert second[0]['options']['one'] == [
+        {'name': 'n', 'type': 'number', 'hash': True},
+        ' thing'
+    ]
+
+    second[0]['options']['other'].clear()
+    assert parser.parse(input)[0]['options']['other'] != []
+
+def test_tokens():
+    parser = Parser({'cache_size': 10})
+
+    assert parser.parse('Hi {name}')
+    tokens = []
+    assert parser.parse('Hi {name}', tokens)
+    assert parser.cache_info().hits == 0
+    assert ''.join(x['text'] for x in tokens) == 'Hi {name}'
+
+    cached = ['existing']
+    parser.parse('Hi {name}', cached)
+    assert cached == ['existing'] + tokens
+    assert parser.cache_info().hits == 1
+
+    cached[1]['text'] = 'corrupted'
+    again = []
+    parser.parse('Hi {name}', again)
+    assert again == tokens
+
+def test_eviction():
+    parser = Parser({'cache_size': 2})
+    parser.parse('a')
+    parser.parse('b')
+    parser.parse('a')
+    parser.parse('c')
+
+    info = parser.cache_info()
+    assert info.evictions == 1
+    assert info.currsize == 2
+
+    # 'b' was the least recently used, so it is gone.
+    parser.parse('a')
+    parser.parse('b')
+    info = parser.cache_info()
+    assert info.hits == 2
+    assert info.misses == 4
+
+def test_errors_are_not_cached():
+    parser = Parser({'cache_size': 10})
+    for _ in range(2):
+        with pytest.raises(SyntaxError, match='Expected , or }'):
+            parser.parse('{a')
+
+    assert parser.cache_info().currsize == 0
+
+def test_clear():
+    parser = Parser({'cache_size': 10})
+    parser.parse('a')
+    parser.parse('a')
+    parser.cache_clear()
+
+    assert parser.cache_info() == (0, 0, 0, 10, 0)
@@ -0,0 +1,109 @@
+import traceback
+
+import pytest
+
+from pyicumessageformat import Catalog, Parser
+from pyicumessageformat.catalog import CatalogInfo
+
+messages = {
+    'hello': 'Hello, {name}!',
+    'broken': '{a',
+    'photos': '{n, plural, one {# photo} other {# photos}}',
+    'tag': '<b>bold</b>'
+}
+
+
+def test_lazy():
+    catalog = Catalog(messages, Parser({'allow_tags': True}))
+    assert catalog.stats_info() == CatalogInfo(4, 0, 0)
+
+    assert catalog['hello'] == ['Hello, ', {'name': 'name'}, '!']
+    assert catalog.stats_info() == CatalogInfo(4, 1, 0)
+
+def test_memoized():
+    catalog = Catalog(messages)
+    assert catalog['photos'] is catalog['photos']
+    assert catalog.stats_info().materialized == 1
+
+def test_matches_parse():
+    parser = Parser({'allow_tags': True})
+    catalog = Catalog(messages, parser)
+    results, errors = parser.parse_many(messages)
+
+    for key, ast in results.items():
+        assert catalog[key] == ast
+
+def test_errors():
+    catalog = Catalog(messages)
+    with pytest.raises(SyntaxError) as first:
+        catalog['broken']
+
+    with pytest.raises(SyntaxError) as second:
+        catalog['broken']
+
+    assert first.value is second.value
+    assert 'Expected , or }' in str(first.value)
+    assert catalog.stats_info() == CatalogInfo(4, 0, 1)
+
+    assert catalog.get('missing') is None
+
+def test_error_traceback():
+    catalog = Catalog(messages)
+    lengths = []
+    for i in range(5):
+        try:
+            catalog['broken']
+        except SyntaxError as err:
+            lengths.append(len(traceback.extract_tb(err.__traceback__)))
+
+    assert len(set(lengths)) == 1
+
+def test_missing():
+    catalog = Catalog(messages)
+    with pytest.raises(KeyError):
+        catalog['missing']
+
+    assert 'hello' in catalog
+    assert 'missing' not in catalog
+    assert catalog.stats_info().materialized == 0
+
+def test_mapping():
+    catalog = Catalog(messages)
+    assert len(catalog) == 4
+    assert list(catalog) == list(messages)
+    assert catalog.message('broken') == '{a'
+    assert catalog.stats_info().materialized == 0
+
+def test_iterable():
+    catalog = Catalog(['a', '{b}'])
+    assert list(catalog) == [0, 1]
+    assert catalog[1] == [{'name': 'b'}]
+
+def test_copies_messages():
+    source = dict(messages)
+    catalog = Catalog(source)
+    source['hello'] = 'changed'
+    assert catalog.message('hello') == 'Hello, {name}!'
+
+def test_warm():
+    catalog = Catalog(messages, Parser({'allow_tags': True}))
+    assert catalog.warm(['hello', 'broken', 'missing']) is None
+    assert catalog.stats_info() == CatalogInfo(4, 1, 1)
+
+    ast = catalog['hello']
+    catalog.warm()
+    assert catalog.stats_info() == CatalogInfo(4, 3, 1)
+    assert catalog['hello'] is ast
+
+def test_warm_background():
+    catalog = Catalog({i: '{{n{}}}'.format(i) for i in range(1000)})
+    thread = catalog.warm(range(500), background = True)
+
+    assert catalog[999] == [{'name': 'n999'}]
+    thread.join()
+    assert catalog.stats_info() == CatalogInfo(1000, 501, 0)
+    assert catalog[10] is catalog[10]
+
+def test_parser_type():
+    with pytest.raises(TypeError):
+        Catalog(messages, {'allow_tags': True})
@@ -0,0 +1,128 @@
+import pytest
+
+from pyicumessageformat import Compiler, Parser
+
+parser = Parser({'allow_tags': True})
+
+def english(value, ordinal):
+    if ordinal:
+        return 'other'
+    return 'one' if value == 1 else 'other'
+
+compiler = Compiler({'plural': english})
+
+def format(input, **values):
+    return compiler.compile(parser.parse(input))(values)
+
+
+def test_text():
+    assert format('') == ''
+    assert format('Hello, World!') == 'Hello, World!'
+    assert format("It''s '{'escaped'}'") == "It's {escaped}"
+
+def test_placeholder():
+    assert format('Hello, {name}!', name = 'Bob') == 'Hello, Bob!'
+    assert format('{a}{b}{a}', a = 1, b = 2) == '121'
+
+    with pytest.raises(KeyError):
+        format('Hello, {name}!')
+
+def test_formatters():
+    x = Compiler({
+        'formatters': {
+            'number': lambda value, fmt: '{}:{}'.format(fmt, value)
+        }
+    })
+
+    fn = x.compile(parser.parse('{n, number} {n, number, percent} {n, date}'))
+    assert fn({'n': 5}) == 'None:5 percent:5 5'
+
+def test_select():
+    input = '{gender, select, male {He} female {She} other {They}} left.'
+    assert format(input, gender = 'male') == 'He left.'
+    assert format(input, gender = 'female') == 'She left.'
+    assert format(input, gender = 'robot') == 'They left.'
+
+def test_plural():
+    input = '{n, plural, =0 {no photos} one {# photo} other {# photos}}'
+    assert format(input, n = 0) == 'no photos'
+    assert format(input, n = 1) == '1 photo'
+    assert format(input, n = 7) == '7 photos'
+    assert format(input, n = '0') == 'no photos'
+    assert format(input, n = 2.5) == '2.5 photos'
+
+def test_plural_offset():
+    input = '{n, plural, offset:1 =0 {nobody} =1 {just {name}} one {{name} and # other} other {{name} and # others}}'
+    assert format(input, n = 0, name = 'Al') == 'nobody'
+    assert format(input, n = 1, name = 'Al') == 'just Al'
+    assert format(input, n = 2, name = 'Al') == 'Al and 1 other'
+    assert format(input, n = 5, name = 'Al') == 'Al and 4 others'
+
+def test_nested_hash():
+    input = '{a, plural, other {# {b, plural, offset:2 other {# #}}}}'
+    assert format(input, a = 1, b = 5) == '1 3 3'
+
+    # The parser only treats # as special directly within a plural.
+    input = '{a, plural, other {{b, select, other {#}}}}'
+    assert format(input, a = 4, b = 'x') == '#'
+
+def test_selectordinal():
+    calls = []
+
+    def plural(value, ordinal):
+        calls.append((value, ordinal))
+        return 'other'
+
+    x = Compiler({'plural': plural})
+    fn = x.compile(parser.parse('{n, selectordinal, =3 {third} one {#st} other {#th}}'))
+    assert fn({'n': 3}) == 'third'
+    assert fn({'n': 4}) == '4th'
+    assert calls == [(4, True)]
+
+    # Without any categories to pick from, the callback is skipped.
+    fn = x.compile(parser.parse('{n, selectordinal, =3 {third} other {#th}}'))
+    assert fn({'n': 5}) == '5th'
+    assert calls == [(4, True)]
+
+def test_quoting():
+    input = "{n, select, 50% {100%} other {'{'{n}'}' %s}}"
+    assert format(input, n = '50%') == '100%'
+    assert format(input, n = '%d') == '{%d} %s'
+
+def test_missing_other():
+    x = Parser({'require_other': False})
+    fn = compiler.compile(x.parse('{n, select, a {A}}'))
+    assert fn({'n': 'a'}) == 'A'
+    assert fn({'n': 'b'}) == ''
+
+def test_tags():
+    input = 'Click <link>here for {n, plural, one {# thing} other {# things}}</link><br/>'
+    assert format(input, n = 2) == 'Click <link>here for 2 things</link><br/>'
+
+    x = Compiler({
+        'plural': english,
+        'tag': lambda name, contents: '[{}:{}]'.format(name, contents)
+    })
+    assert x.compile(parser.parse(input))({'n': 1}) == 'Click [link:here for 1 thing][br:None]'
+
+def test_reuse():
+    fn = compiler.compile(parser.parse('{n, plural, one {# item} other {# items}}'))
+    assert [fn({'n': n}) for n in range(3)] == ['0 items', '1 item', '2 items']
+
+def test_input_types():
+    with pytest.raises(TypeError, match='ast'):
+        compiler.compile('Hello!')
+
+def test_deep_nesting():
+    input = '{x}'
+    for i in range(45):
+        input = '{{v{0}, select, a {{{0}{1}}} other {{-}}}}'.format(i, input)
+
+    values = {'v{}'.format(i): 'a' for i in range(45)}
+    values['x'] = '!'
+    assert format(input, **values) == ''.join(str(i) for i in reversed(range(45))) + '!'
+
+def test_too_deep():
+    deep = Parser({'allow_tags': True, 'iterative': True, 'maximum_depth': 10000})
+    with pytest.raises(ValueError, match='nested too deeply'):
+        compiler.compile(deep.parse('<b>' * 3000 + 'x' + '</b>' * 3000))
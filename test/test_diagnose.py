@@ -0,0 +1,134 @@
+import pytest
+
+from pyicumessageformat import Parser
+from pyicumessageformat.parser import Diagnostic
+
+
+def texts(tokens):
+    return [(token['type'], token['text']) for token in tokens]
+
+@pytest.fixture(params = [False, True], ids = ['recursive', 'iterative'])
+def parser(request):
+    return Parser({'allow_tags': True, 'iterative': request.param})
+
+@pytest.mark.parametrize('input', [
+    '',
+    'Hello, {name}!',
+    '{n, plural, offset:1 =0 {none} other {# <b>{name}</b>}}',
+    "It''s '{'escaped'}'"
+])
+def test_valid(parser, input):
+    tokens = []
+    expected_tokens = []
+
+    assert parser.diagnose(input, tokens) == (parser.parse(input, expected_tokens), [])
+    assert tokens == expected_tokens
+
+def test_first_error_is_parse_error(parser):
+    input = 'Hello, {name{! and {ok} }'
+    with pytest.raises(SyntaxError) as info:
+        parser.parse(input)
+
+    ast, diagnostics = parser.diagnose(input)
+    assert diagnostics[0].message == str(info.value)
+
+def test_all_errors(parser):
+    input = '{a b} text {n, plural, one {x} } {c,} {d}'
+    ast, diagnostics = parser.diagnose(input)
+
+    assert ast == [' text ', ' ', ' ', {'name': 'd'}]
+    assert diagnostics == [
+        Diagnostic('expected', 'Expected , or } at position 3 but found "b"', 3, 5),
+        Diagnostic('expected', 'Expected plural sub-message other at position 31 but found "}"', 31, 32),
+        Diagnostic('expected', 'Expected placeholder type at position 36 but found "}"', 36, 37)
+    ]
+
+def test_submessages(parser):
+    input = '{n, plural, one {a {x y} b} other {<b x>c</b> {n}}} tail'
+    ast, diagnostics = parser.diagnose(input)
+
+    assert ast == [{
+        'name': 'n',
+        'type': 'plural',
+        'offset': 0,
+        'options': {
+            'one': ['a ', ' b'],
+            'other': [' ', {'name': 'n'}]
+        }
+    }, ' tail']
+    assert [x.code for x in diagnostics] == ['expected', 'expected']
+    assert [input[x.start:x.end] for x in diagnostics] == ['y}', 'x>c</b>']
+
+def test_stray_close(parser):
+    ast, diagnostics = parser.diagnose('a } b')
+
+    assert ast == ['a ', ' b']
+    assert diagnostics == [Diagnostic('unexpected', 'Unexpected "}" at position 2', 2, 3)]
+
+def test_unclosed(parser):
+    input = '<b>{n, plural, other {x}'
+    ast, diagnostics = parser.diagnose(input)
+
+    assert ast == []
+    assert diagnostics == [
+        Diagnostic('expected', 'Expected } at position 24 but found "<EOF>"', 24, 24),
+        Diagnostic('expected', 'Expected </b> at position 24 but found "<EOF>"', 24, 24)
+    ]
+
+def test_tokens(parser):
+    input = 'a {b c} <i>{d}</b> {e}'
+    tokens = []
+    parser.diagnose(input, tokens)
+
+    assert ''.join(token['text'] for token in tokens) == input
+    assert texts(tokens) == [
+        ('text', 'a '),
+        ('syntax', '{'),
+        ('name', 'b'),
+        ('space', ' '),
+        ('error', 'c}'),
+        ('text', ' '),
+        ('syntax', '<'),
+        ('name', 'i'),
+        ('syntax', '>'),
+        ('syntax', '{'),
+        ('name', 'd'),
+        ('syntax', '}'),
+        ('syntax', '</'),
+        ('name', 'b'),
+        ('error', '>'),
+        ('text', ' '),
+        ('syntax', '{'),
+        ('name', 'e'),
+        ('syntax', '}')
+    ]
+
+def test_recursion():
+    parser = Parser({'maximum_depth': 2})
+    ast, diagnostics = parser.diagnose('{a, select, other {{b, select, other {{c}}}}} {d}')
+
+    assert ast == [{'name': 'a', 'type': 'select', 'options': {'other': []}}, ' ', {'name': 'd'}]
+    assert [x.code for x in diagnostics] == ['recursion']
+
+def test_depth_is_restored():
+    parser = Parser({'maximum_depth': 3})
+    input = '{a, select, other {{b, select, x}}} {c, select, other {{d, select, other {}}}}'
+    ast, diagnostics = parser.diagnose(input)
+
+    assert len(diagnostics) == 1
+    assert ast[0]['options'] == {'other': []}
+    assert ast[2]['options']['other'][0]['name'] == 'd'
+
+def test_ast_nodes():
+    parser = Parser({'ast_nodes': True})
+    ast, diagnostics = parser.diagnose('{a b} {c}')
+
+    assert ast[1].name == 'c'
+    assert len(diagnostics) == 1
+
+def test_input_type():
+    with pytest.raises(TypeError):
+        Parser().diagnose(None)
+
+    with pytest.raises(TypeError):
+        Parser().diagnose('', ())
@@ -0,0 +1,65 @@
+import pickle
+
+import pytest
+
+from pyicumessageformat import MessageFormatSyntaxError, Parser
+from pyicumessageformat import errors
+
+
+def error(input, options = None):
+    with pytest.raises(MessageFormatSyntaxError) as info:
+        Parser(options).parse(input)
+    return info.value
+
+def test_expected():
+    err = error('Hello, {name{!')
+
+    assert isinstance(err, SyntaxError)
+    assert (err.code, err.position, err.expected, err.found) == ('expected', 12, ', or }', '{')
+    assert str(err) == 'Expected , or } at position 12 but found "{"'
+    assert repr(err) == 'MessageFormatSyntaxError(\'Expected , or } at position 12 but found "{"\')'
+
+def test_expected_eof():
+    err = error('{name')
+
+    assert (err.code, err.position, err.found) == ('expected', 5, '<EOF>')
+    assert str(err) == 'Expected , or } at position 5 but found "<EOF>"'
+
+def test_unexpected():
+    err = error('oops }')
+
+    assert (err.code, err.position, err.expected, err.found) == ('unexpected', 5, None, '}')
+    assert str(err) == 'Unexpected "}" at position 5'
+
+def test_recursion():
+    err = error('{a, select, other {{b, select, other {}}}}', {'maximum_depth': 2})
+
+    assert (err.code, err.position) == ('recursion', 37)
+    assert str(err) == 'Too much recursion at position 37'
+
+def test_lazy(monkeypatch):
+    monkeypatch.setitem(errors.MESSAGES, 'expected', None)
+    err = error('Hello, {name{!')
+
+    assert err.position == 12
+    with pytest.raises(AttributeError):
+        str(err)
+
+def test_pickle():
+    err = pickle.loads(pickle.dumps(error('Hello, {name{!')))
+
+    assert type(err) is MessageFormatSyntaxError
+    assert (err.code, err.position, err.expected, err.found) == ('expected', 12, ', or }', '{')
+    assert str(err) == 'Expected , or } at position 12 but found "{"'
+
+def test_parse_many_workers():
+    results, errors = Parser().parse_many(['{a}', '{b'], workers = 2)
+
+    assert isinstance(errors[1], MessageFormatSyntaxError)
+    assert errors[1].position == 2
+
+def test_invalid():
+    err = error("{b,number, pe r 'ent other", {'loose_submessages': True})
+
+    assert err.code == 'syntax'
+    assert str(err) == 'Invalid syntax at position {}'.format(err.position)
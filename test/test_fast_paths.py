@@ -0,0 +1,74 @@
+import pytest
+
+from pyicumessageformat import Parser
+from pyicumessageformat.parser import Context
+
+PARSERS = [
+    Parser(),
+    Parser({'include_indices': True}),
+    Parser({'allow_tags': True}),
+    Parser({'allow_tags': True, 'strict_tags': True}),
+    Parser({'ast_nodes': True, 'include_indices': True})
+]
+
+MESSAGES = [
+    '',
+    'Hello, world!',
+    'Hello, {name}!',
+    '{a}{b}',
+    '{ name }',
+    '{　name\t}',
+    "It's {count}",
+    "Don't",
+    "'",
+    "trailing '",
+    "''",
+    "'{name}'",
+    "'#'",
+    '# is not special here',
+    '1 < 2',
+    '<b>bold</b>',
+    '{name, number}',
+    '{n, plural, other {#}}',
+    'Hello, {name{!',
+    'oops }',
+    '{}'
+]
+
+
+def parse(parser, input):
+    tokens = []
+    try:
+        return parser.parse(input, tokens), tokens
+    except SyntaxError as err:
+        return str(err), tokens
+
+@pytest.mark.parametrize('input', MESSAGES)
+@pytest.mark.parametrize('parser', PARSERS)
+def test_same_as_general(parser, input, monkeypatch):
+    fast = parse(parser, input)
+    monkeypatch.setattr(Parser, '_fast_paths', False)
+    assert fast == parse(parser, input)
+
+@pytest.mark.parametrize('input, simple', [
+    ('Hello, world!', True),
+    ('Hello, {name}!', True),
+    ('{ a }{b}', True),
+    ("It's", True),
+    ("It''s", False),
+    ("'{a}'", False),
+    ('{a, number}', False),
+    ('{a}}', False)
+])
+def test_shapes(input, simple):
+    result = Parser()._parseSimple(Context(input))
+    assert (result is not None) == simple
+
+def test_tags_are_not_simple():
+    assert Parser()._parseSimple(Context('<b>')) == ['<b>']
+    assert Parser({'allow_tags': True})._parseSimple(Context('<b>')) is None
+
+def test_no_tokens_when_not_simple():
+    tokens = []
+    assert Parser()._parseSimple(Context('{a} {b, number}', tokens)) is None
+    assert tokens == []
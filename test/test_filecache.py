@@ -0,0 +1,234 @@
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from pyicumessageformat import FileCache, Parser
+from pyicumessageformat.filecache import FileCacheInfo, namespace
+
+message = '{n, plural, offset:1 =0 {none} one {{a}} other {# <b>{name}</b> {b}}}'
+
+
+def entries(directory):
+    return sorted(
+        name
+        for folder in os.listdir(str(directory))
+        for name in os.listdir(os.path.join(str(directory), folder))
+    )
+
+def test_round_trip(tmp_path):
+    cache = FileCache(tmp_path, min_braces = 0)
+    first = Parser({'allow_tags': True, 'file_cache': cache})
+    second = Parser({'allow_tags': True, 'file_cache': cache})
+
+    expected = Parser({'allow_tags': True}).parse(message)
+    assert first.parse(message) == expected
+    assert cache.info() == FileCacheInfo(0, 1, 1, 0, cache.maxsize)
+
+    assert second.parse(message) == expected
+    assert cache.info() == FileCacheInfo(1, 1, 1, 0, cache.maxsize)
+    assert len(entries(tmp_path)) == 1
+
+def test_directory_option(tmp_path):
+    expected = Parser({'allow_tags': True}).parse(message)
+    Parser({'allow_tags': True, 'file_cache': str(tmp_path)}).parse(message)
+    assert Parser({'allow_tags': True, 'file_cache': tmp_path}).parse(message) == expected
+    assert len(entries(tmp_path)) == 1
+
+def test_min_braces(tmp_path):
+    cache = FileCache(tmp_path)
+    parser = Parser({'allow_tags': True, 'file_cache': cache})
+    parser.parse('{a} {b} {c}')
+    assert cache.info() == FileCacheInfo(0, 0, 0, 0, cache.maxsize)
+
+    parser.parse(message)
+    assert cache.info().writes == 1
+
+def test_options_fingerprint(tmp_path):
+    plain = Parser({'file_cache': str(tmp_path)})
+    tags = Parser({'file_cache': str(tmp_path), 'allow_tags': True})
+    nodes = Parser({'file_cache': str(tmp_path), 'ast_nodes': True, 'cache_size': 4})
+
+    assert namespace(plain) != namespace(tags)
+    assert namespace(plain) == namespace(nodes)
+
+    tagged = '<b>{a}</b>{b}{c}{d}{e}{f}'
+    plain.parse(tagged)
+    assert tags.parse(tagged)[0] == {'name': 'b', 'type': 'tag', 'contents': [{'name': 'a'}]}
+    assert len(entries(tmp_path)) == 2
+
+def test_version(tmp_path, monkeypatch):
+    from pyicumessageformat import filecache
+    parser = Parser({'file_cache': str(tmp_path)})
+    before = namespace(parser)
+    monkeypatch.setattr(filecache, '__version__', '0.0.0')
+    assert namespace(parser) != before
+
+def test_ast_nodes(tmp_path):
+    Parser({'allow_tags': True, 'file_cache': str(tmp_path)}).parse(message)
+    parser = Parser({'allow_tags': True, 'ast_nodes': True, 'file_cache': str(tmp_path)})
+
+    assert parser.parse(message) == Parser({'allow_tags': True, 'ast_nodes': True}).parse(message)
+    assert not isinstance(parser.parse(message)[0], dict)
+
+def test_interned(tmp_path):
+    input = '{name} {name} {a} {b} {c} {d}'
+    Parser({'file_cache': str(tmp_path)}).parse(input)
+    parser = Parser({'file_cache': str(tmp_path), 'intern_strings': True})
+    first = parser.parse(input)
+    assert first[0]['name'] is first[2]['name']
+    assert len(entries(tmp_path)) == 1
+
+def test_tokens_skip_cache(tmp_path):
+    cache = FileCache(tmp_path, min_braces = 0)
+    parser = Parser({'file_cache': cache})
+    tokens = []
+    assert parser.parse('{a}', tokens) == [{'name': 'a'}]
+    assert len(tokens) == 3
+    assert cache.info().writes == 0
+
+def test_errors_not_cached(tmp_path):
+    cache = FileCache(tmp_path, min_braces = 0)
+    parser = Parser({'file_cache': cache})
+    for _ in range(2):
+        with pytest.raises(SyntaxError):
+            parser.parse('{a')
+    assert cache.info().writes == 0
+
+def test_memory_cache(tmp_path):
+    cache = FileCache(tmp_path, min_braces = 0)
+    parser = Parser({'file_cache': cache, 'cache_size': 4})
+    parser.parse('{a}')
+    parser.parse('{a}')
+    assert cache.info().misses == 1
+    assert parser.cache_info().hits == 1
+
+def test_corrupt_entry(tmp_path):
+    cache = FileCache(tmp_path, min_braces = 0)
+    parser = Parser({'file_cache': cache})
+    parser.parse('{a}')
+
+    key = cache.key(namespace(parser), '{a}')
+    with open(cache.path(key), 'wb') as file:
+        file.write(b'\xff')
+
+    assert parser.parse('{a}') == [{'name': 'a'}]
+    assert parser.parse('{a}') == [{'name': 'a'}]
+    assert cache.info().hits == 1
+
+def test_atomic_writes(tmp_path):
+    cache = FileCache(tmp_path, min_braces = 0)
+    parser = Parser({'file_cache': cache})
+    for i in range(20):
+        parser.parse('{{a{}}}'.format(i))
+
+    names = entries(tmp_path)
+    assert len(names) == 20
+    assert not any(name.startswith('.') for name in names)
+
+def test_eviction(tmp_path):
+    cache = FileCache(tmp_path, maxsize = 2000, min_braces = 0)
+    parser = Parser({'file_cache': cache})
+    for i in range(200):
+        parser.parse('{{a{}}}'.format(i))
+
+    size = sum(
+        os.path.getsize(os.path.join(str(tmp_path), folder, name))
+        for folder in os.listdir(str(tmp_path))
+        for name in os.listdir(os.path.join(str(tmp_path), folder))
+    )
+    assert cache.info().evictions > 0
+    assert size <= 2000
+
+def test_eviction_keeps_recent(tmp_path):
+    cache = FileCache(tmp_path, maxsize = 10 ** 6, min_braces = 0)
+    parser = Parser({'file_cache': cache})
+    for i in range(10):
+        parser.parse('{{a{}}}'.format(i))
+
+    for i, name in enumerate(sorted(
+            os.path.join(str(tmp_path), folder, name)
+            for folder in os.listdir(str(tmp_path))
+            for name in os.listdir(os.path.join(str(tmp_path), folder)))):
+        os.utime(name, (i, i))
+
+    cache.get(cache.key(namespace(parser), '{a3}'))
+    cache.maxsize = 40
+    cache.evict()
+    assert parser.parse('{a3}') == [{'name': 'a3'}]
+    assert cache.info().hits == 2
+
+def test_clear(tmp_path):
+    cache = FileCache(tmp_path, min_braces = 0)
+    parser = Parser({'file_cache': cache})
+    parser.parse('{a}')
+    cache.clear()
+
+    assert entries(tmp_path) == []
+    assert cache.info() == FileCacheInfo(0, 0, 0, 0, cache.maxsize)
+
+def test_parse_many_workers(tmp_path):
+    parser = Parser({'file_cache': FileCache(tmp_path, min_braces = 0)})
+    messages = ['{{a{}}}'.format(i) for i in range(20)]
+    with ProcessPoolExecutor(2) as executor:
+        results, errors = parser.parse_many(messages, chunk_size = 5, executor = executor)
+
+    assert results[3] == [{'name': 'a3'}]
+    assert len(entries(tmp_path)) == 20
+
+def test_pickle(tmp_path):
+    cache = pickle.loads(pickle.dumps(FileCache(tmp_path, maxsize = 100)))
+    assert cache.directory == str(tmp_path)
+    assert cache.maxsize == 100
+
+def test_invalid_arguments(tmp_path):
+    with pytest.raises(TypeError):
+        Parser({'file_cache': 1})
+
+    with pytest.raises(TypeError):
+        FileCache(tmp_path, maxsize = 1.5)
+
+    with pytest.raises(ValueError):
+        FileCache(tmp_path, maxsize = -1)
+
+    with pytest.raises(ValueError):
+        FileCache(tmp_path, min_braces = -1)
+
+def directory_size(directory):
+    return sum(
+        os.path.getsize(os.path.join(str(directory), folder, name))
+        for folder in os.listdir(str(directory))
+        for name in os.listdir(os.path.join(str(directory), folder))
+    )
+
+def test_eviction_many_writers(tmp_path):
+    # Each FileCache stands in for a short-lived process that writes far
+    # less than an eighth of maxsize.
+    evictions = 0
+    for i in range(40):
+        cache = FileCache(tmp_path, maxsize = 2000, min_braces = 0)
+        parser = Parser({'file_cache': cache})
+        for j in range(5):
+            parser.parse('{{a{}_{}}}'.format(i, j))
+        evictions += cache.info().evictions
+
+    assert evictions > 0
+    assert directory_size(tmp_path) <= 2000 + 5 * 100
+
+def test_eviction_stale_temp_files(tmp_path):
+    cache = FileCache(tmp_path, min_braces = 0)
+    Parser({'file_cache': cache}).parse('{a}')
+    folder = os.path.join(str(tmp_path), os.listdir(str(tmp_path))[0])
+
+    stale = os.path.join(folder, '.tmp-stale')
+    fresh = os.path.join(folder, '.tmp-fresh')
+    for path in (stale, fresh):
+        with open(path, 'wb') as file:
+            file.write(b'partial')
+    os.utime(stale, (0, 0))
+
+    cache.evict()
+    assert not os.path.exists(stale)
+    assert os.path.exists(fresh)
+    assert cache.info().evictions == 0
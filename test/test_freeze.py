@@ -0,0 +1,73 @@
+import gc
+
+import pytest
+
+from pyicumessageformat import Parser
+from pyicumessageformat.freeze import freeze, freeze_catalog, thaw
+from pyicumessageformat.nodes import fromDict
+
+parser = Parser({'allow_tags': True, 'include_indices': True})
+nodes = Parser({'allow_tags': True, 'include_indices': True, 'ast_nodes': True})
+
+messages = [
+    '',
+    'Hello, {name}!',
+    '{n, plural, offset:1 =0 {none} other {# <b>{name}</b> photos}}',
+    '{g, select, male {he} female {she} other {they}} shared <link>photos</link>'
+]
+
+
+@pytest.mark.parametrize('message', messages)
+def test_round_trip(message):
+    ast = parser.parse(message)
+    frozen = freeze(ast)
+
+    assert frozen == nodes.parse(message) == fromDict(ast)
+    assert thaw(frozen) == ast
+    assert thaw(ast) is ast
+
+@pytest.mark.parametrize('message', messages)
+def test_nodes(message):
+    ast = nodes.parse(message)
+    assert freeze(ast) is ast
+
+def test_shared_text():
+    strings = {}
+    first = freeze(nodes.parse('{n, plural, other {# photos}}'), strings = strings)
+    second = freeze(nodes.parse('<b>{n}</b> photos'), strings = strings)
+    third = freeze(parser.parse(' photos'), strings = strings)
+
+    text = first[0].option('other')[1]
+    assert text == ' photos'
+    assert second[1] is text
+    assert third[0] is text
+
+def test_tag_type():
+    custom = Parser({'allow_tags': True, 'tag_type': 'element'})
+    assert freeze(custom.parse('<b>x</b>'), tag_type = 'element')[0].type == 'element'
+
+def test_catalog():
+    catalog = {
+        'en': {'a': parser.parse('{n} items'), 'b': nodes.parse('{m} items')},
+        'de': {'a': parser.parse('{n} items')}
+    }
+    frozen = freeze_catalog(catalog)
+
+    assert frozen['en']['a'] == nodes.parse('{n} items')
+    assert frozen['en']['a'][1] is frozen['en']['b'][1] is frozen['de']['a'][1]
+    assert isinstance(frozen['de']['a'], tuple)
+
+def test_gc_freeze():
+    if not hasattr(gc, 'freeze'):
+        pytest.skip('gc.freeze() needs Python 3.7')
+
+    try:
+        frozen = freeze_catalog(dict(enumerate(nodes.parse(x) for x in messages)), gc_freeze = True)
+        assert gc.get_freeze_count() > 0
+        assert frozen[1][1].name == 'name'
+    finally:
+        gc.unfreeze()
+
+def test_not_mapping():
+    with pytest.raises(TypeError):
+        freeze_catalog([parser.parse('a')])
@@ -11,6 +11,26 @@ tag_strict_prefix_parser = Parser({'allow_tags': True, 'include_indices': True,
 tag_parser = Parser({'allow_tags': True, 'include_indices': True})
 idx_parser = Parser({'include_indices': True})
 
+# Every test runs with and without the fast paths for simple messages,
+# and with the iterative parser, none of which may change any results.
+@pytest.fixture(autouse = True, params = ['fast', 'general', 'iterative'])
+def mode(request, monkeypatch):
+    monkeypatch.setattr(Parser, '_fast_paths', request.param == 'fast')
+
+    if request.param == 'iterative':
+        compileOptions = Parser._compileOptions
+
+        def iterative(self):
+            compileOptions(self)
+            self._iterative = True
+
+        monkeypatch.setattr(Parser, '_compileOptions', iterative)
+        for value in list(globals().values()):
+            if isinstance(value, Parser):
+                monkeypatch.setattr(value, '_iterative', True)
+
+    return request.param
+
 def token(type, text):
     return {
         'type': type,
@@ -894,6 +914,9 @@ def test_throws_missing_offset_number():
     with pytest.raises(SyntaxError, match='Expected offset number'):
         parse('{n,plural,offset:}')
 
+    with pytest.raises(SyntaxError, match='Expected offset number'):
+        parse('{n,plural,offset:- other{}}')
+
 def test_throws_missing_closing_brace():
     with pytest.raises(SyntaxError, match='Expected }'):
         parse('{a,b,c')
@@ -1087,7 +1110,7 @@ def test_custom_require_other():
     assert x.parse('{n,select,cake{lie}}')
     assert x.parse('{n,plural,one{two}}')
 
-def test_recursion():
+def test_recursion(mode):
     start = '{a,b,c{{a}'
     end = '}}'
 
@@ -1111,5 +1134,10 @@ def test_recursion():
         'maximum_depth': 99999
     })
 
+    if mode == 'iterative':
+        # Without recursion, maximum_depth is the only limit.
+        assert x.parse(inp + out)
+        return
+
     with pytest.raises(SyntaxError, match='Too much recursion'):
         x.parse(inp + out)
@@ -0,0 +1,63 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from pyicumessageformat import Parser
+
+
+def test_shared_strings():
+    parser = Parser({'intern_strings': True, 'allow_tags': True})
+    first = parser.parse('{count, plural, one {# <b>{name}</b>} other {# {amount, number, integer}}}')
+    second = parser.parse('{count, plural, one {x} other {<b>{name}</b> {amount, number, integer}}}')
+
+    assert first[0]['name'] is second[0]['name']
+    assert first[0]['type'] is second[0]['type']
+
+    first_keys = list(first[0]['options'])
+    second_keys = list(second[0]['options'])
+    assert first_keys[0] is second_keys[0]
+    assert first_keys[1] is second_keys[1]
+
+    first_tag = first[0]['options']['one'][2]
+    second_tag = second[0]['options']['other'][0]
+    assert first_tag['name'] is second_tag['name']
+    assert first_tag['contents'][0]['name'] is second_tag['contents'][0]['name']
+
+    first_format = first[0]['options']['other'][2]
+    second_format = second[0]['options']['other'][2]
+    assert first_format['format'] is second_format['format']
+
+def test_simple_messages():
+    parser = Parser({'intern_strings': True})
+    first = parser.parse('Hello, {name}!')
+    second = parser.parse('{ name }')
+
+    assert first[1]['name'] is second[0]['name']
+
+def test_same_results():
+    input = '{n, plural, offset:1 =0 {none} other {# {thing, select, a {x} other {y}}}}'
+
+    assert Parser({'intern_strings': True}).parse(input) == Parser().parse(input)
+
+def test_clear():
+    parser = Parser({'intern_strings': True})
+    first = parser.parse('{name}')
+    parser.intern_clear()
+
+    assert parser._strings == {}
+    assert parser.parse('{name}') == first
+
+def test_clear_disabled():
+    parser = Parser()
+    parser.intern_clear()
+    assert parser._strings is None
+
+def test_parse_many_executor():
+    parser = Parser({'intern_strings': True})
+    messages = ['{count} {name}'] * 10
+
+    with ThreadPoolExecutor(2) as executor:
+        results, errors = parser.parse_many(messages, chunk_size = 3, executor = executor)
+
+    assert not errors
+    names = set(id(ast[0]['name']) for ast in results.values())
+    assert len(names) == 1
+    assert results[0][0]['name'] is parser.parse('{count}')[0]['name']
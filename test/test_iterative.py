@@ -0,0 +1,107 @@
+import sys
+
+import pytest
+
+from pyicumessageformat import Parser
+
+
+def nested(depth):
+    return '{a, select, other {' * depth + 'x' + '}}' * depth
+
+def tags(depth):
+    return '<b>' * depth + 'x' + '</b>' * depth
+
+def innermost(ast, key):
+    depth = 0
+    while isinstance(ast[0], dict):
+        ast = ast[0]['options']['other'] if key == 'options' else ast[0]['contents']
+        depth += 1
+    return depth, ast
+
+def test_deep_submessages():
+    parser = Parser({'iterative': True, 'maximum_depth': 10000})
+
+    assert innermost(parser.parse(nested(5000)), 'options') == (5000, ['x'])
+
+def test_deep_tags():
+    parser = Parser({'iterative': True, 'allow_tags': True, 'maximum_depth': 10000})
+
+    assert innermost(parser.parse(tags(5000)), 'contents') == (5000, ['x'])
+
+@pytest.mark.parametrize('options', [{}, {'ast_nodes': True}, {'cache_size': 8}])
+def test_deep_tags_maximum_depth(options):
+    parser = Parser(dict(options, iterative = True, allow_tags = True, maximum_depth = 10))
+    parser.parse(tags(9))
+
+    with pytest.raises(SyntaxError, match = 'Too much recursion'):
+        parser.parse(tags(10))
+
+    with pytest.raises(SyntaxError, match = 'Too much recursion'):
+        parser.parse(tags(3000))
+
+    results, errors = parser.parse_many([tags(3000), 'x'])
+    assert len(results[1]) == 1
+    assert list(errors) == [0]
+
+def test_deep_tags_walkers():
+    parser = Parser({'iterative': True, 'allow_tags': True, 'maximum_depth': 10000, 'ast_nodes': True})
+    with pytest.raises(SyntaxError, match = 'Too much recursion'):
+        parser.parse(tags(5000))
+
+    parser = Parser({'iterative': True, 'allow_tags': True, 'maximum_depth': 10000, 'cache_size': 8})
+    assert innermost(parser.parse(tags(5000)), 'contents') == (5000, ['x'])
+    assert innermost(parser.parse(tags(5000)), 'contents') == (5000, ['x'])
+    assert parser.cache_info().currsize == 0
+
+def test_deep_tags_recursive():
+    parser = Parser({'allow_tags': True})
+
+    with pytest.raises(SyntaxError, match = 'Too much recursion'):
+        parser.parse(tags(5000))
+
+def test_bounded_stack():
+    parser = Parser({'iterative': True, 'allow_tags': True, 'maximum_depth': 1000})
+
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(100)
+    try:
+        submessages = parser.parse(nested(500))
+        contents = parser.parse(tags(500))
+    finally:
+        sys.setrecursionlimit(limit)
+
+    assert innermost(submessages, 'options') == (500, ['x'])
+    assert innermost(contents, 'contents') == (500, ['x'])
+
+def test_maximum_depth():
+    parser = Parser({'iterative': True, 'maximum_depth': 10})
+    parser.parse(nested(9))
+
+    with pytest.raises(SyntaxError, match = 'Too much recursion'):
+        parser.parse(nested(10))
+
+@pytest.mark.parametrize('input', [
+    '{a, select, other {x}',
+    '{a, select, one {x}}',
+    '{a, select, other {<b>x}}',
+    '{a, select, other {<b>x</i>}}',
+    '<b>{a, select, other {x}}',
+    '{n, plural, offset:1 other {# {n, plural, other {#}}}}'
+])
+def test_same_as_recursive(input):
+    options = {'allow_tags': True, 'include_indices': True}
+    results = []
+    for parser in (Parser(options), Parser(dict(options, iterative = True))):
+        tokens = []
+        try:
+            results.append((parser.parse(input, tokens), tokens))
+        except SyntaxError as err:
+            results.append((str(err), tokens))
+
+    assert results[0] == results[1]
+
+def test_tokenize():
+    input = nested(3)
+    parser = Parser({'iterative': True})
+
+    assert list(parser.tokenize(input)) == list(Parser().tokenize(input))
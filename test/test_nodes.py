@@ -0,0 +1,66 @@
+from pyicumessageformat import Parser
+from pyicumessageformat.nodes import Argument, Hash, Plural, Select, Tag, fromDict, toDict
+
+parser = Parser({'allow_tags': True, 'include_indices': True})
+node_parser = Parser({'allow_tags': True, 'include_indices': True, 'ast_nodes': True})
+
+MESSAGES = [
+    '',
+    'Hello, World!',
+    'Hello, {name}! You are {age, number} years and {ratio, number, percent} done.',
+    '{n, plural, offset:1 =0 {none} one {# thing} other {# things {x}}}',
+    '{g, select, male {He} female {She} other {They}} <b>left <i/> {n, selectordinal, other {#th}}</b>',
+    '<a></a><b/>{a, b, c}'
+]
+
+
+def test_node_types():
+    ast = node_parser.parse('A {a} {b, number, percent} {c, select, x {X} other {#}} '
+        '{d, plural, offset:2 other {#}} <e>{f}</e><g/>')
+
+    assert isinstance(ast, tuple)
+    assert ast[1] == Argument('a', None, None, 2, 5)
+    assert ast[3] == Argument('b', 'number', 'percent', 6, 26)
+    assert ast[5] == Select('c', 'select', (('x', ('X',)), ('other', ('#',))), 27, 55)
+    assert ast[7] == Plural('d', 'plural', 2, (('other', (Hash('d', 84, 85),)),), 56, 87)
+    assert ast[9] == Tag('e', 'tag', (Argument('f', None, None, 91, 94),), 88, 98)
+    assert ast[10] == Tag('g', 'tag', None, 98, 102)
+
+    assert ast[5].option('x') == ('X',)
+    assert ast[5].option('y') is None
+    assert ast[7].option('other')[0].type == 'number'
+
+def test_round_trip():
+    for message in MESSAGES:
+        ast = parser.parse(message)
+        nodes = node_parser.parse(message)
+        assert fromDict(ast) == nodes
+        assert toDict(nodes) == ast
+
+def test_immutable():
+    node = node_parser.parse('{a}')[0]
+    try:
+        node.name = 'b'
+    except AttributeError:
+        pass
+    else:
+        assert False, 'nodes should be immutable'
+
+    assert not hasattr(node, '__dict__')
+
+def test_interned():
+    first = node_parser.parse('{' + 'count' + '}')[0]
+    second = node_parser.parse('{' + ''.join(['co', 'unt']) + '}')[0]
+    assert first.name is second.name
+
+def test_unusual_shapes():
+    # A type that is numeric but has no sub-messages keeps its offset,
+    # which no node represents, so it stays a dict.
+    x = Parser({'subnumeric_types': ['plural', 'num'], 'ast_nodes': True})
+    ast = x.parse('{a, num, style}')
+    assert ast == ({'name': 'a', 'type': 'num', 'offset': 0, 'format': 'style'},)
+    assert toDict(ast) == [{'name': 'a', 'type': 'num', 'offset': 0, 'format': 'style'}]
+
+def test_cache():
+    x = Parser({'ast_nodes': True, 'cache_size': 5})
+    assert x.parse('{a}') is x.parse('{a}')
@@ -0,0 +1,89 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from pyicumessageformat import Parser, serialize
+
+
+def test_defaults():
+    parser = Parser()
+    assert parser.options['maximum_depth'] == 50
+    assert parser.options['require_other'] is True
+
+def test_unknown_option():
+    with pytest.raises(ValueError, match='unknown option allow_tag'):
+        Parser({'allow_tag': True})
+
+@pytest.mark.parametrize('key', [
+    'allow_tags',
+    'strict_tags',
+    'include_indices',
+    'loose_submessages',
+    'allow_format_spaces'
+])
+def test_booleans(key):
+    with pytest.raises(TypeError, match=key):
+        Parser({key: 'yes'})
+
+    Parser({key: True})
+    Parser({key: False})
+
+@pytest.mark.parametrize('key', ['subnumeric_types', 'submessage_types'])
+def test_types(key):
+    with pytest.raises(TypeError, match=key):
+        Parser({key: 'plural'})
+
+    with pytest.raises(TypeError, match=key):
+        Parser({key: ['plural', 1]})
+
+    Parser({key: ('plural',)})
+
+@pytest.mark.parametrize('key', ['maximum_depth', 'cache_size'])
+def test_integers(key):
+    with pytest.raises(TypeError, match=key):
+        Parser({key: '10'})
+
+    with pytest.raises(TypeError, match=key):
+        Parser({key: True})
+
+    with pytest.raises(ValueError, match=key):
+        Parser({key: -1})
+
+def test_tag_options():
+    with pytest.raises(TypeError, match='tag_type'):
+        Parser({'tag_type': None})
+
+    with pytest.raises(TypeError, match='tag_prefix'):
+        Parser({'tag_prefix': 5})
+
+    assert Parser({'allow_tags': True, 'tag_prefix': ''}).parse('<a/>')
+
+def test_require_other():
+    with pytest.raises(ValueError, match='require_other'):
+        Parser({'require_other': 'subnumerics'})
+
+    with pytest.raises(TypeError, match='require_other'):
+        Parser({'require_other': [None]})
+
+    x = Parser({'require_other': ('select',)})
+    assert x.parse('{n, plural, one {a}}')
+    with pytest.raises(SyntaxError, match='Expected select sub-message other'):
+        x.parse('{n, select, one {a}}')
+
+def test_options_are_frozen():
+    parser = Parser()
+    parser.options['allow_tags'] = True
+    assert parser.parse('<b>bold</b>') == ['<b>bold</b>']
+
+def test_options_are_frozen_for_workers():
+    parser = Parser({'submessage_types': ['plural', 'select']})
+    parser.options['allow_tags'] = True
+    parser.options['submessage_types'].append('selectordinal')
+    messages = ['<b>bold</b>', '{n, selectordinal, other {x}}']
+
+    with ThreadPoolExecutor(2) as executor:
+        results, errors = parser.parse_many(messages, chunk_size = 1, executor = executor)
+
+    assert results == {0: ['<b>bold</b>']}
+    assert list(errors) == [1]
+    assert serialize.fingerprint(parser) == serialize.fingerprint(Parser({'submessage_types': ['plural', 'select']}))
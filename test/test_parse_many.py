@@ -0,0 +1,69 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from pyicumessageformat import Parser
+
+parser = Parser({'allow_tags': True})
+
+messages = {
+    'hello': 'Hello, {name}!',
+    'broken': '{a',
+    'photos': '{n, plural, one {# photo} other {# photos}}',
+    'tag': '<b>bold</b>',
+    'other': '{n, plural, one {# thing}}'
+}
+
+
+def test_mapping():
+    results, errors = parser.parse_many(messages)
+
+    assert list(results) == ['hello', 'photos', 'tag']
+    assert results['hello'] == ['Hello, ', {'name': 'name'}, '!']
+    assert results['tag'] == [{'name': 'b', 'type': 'tag', 'contents': ['bold']}]
+
+    assert list(errors) == ['broken', 'other']
+    assert isinstance(errors['broken'], SyntaxError)
+    assert 'Expected , or }' in str(errors['broken'])
+    assert 'Expected plural sub-message other' in str(errors['other'])
+
+def test_iterable():
+    results, errors = parser.parse_many(x for x in ['a', '{', 'b'])
+    assert results == {0: ['a'], 2: ['b']}
+    assert list(errors) == [1]
+
+def test_empty():
+    assert parser.parse_many([]) == ({}, {})
+
+def test_matches_parse():
+    input = {
+        i: '{} {{n{}, plural, one {{#}} other {{# {}}}}}'.format(i, i, 'x' * (i % 7))
+        for i in range(50)
+    }
+    expected = {key: parser.parse(value) for key, value in input.items()}
+
+    for chunk_size in (1, 7, 500):
+        results, errors = parser.parse_many(input, chunk_size = chunk_size)
+        assert not errors
+        assert results == expected
+        assert list(results) == list(expected)
+
+def test_workers():
+    input = dict(messages, **{str(i): 'Message {}'.format(i) for i in range(100)})
+    serial = parser.parse_many(input)
+    parallel = parser.parse_many(input, workers = 2, chunk_size = 10)
+
+    assert parallel[0] == serial[0]
+    assert list(parallel[0]) == list(serial[0])
+    assert {k: str(v) for k, v in parallel[1].items()} == {k: str(v) for k, v in serial[1].items()}
+
+def test_executor():
+    with ThreadPoolExecutor(2) as pool:
+        results, errors = parser.parse_many(messages, executor = pool, chunk_size = 2)
+
+    assert list(results) == ['hello', 'photos', 'tag']
+    assert list(errors) == ['broken', 'other']
+
+def test_chunk_size():
+    with pytest.raises(ValueError, match='chunk_size'):
+        parser.parse_many(messages, chunk_size = 0)
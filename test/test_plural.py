@@ -0,0 +1,150 @@
+from decimal import Decimal
+
+import pytest
+
+from pyicumessageformat import Compiler, Parser
+from pyicumessageformat.cldr import CARDINAL, ORDINAL
+from pyicumessageformat.plural import CARDINAL_RULES, ORDINAL_RULES
+from pyicumessageformat.plural import Operands, categories, operands, plural_rules, select
+
+
+@pytest.mark.parametrize('value, expected', [
+    (0, Operands(0, 0, 0, 0, 0, 0, 0)),
+    (-7, Operands(7, 7, 0, 0, 0, 0, 0)),
+    (True, Operands(1, 1, 0, 0, 0, 0, 0)),
+    (2.0, Operands(2, 2, 0, 0, 0, 0, 0)),
+    (1.5, Operands(Decimal('1.5'), 1, 1, 1, 5, 5, 0)),
+    ('1', Operands(1, 1, 0, 0, 0, 0, 0)),
+    ('1.0', Operands(1, 1, 1, 0, 0, 0, 0)),
+    ('1.20', Operands(Decimal('1.20'), 1, 2, 1, 20, 2, 0)),
+    ('-0.05', Operands(Decimal('0.05'), 0, 2, 2, 5, 5, 0)),
+    (Decimal('1.00'), Operands(1, 1, 2, 0, 0, 0, 0)),
+    (Decimal('1'), Operands(1, 1, 0, 0, 0, 0, 0)),
+    ('1e3', Operands(1000, 1000, 0, 0, 0, 0, 0)),
+    ('1.2c6', Operands(1200000, 1200000, 0, 0, 0, 0, 6))
+])
+def test_operands(value, expected):
+    assert operands(value) == expected
+
+@pytest.mark.parametrize('value', ['x', '', 'NaN', float('inf'), float('nan'), '1cx'])
+def test_invalid_values(value):
+    with pytest.raises(ValueError):
+        select('en', value)
+
+def test_value_type():
+    with pytest.raises(TypeError):
+        select('en', None)
+
+@pytest.mark.parametrize('locale, values', [
+    ('en', {'one': [1, '1'], 'other': [0, 2, 11, 21, '1.0', 1.5]}),
+    ('ja', {'other': [0, 1, 2, '1.5']}),
+    ('fr', {'one': [0, 1, 1.5, '1.0'], 'many': [1000000, '1.2c6'], 'other': [2, 1000001, 1000000.5]}),
+    ('pt', {'one': [0, 1, '1.5'], 'other': [2]}),
+    ('pt-PT', {'one': [1], 'other': [0, 2, '1.0']}),
+    ('ru', {'one': [1, 21, 101], 'few': [2, 4, 22], 'many': [0, 5, 11, 12, 111], 'other': [1.5, '1.0']}),
+    ('pl', {'one': [1], 'few': [2, 22, 104], 'many': [0, 5, 12, 21, 112], 'other': [1.5]}),
+    ('cs', {'one': [1], 'few': [2, 4], 'many': ['1.0', 0.5], 'other': [0, 5]}),
+    ('ar', {'zero': [0], 'one': [1], 'two': [2], 'few': [3, 10, 103], 'many': [11, 99, 111], 'other': [100, 102, 1.5]}),
+    ('lv', {'zero': [0, 10, 11, 19, '10.0'], 'one': [1, 21, '0.1', '0.01'], 'other': [2, 22, '0.2', '0.10']}),
+    ('cy', {'zero': [0], 'one': [1], 'two': [2], 'few': [3], 'many': [6], 'other': [4, 5, 7]}),
+    ('he', {'one': [1, '0.5'], 'two': [2], 'other': [0, 3, 20, '2.0']}),
+    ('is', {'one': [1, 21, '1.0', '0.1', '1.1'], 'other': [0, 2, 11, '2.0']}),
+    ('br', {'one': [1, 21], 'two': [2, 22], 'few': [3, 9, 23], 'many': [1000000], 'other': [0, 11, 71, 12, 19]}),
+    ('fil', {'one': [0, 1, 2, 3, 5, 10, '0.1'], 'other': [4, 6, 9, 14, '0.4']}),
+    ('si', {'one': [0, 1, '0.1'], 'other': [2, '0.2', '1.1']}),
+    ('kw', {'zero': [0], 'one': [1, '1.0'], 'two': [2, 22, 102, 1000, 20000, 100000], 'few': [3, 23, 103],
+            'many': [21, 41, 101], 'other': [4, 11, 19, 100, 21000, 1000000, '1.5']})
+])
+def test_cardinal(locale, values):
+    for category, examples in values.items():
+        for value in examples:
+            assert select(locale, value) == category, value
+
+@pytest.mark.parametrize('locale, values', [
+    ('en', {'one': [1, 21, 101], 'two': [2, 22], 'few': [3, 23], 'other': [0, 4, 11, 12, 13, 111, 112]}),
+    ('fr', {'one': [1], 'other': [0, 2]}),
+    ('it', {'many': [8, 11, 80, 800], 'other': [1, 2, 81]}),
+    ('vec', {'many': [8, 11, 80, 800], 'other': [1, 2, 81]}),
+    ('kw', {'one': [1, 4, 21, 24, 101], 'many': [5, 105], 'other': [0, 6, 20, 100]}),
+    ('sv', {'one': [1, 2, 21, 22], 'other': [3, 11, 12]}),
+    ('de', {'other': [1, 2, 3]}),
+    ('ast', {'other': [1, 2, 3]}),
+    ('cy', {'zero': [0, 7], 'one': [1], 'two': [2], 'few': [3, 4], 'many': [5, 6], 'other': [10]})
+])
+def test_ordinal(locale, values):
+    for category, examples in values.items():
+        for value in examples:
+            assert select(locale, value, True) == category, value
+
+def test_locales():
+    assert select('en-US', 1) == select('en_GB', 1) == select('EN', 1) == 'one'
+    assert select('pt-Latn-PT', 0) == 'other'
+    assert select('zh-Hant-TW', 1) == 'other'
+
+    with pytest.raises(ValueError):
+        select('xx', 1)
+
+    with pytest.raises(TypeError):
+        select(None, 1)
+
+def test_ordinal_locales_have_cardinal_rules():
+    assert [locale for locale in ORDINAL_RULES if locale not in CARDINAL_RULES] == []
+
+def test_categories():
+    assert categories('en') == ('one', 'other')
+    assert categories('ja') == ('other',)
+    assert categories('ru') == ('one', 'few', 'many', 'other')
+    assert categories('en', True) == ('one', 'two', 'few', 'other')
+    assert categories('ar') == ('zero', 'one', 'two', 'few', 'many', 'other')
+
+def test_shared():
+    assert plural_rules('ru') is plural_rules('uk')
+    assert plural_rules('de') is plural_rules('en')
+    assert plural_rules('en') is not plural_rules('en', True)
+
+@pytest.mark.parametrize('table', [CARDINAL, ORDINAL], ids = ['cardinal', 'ordinal'])
+def test_data(table):
+    seen = set()
+    for locales, rules in table:
+        for locale in locales.split():
+            assert locale not in seen
+            seen.add(locale)
+            # Every rule set compiles, and works for a few kinds of values.
+            rule = plural_rules(locale, table is ORDINAL)
+            for value in (0, 1, 2, 5, 11, 100, 1.5, '0.10', '1.2c6'):
+                assert rule(value) in rules or rule(value) == 'other'
+
+def test_compiler():
+    parser = Parser()
+    compiler = Compiler({'locale': 'ru'})
+    fn = compiler.compile(parser.parse(
+        '{n, plural, one {# file} few {# files(few)} many {# files(many)} other {# files}} '
+        '{n, selectordinal, other {#th}}'))
+
+    assert fn({'n': 1}) == '1 file 1th'
+    assert fn({'n': 3}) == '3 files(few) 3th'
+    assert fn({'n': 5}) == '5 files(many) 5th'
+    assert fn({'n': '1.5'}) == '1.5 files 1.5th'
+
+    ordinal = Compiler({'locale': 'en'}).compile(parser.parse('{n, selectordinal, one {#st} two {#nd} few {#rd} other {#th}}'))
+    assert [ordinal({'n': n}) for n in (1, 2, 3, 4, 11, 22)] == ['1st', '2nd', '3rd', '4th', '11th', '22nd']
+
+def test_compiler_visible_digits():
+    compiler = Compiler({'locale': 'en'})
+    fn = compiler.compile(Parser().parse('{n, plural, one {# item} other {# items}}'))
+    assert fn({'n': '1.0'}) == '1.0 items'
+    assert fn({'n': Decimal('1.0')}) == '1.0 items'
+    assert fn({'n': '1'}) == '1 item'
+    assert fn({'n': 1}) == '1 item'
+
+    fn = compiler.compile(Parser().parse('{n, plural, offset:1 =1 {one} one {# other} other {# others}}'))
+    assert fn({'n': '1.0'}) == 'one'
+    assert fn({'n': '2'}) == '1 other'
+    assert fn({'n': '2.0'}) == '1.0 others'
+
+def test_compiler_plural_wins():
+    compiler = Compiler({'locale': 'ru', 'plural': lambda value, ordinal: 'few'})
+    assert compiler.compile(Parser().parse('{n, plural, few {a} other {b}}'))({'n': 1}) == 'a'
+
+    with pytest.raises(ValueError):
+        Compiler({'locale': 'xx'})
@@ -0,0 +1,148 @@
+import random
+
+import pytest
+
+from copy import deepcopy
+
+from pyicumessageformat import Parser
+
+
+OPTIONS = [
+    {'include_indices': True},
+    {'include_indices': True, 'allow_tags': True},
+    {'include_indices': True, 'allow_tags': True, 'strict_tags': True},
+    {'include_indices': True, 'allow_tags': True, 'tag_prefix': 'x:'},
+    {'include_indices': True, 'allow_tags': True, 'iterative': True},
+    {'include_indices': True, 'loose_submessages': True, 'require_other': False}
+]
+
+INSERTS = list("ab {}'#<>/, x=") + ['{a}', '{n, plural, other {#}}', '<b>', '</b>', '<x:i>', 'other', "''", '']
+
+
+def message(rng, depth = 0):
+    out = []
+    for _ in range(rng.randint(0, 4)):
+        kind = rng.randint(0, 5 if depth < 3 else 1)
+        if kind == 0:
+            out.append(rng.choice(['Hello, ', ' ', "it's", "'{'", '#', ' < ', 'x']))
+        elif kind == 1:
+            out.append(rng.choice(['{a}', '{ name }', '{n, number}', '{d, date, short}']))
+        elif kind == 2:
+            out.append('{n, plural, offset:1 =0 {%s} other {# %s}}' % (message(rng, depth + 1), message(rng, depth + 1)))
+        elif kind == 3:
+            out.append('{g, select, male {%s} other {%s}}' % (message(rng, depth + 1), message(rng, depth + 1)))
+        elif kind == 4:
+            name = rng.choice(['b', 'i', 'x:b'])
+            out.append('<%s>%s</%s>' % (name, message(rng, depth + 1), name))
+        else:
+            out.append('<br/>')
+    return ''.join(out)
+
+def parse(parser, input):
+    tokens = []
+    try:
+        return parser.parse(input, tokens), tokens
+    except SyntaxError as err:
+        return str(err), tokens
+
+def reparse(parser, input, ast, edit, tokens):
+    try:
+        return parser.reparse(input, ast, edit, tokens)[1], tokens
+    except SyntaxError as err:
+        return str(err), tokens
+
+
+@pytest.mark.parametrize('options', OPTIONS)
+def test_same_as_parse(options):
+    rng = random.Random(42)
+    parser = Parser(options)
+
+    for _ in range(300):
+        input = message(rng)
+        ast, tokens = parse(parser, input)
+        if isinstance(ast, str):
+            continue
+
+        for _ in range(5):
+            offset = rng.randint(0, len(input))
+            removed = rng.randint(0, min(3, len(input) - offset))
+            inserted = rng.choice(INSERTS)
+            edit = (offset, removed, inserted)
+            expected = parse(parser, input[:offset] + inserted + input[offset + removed:])
+
+            assert reparse(parser, input, deepcopy(ast), edit, list(tokens)) == expected, (input, edit)
+
+def test_text():
+    parser = Parser({'include_indices': True})
+    input = 'Hello, {name}! You have {count, number} messages.'
+    tokens = []
+    ast = parser.parse(input, tokens)
+    node = ast[3]
+
+    msg, result = parser.reparse(input, ast, (len(input) - 1, 1, ' today.'), tokens)
+    assert msg == 'Hello, {name}! You have {count, number} messages today.'
+    assert result is ast
+    assert result[3] is node
+    assert result == parser.parse(msg)
+
+def test_nested():
+    parser = Parser({'include_indices': True, 'allow_tags': True})
+    input = 'Hi {n, plural, one {<b>{n}</b> item} other {# items}}! {x}'
+    tokens = []
+    ast = parser.parse(input, tokens)
+    other = ast[1]['options']['other']
+    last = ast[3]
+
+    edit = (input.index('{n}</b>') + 1, 1, 'count')
+    msg, result = parser.reparse(input, ast, edit, tokens)
+
+    expected_tokens = []
+    assert result == parser.parse(msg, expected_tokens)
+    assert tokens == expected_tokens
+    assert msg == 'Hi {n, plural, one {<b>{count}</b> item} other {# items}}! {x}'
+    assert result[1]['options']['other'] is other
+    assert result[3] is last
+    assert last['start'] == msg.index('{x}')
+
+def test_structure_changes():
+    parser = Parser({'include_indices': True})
+    input = '{a} and {b}'
+    ast = parser.parse(input)
+
+    msg, result = parser.reparse(input, ast, (3, 0, ', {c}'), None)
+    assert msg == '{a}, {c} and {b}'
+    assert result == parser.parse(msg)
+
+    msg, result = parser.reparse(msg, result, (2, 1, ', number}'), None)
+    assert msg == '{a, number}, {c} and {b}'
+    assert result == parser.parse(msg)
+
+def test_error_tokens():
+    parser = Parser({'include_indices': True})
+    input = 'x {n, plural, one {a} other {b}} y'
+    tokens = []
+    ast = parser.parse(input, tokens)
+
+    edit = (input.index('other'), 5, 'few')
+    expected = parse(parser, input[:edit[0]] + 'few' + input[edit[0] + 5:])
+    assert reparse(parser, input, ast, edit, tokens) == expected
+
+def test_requires_indices():
+    with pytest.raises(ValueError):
+        Parser().reparse('{a}', [{'name': 'a'}], (0, 0, 'x'))
+
+    with pytest.raises(ValueError):
+        Parser({'include_indices': True, 'ast_nodes': True}).reparse('{a}', [], (0, 0, 'x'))
+
+@pytest.mark.parametrize('edit, error', [
+    ((4, 0, 'x'), ValueError),
+    ((1, 3, 'x'), ValueError),
+    ((-1, 0, 'x'), ValueError),
+    ((0, 0, None), TypeError)
+])
+def test_bad_edits(edit, error):
+    parser = Parser({'include_indices': True})
+    input = '{a}'
+
+    with pytest.raises(error):
+        parser.reparse(input, parser.parse(input), edit)
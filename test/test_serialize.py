@@ -0,0 +1,133 @@
+import io
+import json
+import mmap
+
+import pytest
+
+from pyicumessageformat import Parser, serialize
+from pyicumessageformat import precompile
+from pyicumessageformat.precompile import main
+
+parser = Parser({'allow_tags': True})
+
+catalog = {
+    'hello': 'Hello, {name}!',
+    'photos': '{n, plural, offset:1 =0 {none} other {# <b>photos</b>}}',
+    'empty': ''
+}
+
+
+def parsed():
+    return {key: parser.parse(value) for key, value in catalog.items()}
+
+
+def test_round_trip():
+    data = serialize.dumps(parsed(), parser)
+    assert serialize.loads(data) == parsed()
+    assert serialize.loads(data, parser) == parsed()
+    assert serialize.loads(serialize.dumps(parser.parse('{a}'), parser)) == [{'name': 'a'}]
+
+def test_nested():
+    data = serialize.dumps({'en': parsed(), 'fr': {'hello': parser.parse('Bonjour')}}, parser)
+    assert serialize.loads(data, parser) == {'en': parsed(), 'fr': {'hello': ['Bonjour']}}
+
+def test_file():
+    file = io.BytesIO()
+    serialize.dump(parsed(), file, parser)
+    file.seek(0)
+    assert serialize.load(file, parser) == parsed()
+
+def test_mmap(tmp_path):
+    path = tmp_path / 'catalog.bin'
+    path.write_bytes(serialize.dumps(parsed(), parser))
+    with open(str(path), 'rb') as file:
+        with mmap.mmap(file.fileno(), 0, access = mmap.ACCESS_READ) as data:
+            assert serialize.loads(data, parser) == parsed()
+
+def test_header():
+    info = serialize.header(serialize.dumps(parsed(), parser))
+    assert info['options']['allow_tags'] is True
+    assert info['options']['submessage_types'] == ['plural', 'select', 'selectordinal']
+    assert 'cache_size' not in info['options']
+
+def test_options_mismatch():
+    data = serialize.dumps(parsed(), parser)
+    with pytest.raises(ValueError, match='different parser options'):
+        serialize.loads(data, Parser())
+
+    # Options that do not change the AST are ignored.
+    assert serialize.loads(data, Parser({'allow_tags': True, 'cache_size': 10})) == parsed()
+    assert serialize.loads(data, Parser({
+        'allow_tags': True,
+        'submessage_types': ['select', 'selectordinal', 'plural']
+    })) == parsed()
+
+def test_nodes():
+    node_parser = Parser({'allow_tags': True, 'ast_nodes': True})
+    nodes = {key: node_parser.parse(value) for key, value in catalog.items()}
+
+    data = serialize.dumps(nodes, node_parser)
+    assert serialize.loads(data) == parsed()
+    assert serialize.loads(data, node_parser) == nodes
+    assert serialize.loads(data, parser) == parsed()
+
+def test_invalid():
+    with pytest.raises(ValueError, match='not a serialized'):
+        serialize.loads(b'')
+
+    with pytest.raises(ValueError, match='not a serialized'):
+        serialize.loads(b'{"hello": "world"}')
+
+    data = bytearray(serialize.dumps(parsed(), parser))
+    data[len(serialize.MAGIC)] = 99
+    with pytest.raises(ValueError, match='version 99'):
+        serialize.loads(bytes(data))
+
+def test_precompile(tmp_path, capsys):
+    source = tmp_path / 'locales'
+    (source / 'fr').mkdir(parents = True)
+    (source / 'en.json').write_text(json.dumps(catalog), encoding = 'utf-8')
+    (source / 'fr' / 'app.json').write_text(json.dumps({
+        'nav': {'home': 'Accueil', 'count': '{n, number}'}
+    }), encoding = 'utf-8')
+
+    output = tmp_path / 'bundle.bin'
+    assert main([str(source), str(output), '--options', '{"allow_tags": true}']) == 0
+    assert '5 messages in 2 catalogs' in capsys.readouterr().out
+
+    bundle = serialize.loads(output.read_bytes(), parser)
+    assert bundle == {
+        'en': parsed(),
+        'fr/app': {
+            'nav.home': ['Accueil'],
+            'nav.count': [{'name': 'n', 'type': 'number'}]
+        }
+    }
+
+def test_precompile_errors(tmp_path, capsys):
+    source = tmp_path / 'locales'
+    source.mkdir()
+    (source / 'en.json').write_text(json.dumps({'ok': 'a', 'bad': '{a'}), encoding = 'utf-8')
+
+    output = tmp_path / 'bundle.bin'
+    assert main([str(source), str(output)]) == 1
+    assert 'en: bad: Expected , or }' in capsys.readouterr().err
+    assert not output.exists()
+
+def test_precompile_workers(tmp_path, monkeypatch):
+    source = tmp_path / 'locales'
+    source.mkdir()
+    for name in ('de', 'en', 'fr'):
+        (source / (name + '.json')).write_text(json.dumps(catalog), encoding = 'utf-8')
+
+    pools = []
+    original = precompile.ProcessPoolExecutor
+    def counting(workers):
+        pools.append(workers)
+        return original(workers)
+    monkeypatch.setattr(precompile, 'ProcessPoolExecutor', counting)
+
+    bundle, errors = precompile.precompile(str(source), parser, workers = 2)
+    assert pools == [2]
+    assert errors == {}
+    assert bundle == {'de': parsed(), 'en': parsed(), 'fr': parsed()}
@@ -0,0 +1,84 @@
+import pytest
+
+from pyicumessageformat import Parser
+
+
+def test_disabled():
+    parser = Parser()
+    parser.parse('{n, plural, other {#}}')
+
+    assert parser.stats_info() is None
+    assert '_parseText' not in vars(parser)
+    parser.stats_clear()
+
+def test_counts():
+    parser = Parser({'collect_stats': True, 'allow_tags': True})
+    inputs = ['Hello, {name}!', '<b>{n, plural, one {# {g, select, other {x}}} other {y}}</b> 1 < 2']
+    for input in inputs:
+        parser.parse(input)
+    info = parser.stats_info()
+
+    assert info.messages == 2
+    assert info.characters == sum(len(input) for input in inputs)
+    assert info.fast_path == 1
+    assert info.placeholders == 4
+    assert info.submessages == 3
+    assert info.tags == 1
+    assert info.tag_checks >= 2
+    assert info.backtracks == 0
+    assert info.max_depth == 2
+    assert info.tokens == 0
+
+def test_tokens():
+    parser = Parser({'collect_stats': True})
+    tokens = []
+    parser.parse('Hello, {name}!', tokens)
+
+    assert parser.stats_info().tokens == len(tokens) == 5
+
+def test_text_characters():
+    parser = Parser({'collect_stats': True})
+    parser.parse('Hello, {name}!')
+    parser.parse('Hi {n, number} there')
+
+    assert parser.stats_info().text_characters == len('Hello, !') + len('Hi  there')
+
+def test_backtracks():
+    parser = Parser({'collect_stats': True, 'loose_submessages': True})
+    parser.parse('{a, number, one {x} other {y}}')
+
+    assert parser.stats_info().backtracks == 1
+
+@pytest.mark.parametrize('iterative', [False, True])
+def test_times(iterative):
+    parser = Parser({'collect_stats': True, 'allow_tags': True, 'iterative': iterative})
+    parser.parse('<b>{n, plural, one {#} other {<i>{x}</i>}}</b>')
+    times = parser.stats_info().times
+
+    assert set(times) == {'fast_path', 'other', 'placeholders', 'submessages', 'tag_checks', 'tags', 'text'}
+    assert all(value >= 0 for value in times.values())
+    assert times['placeholders'] > 0
+    assert times['submessages'] > 0
+
+def test_errors_are_counted():
+    parser = Parser({'collect_stats': True})
+    with pytest.raises(SyntaxError):
+        parser.parse('{a} {b')
+
+    info = parser.stats_info()
+    assert info.messages == 1
+    assert info.placeholders == 1
+
+def test_clear():
+    parser = Parser({'collect_stats': True})
+    parser.parse('{n, plural, other {#}}')
+    parser.stats_clear()
+    info = parser.stats_info()
+
+    assert info.messages == 0
+    assert set(info.times.values()) == {0.0}
+
+    parser.parse('{n, plural, other {#}}')
+    info = parser.stats_info()
+    assert info.messages == 1
+    assert info.times['submessages'] > 0
@@ -0,0 +1,152 @@
+import pytest
+
+from itertools import islice
+
+from pyicumessageformat import Parser
+
+
+def texts(input, tokens):
+    return [(type, input[start:end]) for type, start, end in tokens]
+
+def test_basic():
+    parser = Parser()
+    input = 'Hello, {name}! You are {age, number} years old.'
+
+    assert texts(input, parser.tokenize(input)) == [
+        ('text', 'Hello, '),
+        ('syntax', '{'),
+        ('name', 'name'),
+        ('syntax', '}'),
+        ('text', '! You are '),
+        ('syntax', '{'),
+        ('name', 'age'),
+        ('syntax', ','),
+        ('space', ' '),
+        ('type', 'number'),
+        ('syntax', '}'),
+        ('text', ' years old.')
+    ]
+
+def test_empty():
+    assert list(Parser().tokenize('')) == []
+
+def test_spans():
+    parser = Parser({'allow_tags': True})
+
+    assert list(parser.tokenize("{n, plural, offset:1 one{#} other{<b>it's</b>}}")) == [
+        ('syntax', 0, 1),
+        ('name', 1, 2),
+        ('syntax', 2, 3),
+        ('space', 3, 4),
+        ('type', 4, 10),
+        ('syntax', 10, 11),
+        ('space', 11, 12),
+        ('offset', 12, 19),
+        ('number', 19, 20),
+        ('space', 20, 21),
+        ('selector', 21, 24),
+        ('syntax', 24, 25),
+        ('hash', 25, 26),
+        ('syntax', 26, 27),
+        ('space', 27, 28),
+        ('selector', 28, 33),
+        ('syntax', 33, 34),
+        ('syntax', 34, 35),
+        ('name', 35, 36),
+        ('syntax', 36, 37),
+        ('text', 37, 41),
+        ('syntax', 41, 43),
+        ('name', 43, 44),
+        ('syntax', 44, 45),
+        ('syntax', 45, 46),
+        ('syntax', 46, 47)
+    ]
+
+@pytest.mark.parametrize('input', [
+    'Hello, {name{!',
+    'Hello } there',
+    '{n, plural, one {x}}',
+    '{a}{b, select, x {} other {}'
+])
+def test_matches_parse(input):
+    parser = Parser()
+    tokens = []
+    with pytest.raises(SyntaxError):
+        parser.parse(input, tokens)
+
+    result = list(parser.tokenize(input))
+    assert texts(input, result[:-1]) == [(token['type'], token['text']) for token in tokens]
+
+    type, start, end = result[-1]
+    assert type == 'error'
+    assert start == (result[-2][2] if len(result) > 1 else 0)
+    assert end == len(input)
+
+@pytest.mark.parametrize('iterative', [False, True])
+@pytest.mark.parametrize('input', [
+    'Hello, { name }!',
+    "It''s '{'quoted'}' {a}",
+    "{n, plural, offset:1 =0 {none} one {'#' <b>{x, number, ::'a'}</b>} other {# it''s}}",
+    "{g, select, a {<i>x</i><br/>} other {{n, selectordinal, other {#th}}}}"
+])
+def test_valid_matches_parse(input, iterative):
+    parser = Parser({'allow_tags': True, 'iterative': iterative})
+    tokens = []
+    parser.parse(input, tokens)
+
+    assert texts(input, parser.tokenize(input)) == [(token['type'], token['text']) for token in tokens]
+
+def test_error():
+    parser = Parser()
+
+    assert list(parser.tokenize('Hello, {name{!')) == [
+        ('text', 0, 7),
+        ('syntax', 7, 8),
+        ('name', 8, 12),
+        ('error', 12, 14)
+    ]
+
+def test_error_recursion():
+    parser = Parser({'maximum_depth': 2})
+    input = '{a, select, other {{b, select, other {{c, select, other {}}}}}}'
+
+    tokens = list(parser.tokenize(input))
+    assert tokens[-1][0] == 'error'
+    assert tokens[-1][2] == len(input)
+
+def test_lazy():
+    parser = Parser()
+    tokens = parser.tokenize('{a}{b}{c')
+
+    # The error near the end is not reached until it is read.
+    assert list(islice(tokens, 3)) == [
+        ('syntax', 0, 1),
+        ('name', 1, 2),
+        ('syntax', 2, 3)
+    ]
+
+def test_not_cached():
+    parser = Parser({'cache_size': 10})
+    list(parser.tokenize('Hello, {name}!'))
+
+    assert parser.cache_info().currsize == 0
+
+def test_input_type():
+    with pytest.raises(TypeError):
+        Parser().tokenize(None)
+
+@pytest.mark.parametrize('fast_paths', [True, False])
+def test_text_is_shared(fast_paths, monkeypatch):
+    monkeypatch.setattr(Parser, '_fast_paths', fast_paths)
+    parser = Parser()
+
+    input = 'Just some text.'
+    tokens = []
+    assert parser.parse(input, tokens)[0] is input
+    assert tokens[0]['text'] is input
+
+    tokens = []
+    ast = parser.parse("Hello, {name}! It''s {n, number}.", tokens)
+    assert tokens[0]['text'] is ast[0]
+    assert ast[2] == "! It's "
+    assert tokens[4]['text'] == "! It''s "
@@ -0,0 +1,82 @@
+import pytest
+
+from pyicumessageformat import MessageFormatSyntaxError, Parser
+
+
+MESSAGES = [
+    '',
+    'Hello, {name}!',
+    "It's '{'escaped'}'",
+    '{n, plural, offset:1 =0 {none} other {# <b>{name}</b>}}',
+    '{gender, select, male {he} other {{n, number, integer}}}',
+    'Hello, {name{!',
+    '{n, plural, one {x}}',
+    '<b>unclosed',
+    'oops }'
+]
+
+@pytest.mark.parametrize('fast_paths', [True, False])
+@pytest.mark.parametrize('input', MESSAGES)
+def test_same_as_parse(input, fast_paths, monkeypatch):
+    monkeypatch.setattr(Parser, '_fast_paths', fast_paths)
+    parser = Parser({'allow_tags': True})
+
+    try:
+        parser.parse(input)
+    except SyntaxError as err:
+        expected = str(err)
+    else:
+        expected = None
+
+    err = parser.validate(input)
+    assert (str(err) if err else None) == expected
+
+def test_error_fields():
+    err = Parser().validate('Hello, {name{!')
+
+    assert isinstance(err, MessageFormatSyntaxError)
+    assert (err.code, err.position) == ('expected', 12)
+
+def test_not_cached():
+    parser = Parser({'cache_size': 10})
+    parser.validate('{n, number}')
+
+    assert parser.cache_info().currsize == 0
+
+@pytest.mark.parametrize('fast_paths', [True, False])
+def test_placeholders_simple(fast_paths, monkeypatch):
+    monkeypatch.setattr(Parser, '_fast_paths', fast_paths)
+
+    assert Parser().placeholders('Hello, {name}! { name } and {other}') == {
+        'name': {None},
+        'other': {None}
+    }
+
+@pytest.mark.parametrize('iterative', [False, True])
+def test_placeholders(iterative):
+    parser = Parser({'allow_tags': True, 'iterative': iterative})
+    input = '{n, plural, one {# <b>{name}</b>} other {# {n, number} {when, date, short}}} {name}'
+
+    assert parser.placeholders(input) == {
+        'n': {'plural', 'number'},
+        'b': {'tag'},
+        'name': {None},
+        'when': {'date'}
+    }
+
+def test_placeholders_ast_nodes():
+    assert Parser({'ast_nodes': True}).placeholders('{a, number} {b}') == {
+        'a': {'number'},
+        'b': {None}
+    }
+
+def test_placeholders_error():
+    with pytest.raises(MessageFormatSyntaxError):
+        Parser().placeholders('Hello, {name{!')
+
+def test_input_type():
+    with pytest.raises(TypeError):
+        Parser().validate(None)
+
+    with pytest.raises(TypeError):
+        Parser().placeholders(None)